@@ -0,0 +1,276 @@
+"""
+Benchmarks whole crawls against a local fixture documentation site.
+
+Starts `benchmarks.fixture_server` in its own process, then crawls it once per
+crawl mode, each in a fresh process, so CPU time and peak RSS belong to that
+crawl alone. For every mode it reports pages/sec, CPU time per page (crawler
+plus extraction workers), peak RSS of the crawler and of its workers, and the
+per-stage time breakdown collected by `CrawlMetrics`.
+
+Rate control is lifted by default so the numbers measure the crawler rather
+than its pacing; pass --polite to crawl with the default per-host rates. Save a
+run with --json and compare a later one against it with --baseline to spot
+regressions.
+
+Unix only (peak RSS and CPU times come from `resource.getrusage`).
+
+Run from the repository root:
+    python -m benchmarks.bench_crawl [--pages 2000] [--modes default,packed] [--latency-ms 20] [--error-rate 0.01]
+"""
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import asyncio
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+from benchmarks.fixture_server import start_server_process
+from config.settings import SCRAPER_MAX_CONCURRENCY, SCRAPER_MAX_CONCURRENCY_PER_HOST, SCRAPER_REQUEST_TIMEOUT
+from core.scraper.crawler import crawl_documentation
+from core.scraper.metrics import CrawlMetrics, STAGES
+from core.scraper.parsers import available_backends
+from core.scraper.rate_limiter import RateLimiter
+from core.scraper.scheduler import MultiSiteScheduler
+from core.scraper.scraper import scrape_documentation
+
+# Crawler options per mode. "streaming" and "multi-site" are run by their own helpers.
+MODES = {
+    "default": {},
+    "threads": {"extract_processes": 0},
+    "sitemap": {"discovery": "sitemap"},
+    "packed": {"output_format": "packed"},
+    "lxml": {"parser_backend": "lxml"},
+    "selectolax": {"parser_backend": "selectolax"},
+    "streaming": {"save_markdown_files": False},
+    "multi-site": {},
+}
+# Rates high enough that the limiter never waits on a local server.
+UNTHROTTLED = {"initial_rate": 10_000, "max_rate": 10_000, "latency_factor": float("inf")}
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024 # ru_maxrss is bytes on macOS, KiB on Linux
+
+
+async def _crawl_streaming(base_url: str, output_dir: str, path_filter: str, options: dict) -> dict:
+    """Crawls with a page sink that a consumer drains, as the indexing pipeline does."""
+    page_sink = asyncio.Queue(maxsize=64)
+
+    async def consume():
+        while True:
+            await page_sink.get()
+
+    consumer = asyncio.create_task(consume())
+    try:
+        return await crawl_documentation(base_url, output_dir, path_filter, page_sink=page_sink, **options)
+    finally:
+        consumer.cancel()
+
+
+async def _crawl_multi_site(base_url: str, output_dir: str, path_filter: str, options: dict) -> dict:
+    """
+    Crawls the fixture site as two sites at once, one through 127.0.0.1 and one
+    through localhost, under the multi-site scheduler.
+    """
+    metrics = CrawlMetrics()
+    rate_limiter = options.pop("rate_limiter", None)
+    extract_processes = options.pop("extract_processes", None)
+    sites = [
+        {"name": name, "base_url": url, "output_dir": os.path.join(output_dir, name),
+         "path_filter": path_filter, "metrics": metrics, **options}
+        for name, url in (("loopback", base_url), ("localhost", base_url.replace("127.0.0.1", "localhost")))
+    ]
+    scheduler_options = {"rate_limiter": rate_limiter}
+    if extract_processes is not None:
+        scheduler_options["extract_processes"] = extract_processes
+    reports = await MultiSiteScheduler(sites, **scheduler_options).run()
+    for report in reports.values():
+        if isinstance(report, BaseException):
+            raise report
+    return {
+        "visited": [url for report in reports.values() for url in report["visited"]],
+        "failed": [url for report in reports.values() for url in report["failed"]],
+        "metrics": metrics.summary(),
+    }
+
+
+def _run_mode(mode: str, base_url: str, path_filter: str, options: dict, polite: bool, verbose: bool, results):
+    """Runs one crawl mode; executed in a fresh process, which puts its measurements on `results`."""
+    output_dir = tempfile.mkdtemp(prefix=f"bench_crawl_{mode}_")
+    options = {**options, **MODES[mode]}
+    if not polite:
+        options["rate_limiter"] = RateLimiter(**UNTHROTTLED)
+    if not verbose:
+        # Silences the extraction workers too, which inherit the file descriptor.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    try:
+        started = time.perf_counter()
+        if mode == "streaming":
+            report = asyncio.run(_crawl_streaming(base_url, output_dir, path_filter, options))
+        elif mode == "multi-site":
+            report = asyncio.run(_crawl_multi_site(base_url, output_dir, path_filter, options))
+        else:
+            report = scrape_documentation(base_url, output_dir, path_filter, **options)
+        wall_seconds = time.perf_counter() - started
+
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        workers = resource.getrusage(resource.RUSAGE_CHILDREN)
+        metrics = report["metrics"]
+        results.put({
+            "mode": mode,
+            "pages": len(report["visited"]),
+            "failed": len(report["failed"]),
+            "wall_seconds": wall_seconds,
+            "cpu_seconds": own.ru_utime + own.ru_stime + workers.ru_utime + workers.ru_stime,
+            "peak_rss_bytes": own.ru_maxrss * RSS_UNIT,
+            "worker_peak_rss_bytes": workers.ru_maxrss * RSS_UNIT,
+            "errors": sum((metrics["counters"].get("errors") or {}).values()),
+            "throttled": sum((metrics["counters"].get("throttled") or {}).values()),
+            "retries": metrics["counters"].get("retries", 0),
+            "stages": metrics["stages"],
+        })
+    except Exception as e:
+        results.put({"mode": mode, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def run_mode(mode: str, base_url: str, path_filter: str, options: dict,
+             polite: bool = False, verbose: bool = False) -> dict:
+    """
+    Crawls the fixture site in one mode, in a fresh process.
+
+    Args:
+        mode (str): A key of `MODES`.
+        base_url (str): The fixture site's start URL.
+        path_filter (str): A string that must be in the URL path to be followed.
+        options (dict): Crawler options shared by all modes.
+        polite (bool): Keep the default rate control instead of lifting it.
+        verbose (bool): Show the crawler's output.
+
+    Returns:
+        dict: The measurements, or {"mode", "error"} if the crawl failed.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(
+        target=_run_mode, args=(mode, base_url, path_filter, options, polite, verbose, results),
+    )
+    process.start()
+    try:
+        # Read before joining: a child blocks on exit until its queued result is consumed.
+        while True:
+            try:
+                return results.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    return {"mode": mode, "error": f"crawl process exited with code {process.exitcode}"}
+    finally:
+        process.join()
+
+
+def print_results(results: list[dict], baseline: dict = None):
+    """Prints the throughput table and the per-stage breakdown (mean / p95 in ms)."""
+    print(f"\n{'mode':<11} {'pages':>6} {'failed':>6} {'wall s':>7} {'pages/s':>8} {'CPU ms/page':>12} "
+          f"{'RSS MB':>7} {'worker MB':>10} {'errors':>7} {'throttled':>10} {'retries':>8}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['mode']:<11} ❌ {result['error']}")
+            continue
+        pages_per_second = result["pages"] / result["wall_seconds"] if result["wall_seconds"] else 0.0
+        cpu_ms_per_page = result["cpu_seconds"] * 1000 / result["pages"] if result["pages"] else 0.0
+        line = (
+            f"{result['mode']:<11} {result['pages']:>6} {result['failed']:>6} {result['wall_seconds']:>7.1f} "
+            f"{pages_per_second:>8.1f} {cpu_ms_per_page:>12.2f} {result['peak_rss_bytes'] / 1e6:>7.0f} "
+            f"{result['worker_peak_rss_bytes'] / 1e6:>10.0f} {result['errors']:>7} {result['throttled']:>10} {result['retries']:>8}"
+        )
+        previous = (baseline or {}).get(result["mode"])
+        if previous and "error" not in previous and previous["pages"] and result["pages"]:
+            previous_rate = previous["pages"] / previous["wall_seconds"]
+            previous_cpu = previous["cpu_seconds"] * 1000 / previous["pages"]
+            line += (f"   vs baseline: pages/s {(pages_per_second / previous_rate - 1) * 100:+.0f}%, "
+                     f"CPU/page {(cpu_ms_per_page / previous_cpu - 1) * 100:+.0f}%")
+        print(line)
+
+    measured = [result for result in results if "error" not in result]
+    if not measured:
+        return
+    print(f"\n{'stage ms':<12}" + "".join(f"{result['mode']:>16}" for result in measured))
+    for stage in STAGES:
+        if not any(stage in result["stages"] for result in measured):
+            continue
+        cells = []
+        for result in measured:
+            timing = result["stages"].get(stage)
+            cells.append(f"{timing['mean'] * 1000:.2f} / {timing['p95'] * 1000:.1f}" if timing else "-")
+        print(f"{stage:<12}" + "".join(f"{cell:>16}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark whole crawls against a local fixture site.")
+    parser.add_argument("--modes", default=None,
+                        help=f"Comma-separated crawl modes out of {', '.join(MODES)}. "
+                             f"Defaults to all whose parser backend is installed.")
+    parser.add_argument("--pages", type=int, default=2000, help="Pages in the synthetic site.")
+    parser.add_argument("--recorded", default=None, help="Serve this crawl archive directory instead.")
+    parser.add_argument("--start-path", default="/docs/",
+                        help="Path the crawl starts from; also used as the path filter.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Server latency added to every page.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- spread of the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of pages answered with 503.")
+    parser.add_argument("--stall-rate", type=float, default=0.0,
+                        help="Fraction of pages held past the request timeout.")
+    parser.add_argument("--concurrency", type=int, default=SCRAPER_MAX_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=SCRAPER_MAX_CONCURRENCY_PER_HOST)
+    parser.add_argument("--timeout", type=float, default=SCRAPER_REQUEST_TIMEOUT, help="Crawler request timeout.")
+    parser.add_argument("--polite", action="store_true", help="Keep the default rate control.")
+    parser.add_argument("--verbose", action="store_true", help="Show the crawler's output.")
+    parser.add_argument("--json", default=None, help="Write the measurements to this file.")
+    parser.add_argument("--baseline", default=None, help="Compare against measurements saved with --json.")
+    args = parser.parse_args()
+
+    if args.modes:
+        modes = args.modes.split(",")
+        unknown = [mode for mode in modes if mode not in MODES]
+        if unknown:
+            parser.error(f"Unknown modes: {', '.join(unknown)}")
+    else:
+        backends = available_backends()
+        modes = [mode for mode, options in MODES.items() if options.get("parser_backend", "html.parser") in backends]
+
+    site_options = {"pages": args.pages, "seed": args.seed, "recorded": args.recorded}
+    app_options = {
+        "latency": args.latency_ms / 1000, "jitter": args.jitter_ms / 1000, "error_rate": args.error_rate,
+        "stall_rate": args.stall_rate, "stall_seconds": args.timeout + 1, "seed": args.seed,
+    }
+    crawl_options = {"max_concurrency": args.concurrency, "max_per_host": args.per_host, "request_timeout": args.timeout}
+
+    server, port = start_server_process(site_options, app_options)
+    base_url = f"http://127.0.0.1:{port}{args.start_path}"
+    print(f"🧪 Fixture site at {base_url}; modes: {', '.join(modes)}")
+    results = []
+    try:
+        for mode in modes:
+            print(f"⏱️ Crawling in {mode} mode...")
+            results.append(run_mode(mode, base_url, args.start_path, crawl_options, args.polite, args.verbose))
+    finally:
+        server.terminate()
+        server.join()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = {result["mode"]: result for result in json.load(f)["results"]}
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"site": site_options, "server": app_options, "crawl": crawl_options,
+                       "polite": args.polite, "results": results}, f, indent=2)
+        print(f"\n💾 Measurements written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
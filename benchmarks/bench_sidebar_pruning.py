@@ -0,0 +1,89 @@
+"""
+Benchmarks sidebar pruning on large API-reference fixture pages.
+
+Compares the previous implementation (a subtree scan plus an ancestor walk for
+every candidate) against `core.scraper.extractor.remove_sidebars`, and checks
+that both produce identical Markdown.
+
+Run from the repository root:
+    python -m benchmarks.bench_sidebar_pruning
+"""
+import io
+import time
+import argparse
+import contextlib
+
+from benchmarks.fixtures import PAGE_SIZES, api_reference_page
+from core.scraper.extractor import (
+    POTENTIAL_SIDEBAR_SELECTORS, create_markdown_converter, find_content_area, remove_sidebars
+)
+from core.scraper.parsers import BeautifulSoupPage
+
+
+def legacy_remove_sidebars(page, content_area):
+    """The pruning loop as it was before the ancestor-set rework, kept for comparison."""
+    soup = page.soup
+    all_potential_sidebars = []
+    for selector in POTENTIAL_SIDEBAR_SELECTORS:
+        all_potential_sidebars.extend(soup.select(selector))
+    unique_potential_sidebars = set(all_potential_sidebars)
+
+    removed = 0
+    for element_to_remove in unique_potential_sidebars:
+        if element_to_remove == content_area:
+            continue
+        if content_area in element_to_remove.find_all(True):
+            continue
+        is_ancestor_of_content_area = False
+        current = content_area
+        while current:
+            if current == element_to_remove:
+                is_ancestor_of_content_area = True
+                break
+            current = current.parent
+        if is_ancestor_of_content_area:
+            continue
+        element_to_remove.decompose()
+        removed += 1
+    return removed
+
+
+def time_pruning(html: str, prune, repeat: int):
+    """
+    Times one pruning implementation, excluding parse time.
+
+    Returns:
+        tuple: (best seconds per page, Markdown of the pruned content area)
+    """
+    best = float("inf")
+    markdown = None
+    for _ in range(repeat):
+        page = BeautifulSoupPage(html)
+        with contextlib.redirect_stdout(io.StringIO()):
+            content_area = find_content_area(page, "fixture")
+            start = time.perf_counter()
+            prune(page, content_area)
+            best = min(best, time.perf_counter() - start)
+        markdown = create_markdown_converter().handle(str(content_area))
+    return best, markdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sidebar pruning.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page size; the best is reported.")
+    args = parser.parse_args()
+
+    print(f"{'page':<8} {'bytes':>10} {'legacy ms':>11} {'new ms':>9} {'speedup':>8}  output")
+    for label, kwargs in PAGE_SIZES:
+        html = api_reference_page(**kwargs)
+        legacy_seconds, legacy_markdown = time_pruning(html, legacy_remove_sidebars, args.repeat)
+        new_seconds, new_markdown = time_pruning(html, remove_sidebars, args.repeat)
+        parity = "identical" if legacy_markdown == new_markdown else "DIFFERENT"
+        print(
+            f"{label:<8} {len(html):>10,} {legacy_seconds * 1000:>11.1f} {new_seconds * 1000:>9.1f} "
+            f"{legacy_seconds / new_seconds:>7.1f}x  {parity}"
+        )
+
+
+if __name__ == "__main__":
+    main()
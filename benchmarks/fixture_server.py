@@ -0,0 +1,223 @@
+"""
+A local HTTP server that serves a documentation site for crawl benchmarks.
+
+The site is either synthetic (see `benchmarks.fixtures.site_page`) or replayed
+from a crawl archive written with `archive_responses`, in which case absolute
+links to the original host are rewritten to point at the local server. Every
+site also gets an allow-all robots.txt and a sitemap.xml, so sitemap discovery
+can be benchmarked too. Latency, errors and stalled responses can be injected
+to exercise the crawler's rate control, retries and timeouts.
+
+Run from the repository root to crawl or browse it by hand:
+    python -m benchmarks.fixture_server [--pages 2000] [--port 8765] [--latency-ms 20]
+"""
+import random
+import asyncio
+import argparse
+import multiprocessing
+from functools import lru_cache
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+from benchmarks.fixtures import site_page, site_page_path
+from core.scraper.archive import read_archive_index, read_record
+
+
+class SyntheticSite:
+    """A generated site; pages are rendered on first request and kept in memory."""
+    def __init__(self, num_pages: int, base_path: str = "/docs/", pages_per_group: int = 25, seed: int = 0):
+        self.num_pages = num_pages
+        self.base_path = base_path
+        self.pages_per_group = pages_per_group
+        self.seed = seed
+        self.indexes = {site_page_path(i, base_path, pages_per_group): i for i in range(num_pages)}
+        self.render = lru_cache(maxsize=None)(self._render)
+
+    def _render(self, index: int) -> bytes:
+        return site_page(index, self.num_pages, self.base_path, self.pages_per_group, seed=self.seed).encode("utf-8")
+
+    def paths(self) -> list[str]:
+        """Returns the path (and query) of every page."""
+        return list(self.indexes)
+
+    def page(self, path: str, origin: str):
+        """Returns the body of a page, or None if it does not exist."""
+        index = self.indexes.get(path)
+        return None if index is None else self.render(index)
+
+
+class RecordedSite:
+    """A site replayed from a crawl archive (see `core.scraper.archive`)."""
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        self.records = {}
+        self.original_origin = None
+        for url, file_name, codec, offset, length in read_archive_index(archive_dir):
+            parts = urlsplit(url)
+            if self.original_origin is None:
+                self.original_origin = f"{parts.scheme}://{parts.netloc}"
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            self.records[path] = (file_name, codec, offset, length)
+        if not self.records:
+            raise ValueError(f"No archived pages found in {archive_dir}")
+
+    def paths(self) -> list[str]:
+        """Returns the path (and query) of every page."""
+        return list(self.records)
+
+    def page(self, path: str, origin: str):
+        """Returns the body of a page with links to the original host pointed at `origin`, or None."""
+        record = self.records.get(path)
+        if record is None:
+            return None
+        _, _, _, body = read_record(self.archive_dir, *record)
+        return body.replace(self.original_origin.encode("utf-8"), origin.encode("utf-8"))
+
+
+def open_site(pages: int = 2000, base_path: str = "/docs/", seed: int = 0, recorded: str = None):
+    """Returns a `RecordedSite` if an archive directory is given, otherwise a `SyntheticSite`."""
+    if recorded:
+        return RecordedSite(recorded)
+    return SyntheticSite(pages, base_path, seed=seed)
+
+
+def build_app(
+    site,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    stall_rate: float = 0.0,
+    stall_seconds: float = 30.0,
+    seed: int = 0,
+) -> web.Application:
+    """
+    Builds the aiohttp application serving a site.
+
+    Args:
+        site: A `SyntheticSite` or `RecordedSite`.
+        latency (float): Seconds added before every page response.
+        jitter (float): Up to this many seconds are randomly added to or taken off the latency.
+        error_rate (float): Fraction of page requests answered with `error_status`.
+        error_status (int): Status code of injected errors.
+        stall_rate (float): Fraction of page requests held for `stall_seconds` before answering,
+                            to trigger client timeouts.
+        stall_seconds (float): How long stalled requests are held.
+        seed (int): Seed of the injection randomness.
+
+    Returns:
+        web.Application: The application. robots.txt and sitemap.xml are never delayed or failed.
+    """
+    rng = random.Random(seed)
+
+    async def robots(request: web.Request) -> web.Response:
+        origin = f"{request.scheme}://{request.host}"
+        return web.Response(text=f"User-agent: *\nAllow: /\n\nSitemap: {origin}/sitemap.xml\n")
+
+    async def sitemap(request: web.Request) -> web.Response:
+        origin = f"{request.scheme}://{request.host}"
+        entries = "".join(f"<url><loc>{escape(origin + path)}</loc></url>" for path in site.paths())
+        return web.Response(
+            text=f'<?xml version="1.0" encoding="UTF-8"?>'
+                 f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>',
+            content_type="application/xml",
+        )
+
+    async def page(request: web.Request) -> web.Response:
+        delay = latency + (rng.uniform(-jitter, jitter) if jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = rng.random()
+        if roll < error_rate:
+            return web.Response(status=error_status, text="Injected error\n")
+        if roll < error_rate + stall_rate:
+            await asyncio.sleep(stall_seconds)
+        body = site.page(request.path_qs, f"{request.scheme}://{request.host}")
+        if body is None:
+            return web.Response(status=404, text="Not found\n")
+        return web.Response(body=body, content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/robots.txt", robots)
+    app.router.add_get("/sitemap.xml", sitemap)
+    app.router.add_get("/{tail:.*}", page)
+    return app
+
+
+async def _serve(site_options: dict, app_options: dict, host: str, port: int, started=None):
+    """Serves until cancelled; reports the bound port through `started` (a queue), if given."""
+    site = open_site(**site_options)
+    runner = web.AppRunner(build_app(site, **app_options), access_log=None)
+    await runner.setup()
+    try:
+        tcp_site = web.TCPSite(runner, host, port)
+        await tcp_site.start()
+        bound_port = runner.addresses[0][1]
+        if started is not None:
+            started.put(bound_port)
+        else:
+            print(f"🧪 Serving {len(site.paths())} pages at http://{host}:{bound_port}/")
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def _server_process(site_options: dict, app_options: dict, host: str, port: int, started):
+    """Entry point of the server process."""
+    asyncio.run(_serve(site_options, app_options, host, port, started))
+
+
+def start_server_process(site_options: dict, app_options: dict = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Starts the fixture server in its own process, so serving pages does not count
+    towards the crawler's CPU time.
+
+    Args:
+        site_options (dict): Forwarded to `open_site`.
+        app_options (dict): Forwarded to `build_app` (latency and error injection).
+        host (str): Interface to listen on.
+        port (int): Port to listen on; 0 picks a free one.
+
+    Returns:
+        tuple: (the process, the port it listens on). Terminate the process when done.
+    """
+    context = multiprocessing.get_context("spawn")
+    started = context.Queue()
+    process = context.Process(
+        target=_server_process, args=(site_options, app_options or {}, host, port, started), daemon=True
+    )
+    process.start()
+    return process, started.get(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fixture documentation site.")
+    parser.add_argument("--pages", type=int, default=2000, help="Pages in the synthetic site.")
+    parser.add_argument("--recorded", default=None, help="Replay this crawl archive directory instead.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every page response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- spread of the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of pages answered with an error.")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of pages held for --stall-seconds.")
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    site_options = {"pages": args.pages, "seed": args.seed, "recorded": args.recorded}
+    app_options = {
+        "latency": args.latency_ms / 1000, "jitter": args.jitter_ms / 1000,
+        "error_rate": args.error_rate, "error_status": args.error_status,
+        "stall_rate": args.stall_rate, "stall_seconds": args.stall_seconds, "seed": args.seed,
+    }
+    try:
+        asyncio.run(_serve(site_options, app_options, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Synthetic documentation pages for the scraper benchmarks.
+
+The pages mimic large API-reference layouts: a top navigation bar, a deep sidebar
+with hundreds of nav entries, an in-page table of contents and a long article
+with prose, code blocks and tables. Generation is deterministic so timings are
+comparable between runs.
+"""
+import random
+
+LOREM_WORDS = (
+    "request response client server config value option handler route service "
+    "policy token cache index field model schema error retry timeout header "
+    "payload stream buffer cluster node pod gateway proxy mesh metric trace"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    """Returns a pseudo-random sentence."""
+    return " ".join(rng.choice(LOREM_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _sidebar(num_nav_groups: int, items_per_group: int, base_path: str) -> str:
+    """Renders a nested sidebar navigation tree."""
+    groups = []
+    for g in range(num_nav_groups):
+        items = "".join(
+            f'<li class="sidenav-item"><a href="{base_path}group-{g}/item-{i}/">Item {g}.{i}</a></li>'
+            for i in range(items_per_group)
+        )
+        groups.append(
+            f'<div class="sidenav-group" id="sidenav-group-{g}">'
+            f'<h4>Group {g}</h4><ul>{items}</ul></div>'
+        )
+    return f'<aside class="sidebar"><nav class="sidebar-nav">{"".join(groups)}</nav></aside>'
+
+
+def _section(rng: random.Random, index: int, base_path: str, links_per_section: int, link_targets=None) -> str:
+    """
+    Renders one article section with prose, links, a code block and a table.
+
+    Links point at `link_targets` (paths) when given, otherwise at made-up reference pages.
+    """
+    links = " ".join(
+        f'<a href="{rng.choice(link_targets) if link_targets else f"{base_path}ref-{rng.randrange(10_000)}/"}">ref {j}</a>'
+        for j in range(links_per_section)
+    )
+    rows = "".join(
+        f"<tr><td>field_{index}_{r}</td><td>{rng.choice(LOREM_WORDS)}</td><td>{_sentence(rng, 6)}</td></tr>"
+        for r in range(4)
+    )
+    return (
+        f'<section id="section-{index}">'
+        f'<h2 id="heading-{index}">Section {index}</h2>'
+        f"<p>{_sentence(rng)} {_sentence(rng)} {links}</p>"
+        f'<pre><code class="language-python">def handler_{index}(request):\n'
+        f'    return {{"status": "ok", "section": {index}}}\n</code></pre>'
+        f"<table><thead><tr><th>Field</th><th>Type</th><th>Description</th></tr></thead>"
+        f"<tbody>{rows}</tbody></table>"
+        f"</section>"
+    )
+
+
+def api_reference_page(
+    num_nav_groups: int = 40,
+    items_per_group: int = 12,
+    num_sections: int = 150,
+    links_per_section: int = 6,
+    base_path: str = "/docs/api/",
+    seed: int = 0,
+) -> str:
+    """
+    Builds a large API-reference style HTML page.
+
+    Args:
+        num_nav_groups (int): Number of sidebar groups.
+        items_per_group (int): Number of links per sidebar group.
+        num_sections (int): Number of article sections.
+        links_per_section (int): Number of in-content links per section.
+        base_path (str): Path prefix used for generated links.
+        seed (int): Random seed for the generated prose.
+
+    Returns:
+        str: The HTML document.
+    """
+    rng = random.Random(seed)
+    toc = "".join(f'<li><a href="#section-{i}">Section {i}</a></li>' for i in range(num_sections))
+    sections = "".join(_section(rng, i, base_path, links_per_section) for i in range(num_sections))
+    return (
+        "<!DOCTYPE html><html><head><title>API Reference</title></head><body>"
+        '<header><nav class="top-nav" role="navigation">'
+        f'<a href="{base_path}">Docs</a><a href="/blog/">Blog</a><a href="/about/">About</a>'
+        "</nav></header>"
+        '<div class="layout">'
+        f"{_sidebar(num_nav_groups, items_per_group, base_path)}"
+        "<main><article>"
+        "<h1>API Reference</h1>"
+        f'<nav class="table-of-contents" id="toc"><ul>{toc}</ul></nav>'
+        f"{sections}"
+        "</article></main>"
+        "</div>"
+        '<footer><div class="footer-nav-menu"><a href="/privacy/">Privacy</a></div></footer>'
+        "</body></html>"
+    )
+
+
+def api_index_page(num_entries: int = 2000, base_path: str = "/docs/api/", seed: int = 0) -> str:
+    """
+    Builds a link-heavy API index page (one entry per class or function).
+
+    Entries mix the href styles real index pages use: relative, root-relative,
+    absolute, same-page anchors, "source" links to another host and repeated
+    navigation links.
+
+    Args:
+        num_entries (int): Number of index entries.
+        base_path (str): Path prefix used for generated links.
+        seed (int): Random seed for the generated entries.
+
+    Returns:
+        str: The HTML document.
+    """
+    rng = random.Random(seed)
+    entries = []
+    for i in range(num_entries):
+        name = f"{rng.choice(LOREM_WORDS)}_{i}"
+        style = i % 4
+        if style == 0:
+            href = f"{name}/"
+        elif style == 1:
+            href = f"{base_path}{name}/#signature"
+        elif style == 2:
+            href = f"https://docs.example.com{base_path}{name}.html"
+        else:
+            href = f"../reference/{name}/"
+        entries.append(
+            f'<li><a href="{href}">{name}</a> '
+            f'<a href="#entry-{i}">¶</a> '
+            f'<a href="https://github.com/example/project/blob/main/{name}.py">[source]</a> '
+            f'<a href="{base_path}">index</a></li>'
+        )
+    return (
+        "<!DOCTYPE html><html><head><title>API Index</title></head><body>"
+        f'<main><h1>API Index</h1><ul>{"".join(entries)}</ul></main>'
+        "</body></html>"
+    )
+
+
+def site_page_path(index: int, base_path: str = "/docs/", pages_per_group: int = 25) -> str:
+    """Returns the URL path of page `index` of a synthetic site; page 0 is the site root."""
+    if index == 0:
+        return base_path
+    return f"{base_path}section-{index // pages_per_group}/page-{index}/"
+
+
+def site_page(
+    index: int,
+    num_pages: int,
+    base_path: str = "/docs/",
+    pages_per_group: int = 25,
+    num_sections: int = 8,
+    links_per_section: int = 4,
+    seed: int = 0,
+) -> str:
+    """
+    Builds one page of a synthetic documentation site of `num_pages` pages.
+
+    Pages are grouped into sections. Every page has a top bar, a breadcrumb, and a
+    sidebar listing the first page of every section plus all pages of its own
+    section (so the whole site is reachable from the root, as on real sites). It
+    also has a table of contents and an article whose prose links to random pages
+    of the site.
+
+    Args:
+        index (int): The page number, 0 being the site root.
+        num_pages (int): Number of pages in the site.
+        base_path (str): Path prefix of every page.
+        pages_per_group (int): Pages per sidebar section.
+        num_sections (int): Article sections per page.
+        links_per_section (int): In-content links per article section.
+        seed (int): Random seed; the same seed and index always give the same page.
+
+    Returns:
+        str: The HTML document.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    path = lambda i: site_page_path(i, base_path, pages_per_group)
+    group = index // pages_per_group
+    heads = "".join(
+        f'<li class="sidenav-item"><a href="{path(g * pages_per_group)}">Section {g}</a></li>'
+        for g in range((num_pages + pages_per_group - 1) // pages_per_group)
+    )
+    own = "".join(
+        f'<li class="sidenav-item"><a href="{path(i)}">Page {i}</a></li>'
+        for i in range(group * pages_per_group, min(num_pages, (group + 1) * pages_per_group))
+    )
+    targets = [path(rng.randrange(num_pages)) for _ in range(num_sections * links_per_section)]
+    toc = "".join(f'<li><a href="#section-{i}">Section {i}</a></li>' for i in range(num_sections))
+    sections = "".join(_section(rng, i, base_path, links_per_section, targets) for i in range(num_sections))
+    return (
+        f"<!DOCTYPE html><html><head><title>Page {index}</title></head><body>"
+        '<header><nav class="top-nav" role="navigation">'
+        f'<a href="{base_path}">Docs</a><a href="/blog/">Blog</a><a href="/about/">About</a>'
+        "</nav></header>"
+        '<div class="layout">'
+        f'<aside class="sidebar"><nav class="sidebar-nav"><ul>{heads}</ul><ul>{own}</ul></nav></aside>'
+        "<main><article>"
+        f'<nav class="breadcrumb"><a href="{base_path}">Docs</a> / <a href="{path(group * pages_per_group)}">Section {group}</a></nav>'
+        f"<h1>Page {index}</h1>"
+        f'<nav class="table-of-contents" id="toc"><ul>{toc}</ul></nav>'
+        f"{sections}"
+        "</article></main>"
+        "</div>"
+        '<footer><div class="footer-nav-menu"><a href="/privacy/">Privacy</a></div></footer>'
+        "</body></html>"
+    )
+
+
+# Sizes used by the benchmarks: (label, keyword arguments for api_reference_page).
+PAGE_SIZES = [
+    ("small", {"num_nav_groups": 8, "items_per_group": 8, "num_sections": 20}),
+    ("medium", {"num_nav_groups": 40, "items_per_group": 12, "num_sections": 150}),
+    ("large", {"num_nav_groups": 120, "items_per_group": 20, "num_sections": 400}),
+]
@@ -9,4 +9,97 @@ TABLE_NAME = "documents"
 USE_LOCAL_EMBEDDINGS = True
 LOCAL_EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2" # A good default small model
 
+# --- Scraper Configuration ---
+SCRAPER_MAX_CONCURRENCY = 16          # Requests in flight across all hosts
+SCRAPER_MAX_CONCURRENCY_PER_HOST = 4  # Requests in flight against a single host
+SCRAPER_REQUEST_TIMEOUT = 10          # Seconds before a single fetch is abandoned
+SCRAPER_USER_AGENT = "docs-fetcher/0.1 (+https://github.com/khannaabhi/docs-fetcher)"
+SCRAPER_FRONTIER_BATCH_SIZE = 100     # Frontier status changes buffered before a SQLite write
+SCRAPER_FRONTIER_FLUSH_INTERVAL = 5.0 # Seconds between frontier checkpoints at most
+SCRAPER_VALIDATOR_BATCH_SIZE = 100    # ETag/Last-Modified/hash records buffered before a SQLite write
+SCRAPER_DISCOVERY_MODE = "links"      # "links", "sitemap" (seed from sitemaps only) or "hybrid" (both)
+SCRAPER_MAX_SITEMAPS = 500            # Upper bound on sitemap files read per crawl
+SCRAPER_MAX_DEPTH = 0                 # Links followed away from the base URL (0 = unlimited)
+SCRAPER_MAX_PAGES = 0                 # Pages fetched per site before the crawl stops (0 = unlimited)
+SCRAPER_MAX_BYTES = 0                 # Bytes downloaded per site before the crawl stops (0 = unlimited)
+SCRAPER_MAX_SECONDS = 0               # Seconds a site is crawled before it stops (0 = unlimited)
+SCRAPER_PRIORITY_DEPTH_WEIGHT = 1.0   # Priority penalty per link of depth (lower priority = fetched sooner)
+SCRAPER_PRIORITY_PATH_WEIGHT = 0.5    # Priority penalty per URL path segment
+SCRAPER_PRIORITY_PATTERNS = {         # Regex searched in the URL path -> weight (positive = fetch sooner)
+    r"/(getting-started|quickstart|tutorials?|guides?|concepts|overview)(/|$)": 2.0,
+    r"/(api|reference)/.+/.+/": -2.0,
+    r"/(changelog|release-notes|blog|news)(/|$)": -1.0,
+}
+SCRAPER_PARSER_BACKEND = "html.parser" # "html.parser" (BeautifulSoup), "lxml" or "selectolax"
+SCRAPER_EXTRACT_PROCESSES = os.cpu_count() or 1 # Extraction worker processes (0 = threads in-process)
+SCRAPER_EXTRACT_QUEUE_SIZE = 64       # Fetched pages buffered for extraction before fetchers pause
+SCRAPER_OUTPUT_FORMAT = "files"       # "files" (one .md per page) or "packed" (single pages.sqlite3)
+SCRAPER_PACKED_BATCH_SIZE = 50        # Pages buffered before a packed-store commit
+SCRAPER_PAGE_STRUCTURE = True         # Also save each page's section tree (anchors, code blocks, tables)
+SCRAPER_CONVERT_FROM_TREE = True      # Feed the parsed tree to html2text instead of re-parsing serialized HTML
+SCRAPER_CONVERSION_CACHE = True       # Reuse the Markdown of content areas converted in earlier crawls
+SCRAPER_CONVERSION_CACHE_MB = 256     # Markdown kept in the conversion cache before LRU eviction (0 = unbounded)
+SCRAPER_CONVERSION_CACHE_BATCH_SIZE = 50 # Conversions recorded between cache commits
+SCRAPER_ARCHIVE_RESPONSES = True      # Keep raw responses in a WARC archive for offline re-extraction
+SCRAPER_ARCHIVE_CODEC = "gzip"        # "gzip" (standard .warc.gz) or "zstd" (needs zstandard)
+SCRAPER_ARCHIVE_BATCH_SIZE = 50       # Archived responses between index commits
+SCRAPER_NEAR_DUP_DETECTION = True     # Record near-duplicate pages as aliases instead of saving them
+SCRAPER_NEAR_DUP_MAX_DISTANCE = 3     # SimHash bits (out of 64) that may differ for a near-duplicate
+SCRAPER_NEAR_DUP_MIN_WORDS = 50       # Pages shorter than this are never treated as duplicates
+SCRAPER_NEAR_DUP_SHINGLE_SIZE = 3     # Words per SimHash feature
+SCRAPER_NEAR_DUP_BATCH_SIZE = 100     # Fingerprints and aliases buffered before a SQLite write
+SCRAPER_MAX_BODY_BYTES = 5 * 1024 * 1024 # Bodies larger than this are abandoned mid-download
+SCRAPER_ALLOWED_CONTENT_TYPES = ["text/html", "application/xhtml+xml"]
+SCRAPER_SKIP_EXTENSIONS = [           # Never fetched, even when they match the path filter
+    ".pdf", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".zip", ".tar", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".whl", ".jar", ".exe", ".dmg", ".deb", ".rpm",
+    ".mp3", ".mp4", ".webm", ".mov", ".avi", ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".css", ".js", ".map", ".wasm", ".epub", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+]
+SCRAPER_EXTRACTION_PROFILES = True    # Learn which extraction selectors match on each site
+SCRAPER_PROFILE_LEARN_PAGES = 20      # Fully searched pages per host before its profile is used
+SCRAPER_SCHEDULER_MAX_CONNECTIONS = 64 # Requests in flight across all sites of a multi-site crawl
+SCRAPER_METRICS_INTERVAL = 10.0       # Seconds between refreshes of the Prometheus metrics file
+SCRAPER_METRICS_PORT = 0              # Serve metrics at http://127.0.0.1:<port>/metrics (0 = off)
+SCRAPER_SCHEDULER_PROGRESS_INTERVAL = 30.0 # Seconds between aggregate pages/s reports
+
+# URL canonicalization: variants that normalize to the same URL are fetched once.
+SCRAPER_CANONICAL_TRAILING_SLASH = "keep" # "keep" (dedupe only), "strip" or "add"
+SCRAPER_CANONICAL_DEFAULT_DOCUMENTS = ["index.html", "index.htm", "index.php", "default.html"]
+SCRAPER_QUERY_PARAM_ALLOWLIST = None  # e.g. ["version"] to keep only those query parameters
+SCRAPER_QUERY_PARAM_DENYLIST = ["utm_*", "lang", "ref", "fbclid", "gclid"]
+
+# Adaptive per-host rate limiting (AIMD). Rates are requests per second per host.
+SCRAPER_RATE_INITIAL = 4.0            # Starting rate for a newly seen host
+SCRAPER_RATE_MIN = 0.2                # Floor when a host keeps throttling us
+SCRAPER_RATE_MAX = 20.0               # Ceiling for hosts that stay healthy
+SCRAPER_RATE_ADDITIVE_INCREASE = 0.5  # Rate gained per second of healthy responses
+SCRAPER_RATE_DECREASE_FACTOR = 0.5    # Rate multiplier on 429/503, errors or latency spikes
+SCRAPER_RATE_LATENCY_FACTOR = 2.0     # Latency above this multiple of the host baseline counts as a spike
+SCRAPER_MAX_RETRY_AFTER = 300         # Longest Retry-After pause honored, in seconds
+SCRAPER_RESPECT_ROBOTS = True         # Skip URLs disallowed by robots.txt and honor its Crawl-delay
+SCRAPER_ROBOTS_TTL = 86400.0          # Seconds a fetched robots.txt is trusted before refetching
+SCRAPER_ROBOTS_ERROR_TTL = 300.0      # Seconds an unreachable robots.txt counts as empty before retrying
+SCRAPER_THROTTLE_RETRIES = 3          # Times a 429/503 page is retried after backing off
+
+# Retries and per-host circuit breaking. URLs that keep failing end up in the frontier's
+# dead-letter list and can be replayed with `--replay-failed`.
+SCRAPER_FETCH_RETRIES = 4             # Times a transiently failing URL is requeued before giving up
+SCRAPER_BACKOFF_BASE = 1.0            # Seconds; retry n waits a random time up to base * 2**(n-1)
+SCRAPER_BACKOFF_MAX = 60.0            # Longest backoff between retries of one URL
+SCRAPER_BREAKER_FAILURE_THRESHOLD = 5 # Consecutive transient failures that pause a host
+SCRAPER_BREAKER_COOLDOWN = 30.0       # Seconds a host is paused the first time its circuit opens
+SCRAPER_BREAKER_MAX_COOLDOWN = 600.0  # Cooldown cap after repeated trips
+
+# Streaming crawl-to-index: pages flow from the crawler straight into chunk -> embed -> LanceDB.
+STREAM_QUEUE_SIZE = 32                # Extracted pages buffered between the crawler and the indexer
+STREAM_INDEX_BATCH_PAGES = 8          # Pages embedded and written to LanceDB per batch
+STREAM_INDEX_FLUSH_INTERVAL = 2.0     # Seconds a partial batch waits before it is written anyway
+
+# Loading crawled Markdown for indexing: files are read by a thread pool and streamed to the chunker.
+LOADER_WORKERS = 8                    # Threads reading files in parallel
+LOADER_READ_AHEAD = 64                # Documents read ahead of the consumer; bounds the loader's memory
+LOADER_ORDER = "sorted"               # "sorted" (by path), "filesystem" (directory order) or "completion" (first read first)
+LOADER_INDEX_BATCH_PAGES = 64         # Documents embedded before their rows are written to LanceDB
+
 # You can add more configuration variables here as your project grows
@@ -1,5 +1,7 @@
 from chonkie import SemanticChunker, Visualizer, RecursiveChunker
 
+from core.scraper.structure import iter_section_spans
+
 class Chunker:
     """
     Manages the chunking process using chonkie.ai's SemanticChunker.
@@ -37,3 +39,25 @@ class Chunker:
         chunks = self.chunker.chunk(text)
         self.viz.save("chonkie-new.html", chunks)
         return chunks
+
+    def chunk_sections(self, text: str, structure: dict):
+        """
+        Chunks a crawled page section by section, using its section tree.
+
+        The page is split at its headings first, so no chunk straddles two
+        sections, and every chunk knows which section it came from.
+
+        Args:
+            text (str): The page's Markdown.
+            structure (dict): Its section tree (see `core.scraper.structure`).
+
+        Returns:
+            list[tuple]: (chunk text, deep link to the chunk's section) pairs.
+        """
+        print("  Chunking document by section...")
+        pieces = []
+        for span in iter_section_spans(text, structure):
+            if not span["text"].strip():
+                continue
+            pieces.extend((chunk.text, span["url"]) for chunk in self.chunker.chunk(span["text"]))
+        return pieces
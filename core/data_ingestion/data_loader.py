@@ -1,9 +1,15 @@
 import os
-import glob # For finding files in directories
 import shutil # For removing directories
 
-import os
-import shutil
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config.settings import LOADER_WORKERS, LOADER_READ_AHEAD, LOADER_ORDER
+from core.scraper.output_store import iter_packed_pages, structure_path_for
+
+LOADER_ORDERS = ("sorted", "filesystem", "completion")
+
 
 def populate_dummy_data(data_dir="docs", lancedb_path="lancedb_rag_data"):
     """
@@ -55,16 +61,158 @@ def populate_dummy_data(data_dir="docs", lancedb_path="lancedb_rag_data"):
 
 
 def read_markdown_files(directory):
-    """Reads all .md files from a directory and its subdirectories."""
-    file_contents = []
-    file_paths = glob.glob(os.path.join(directory, "**", "*.md"), recursive=True)
-    for file_path in file_paths:
+    """
+    Reads all .md files from a directory and its subdirectories into a list.
+
+    A page's section tree saved by the crawler (see `core.scraper.structure`) is
+    attached as "structure" when its JSON file exists. Large corpora should be
+    streamed with `iter_markdown_files` instead.
+    """
+    return list(iter_markdown_files(directory))
+
+
+def _walk_markdown_files(directory, sort):
+    """Yields the .md files below a directory lazily, skipping hidden files and directories like glob does."""
+    if sort:
+        yield from _walk_sorted(directory)
+        return
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [name for name in dirs if not name.startswith('.')]
+        for name in files:
+            if name.endswith(".md") and not name.startswith('.'):
+                yield os.path.join(root, name)
+
+
+def _walk_sorted(directory):
+    """
+    Yields the .md files below a directory in full path order, as sorting every path would.
+
+    Files and subdirectories are sorted together, a subdirectory by its name plus the
+    separator, so "a/b/c.md" comes before "a/z.md" without listing the whole tree first.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = [entry for entry in it if not entry.name.startswith('.')]
+    except OSError:
+        return # Unlistable directories are skipped, as os.walk does
+    keyed = []
+    for entry in entries:
+        if entry.is_dir():
+            keyed.append((entry.name + os.sep, entry))
+        elif entry.name.endswith(".md"):
+            keyed.append((entry.name, entry))
+    for _, entry in sorted(keyed, key=lambda item: item[0]):
+        if entry.is_dir():
+            yield from _walk_sorted(entry.path)
+        else:
+            yield entry.path
+
+
+def _read_document(file_path):
+    """Reads one Markdown file, and its section tree (which also gives the page's URL) if one was saved."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    # Store content along with its original file path for better context
+    document = {"text": content, "source_path": file_path}
+    structure_path = structure_path_for(file_path)
+    if os.path.exists(structure_path):
+        with open(structure_path, 'r', encoding='utf-8') as f:
+            document["structure"] = json.load(f)
+        document["url"] = document["structure"].get("url")
+    return document
+
+
+def iter_markdown_files(directory, workers=LOADER_WORKERS, read_ahead=LOADER_READ_AHEAD, order=LOADER_ORDER):
+    """
+    Streams the .md files of a directory tree, reading them on a thread pool.
+
+    Documents are yielded as soon as they are read, so chunking can start on the
+    first file while later ones are still loading. The directory is walked lazily
+    and at most `read_ahead` documents are read ahead of the consumer, so memory
+    stays flat however large the corpus is. Unreadable files are reported and skipped.
+
+    Args:
+        directory (str): The root directory.
+        workers (int): Threads reading files in parallel.
+        read_ahead (int): Documents read (or being read) ahead of the consumer.
+        order (str): "sorted" yields files in path order, "filesystem" in directory
+                     listing order (no sorting, same result on every run of the same
+                     tree), "completion" as soon as each read finishes.
+
+    Yields:
+        dict: {"text": ..., "source_path": ..., and "structure" if saved} for each file.
+    """
+    if order not in LOADER_ORDERS:
+        raise ValueError(f"Unknown loader order: {order}. Choose from {', '.join(LOADER_ORDERS)}.")
+    read_ahead = max(1, read_ahead)
+    file_paths = _walk_markdown_files(directory, sort=order == "sorted")
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="markdown-loader")
+    pending = {} # future -> file path; dicts keep submission order
+    try:
+        for file_path in file_paths:
+            pending[executor.submit(_read_document, file_path)] = file_path
+            if len(pending) >= read_ahead:
+                if order == "completion":
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                else:
+                    done = [next(iter(pending))]
+                yield from _read_results(done, pending)
+        while pending:
+            if order == "completion":
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                done = [next(iter(pending))]
+            yield from _read_results(done, pending)
+    finally:
+        # Also runs when the consumer stops early; reads not yet started are dropped.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _read_results(futures, pending):
+    """Yields the documents of finished reads (removing them from `pending`), reporting unreadable files."""
+    for future in futures:
+        file_path = pending.pop(future)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Store content along with its original file path for better context
-                file_contents.append({"text": content, "source_path": file_path})
-            print(f"Read: {file_path}")
+            document = future.result()
         except Exception as e:
             print(f"Could not read {file_path}: {e}")
-    return file_contents
+            continue
+        print(f"Read: {file_path}")
+        yield document
+
+
+async def aiter_documents(documents):
+    """
+    Iterates over a blocking document iterator (e.g. `iter_markdown_files`) from
+    async code. Each document is pulled in a worker thread, so the event loop keeps
+    running while the loader waits on disk.
+
+    Yields:
+        dict: The documents, in the iterator's order.
+    """
+    iterator = iter(documents)
+    exhausted = object()
+    while True:
+        document = await asyncio.to_thread(next, iterator, exhausted)
+        if document is exhausted:
+            return
+        yield document
+
+
+def read_packed_markdown(store_path):
+    """
+    Streams the pages of a packed crawl store (see `core.scraper.output_store`).
+
+    Pages are yielded one at a time in crawl order, so large stores never have to
+    fit in memory. `source_path` is the path the page would have had as a file.
+
+    Args:
+        store_path (str): Path of the packed store, e.g. `<output_dir>/pages.sqlite3`.
+
+    Yields:
+        dict: {"text": ..., "source_path": ..., "url": ..., "structure": ...} for each page.
+    """
+    for page in iter_packed_pages(store_path):
+        yield {
+            "text": page["markdown"], "source_path": page["path"], "url": page["url"], "structure": page["structure"],
+        }
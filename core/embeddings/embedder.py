@@ -73,9 +73,9 @@ class Embedder:
             print("Local embedding model is not loaded. Cannot generate local embeddings.")
             return [None] * len(texts)
         try:
-            # SentenceTransformer encode method is synchronous, but we keep the async wrapper
-            # for consistency and potential future use with run_in_executor for large batches.
-            embeddings = self.local_embedding_model.encode(texts, convert_to_list=True)
+            # SentenceTransformer's encode method is synchronous; run it in a thread so the
+            # event loop (e.g. a crawl streaming pages into the index) keeps running.
+            embeddings = await asyncio.to_thread(self.local_embedding_model.encode, texts, convert_to_list=True)
             return embeddings
         except Exception as e:
             print(f"Error generating local embeddings: {e}")
@@ -1,15 +1,24 @@
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
 
 # Import components from their new locations
 from config.settings import (
-    LANCEDB_PATH, TABLE_NAME, USE_LOCAL_EMBEDDINGS, LOCAL_EMBEDDING_MODEL_NAME
+    LANCEDB_PATH, TABLE_NAME, USE_LOCAL_EMBEDDINGS, LOCAL_EMBEDDING_MODEL_NAME,
+    STREAM_QUEUE_SIZE, STREAM_INDEX_BATCH_PAGES, STREAM_INDEX_FLUSH_INTERVAL, LOADER_INDEX_BATCH_PAGES,
 )
-from core.data_ingestion.data_loader import populate_dummy_data, read_markdown_files
+from core.data_ingestion.data_loader import populate_dummy_data, iter_markdown_files, read_packed_markdown, aiter_documents
 from core.chunker.chunker import Chunker
 from core.embeddings.embedder import Embedder
 from core.vector_store.lancedb import LanceDBManager
 from core.retrieval.retrieval import Retriever
+from core.scraper.crawler import crawl_documentation
+from core.scraper.output_store import PACKED_STORE_NAME
+
+# Columns added to the row schema since tables were first written, with the value
+# existing rows get. Rows from before section deep links fall back to their source.
+ROW_COLUMN_BACKFILLS = {"section_url": "source_path"}
 
 
 # --- Main Orchestrator Function ---
@@ -22,8 +31,16 @@ async def run():
     # 1. Initialize components
     embedder, chunker, db_manager, retriever = await initialize_components()
 
-    # # 2. Load data
     DATA_DIR = "temp_docs/istio_docs_general"
+
+    # Scrape docs first (only needed when DATA_DIR is missing or stale)
+    # await scrape_data("https://istio.io/latest/docs/", DATA_DIR, "/docs/")
+
+    # Or crawl and index in one pass, with pages searchable while the crawl runs
+    # (replaces steps 2 and 3 below):
+    # await stream_crawl_and_index("https://istio.io/latest/docs/", "/docs/", DATA_DIR, chunker, embedder, db_manager)
+
+    # # 2. Load data
     raw_documents = load_data(DATA_DIR)
 
     # # 3. Process and Store data
@@ -65,30 +82,48 @@ async def initialize_components():
     print("Components initialized successfully.")
     return embedder, chunker, db_manager, retriever
 
+# --- Optional Scrape Phase ---
+async def scrape_data(base_url: str, output_dir: str, path_filter: str):
+    """
+    Crawls a documentation site into Markdown files using the async crawler.
+
+    Args:
+        base_url (str): The starting URL of the documentation.
+        output_dir (str): The directory to save the scraped Markdown files.
+        path_filter (str): A string that must be in the URL path to be followed.
+    """
+    print(f"\n--- Scraping '{base_url}' into '{output_dir}' ---")
+    await crawl_documentation(base_url=base_url, output_dir=output_dir, path_filter=path_filter)
+
 # --- 2. Loader Phase ---
 def load_data(data_dir: str):
     """
     Loads raw data from the specified directory.
-    Includes populating dummy data and reading markdown files.
+    Includes populating dummy data and reading markdown files, or the packed
+    store if the crawl wrote one to `data_dir`.
 
     Args:
         data_dir (str): The directory containing the markdown files.
 
     Returns:
-        list: A list of dictionaries, each representing a raw document.
+        iterator: Dictionaries, each representing a raw document, read lazily as
+                  they are consumed.
     """
     print(f"\n--- Loading Data from '{data_dir}' ---")
     # Populate dummy data and clean up old LanceDB data for a fresh start
     populate_dummy_data(data_dir=data_dir, lancedb_path=LANCEDB_PATH)
     print(f"LanceDB will be stored at: {LANCEDB_PATH}")
 
-    raw_documents = read_markdown_files(data_dir)
-    print(f"Found {len(raw_documents)} Markdown files.")
-    return raw_documents
+    packed_store = os.path.join(data_dir, PACKED_STORE_NAME)
+    if os.path.exists(packed_store):
+        print(f"Streaming pages from packed store {packed_store}.")
+        return read_packed_markdown(packed_store)
+    print(f"Streaming Markdown files from '{data_dir}'.")
+    return iter_markdown_files(data_dir)
 
 # --- 3. Store Phase (Generate Embeddings and Store) ---
 async def process_and_store_data(
-    raw_documents: list[dict],
+    raw_documents,
     chunker: Chunker,
     embedder: Embedder,
     db_manager: LanceDBManager
@@ -96,41 +131,181 @@ async def process_and_store_data(
     """
     Processes raw documents by chunking, generating embeddings, and storing them in LanceDB.
 
+    Documents are processed as the loader yields them and written to LanceDB every
+    LOADER_INDEX_BATCH_PAGES documents, so neither the documents nor their chunks
+    pile up in memory.
+
     Args:
-        raw_documents (list[dict]): List of raw documents to process.
+        raw_documents (iterable[dict]): Raw documents to process, e.g. from `load_data`.
         chunker (Chunker): An instance of the Chunker.
         embedder (Embedder): An instance of the Embedder.
         db_manager (LanceDBManager): An instance of the LanceDBManager.
     """
     print("\n--- Processing and Storing Data ---")
-    all_documents_to_store = []
-    for doc_idx, raw_doc in enumerate(raw_documents):
-        doc_text = raw_doc["text"]
-        doc_source_path = raw_doc["source_path"]
-
-        print(f"\nProcessing document from: {doc_source_path}")
-        chunks = chunker.chunk_document(doc_text) # Call chunker's method
-        print(f"  Generated {len(chunks)} chunks for this document.")
-
-        chunk_texts = [chunk.text for chunk in chunks]
-        embeddings = await embedder.get_embeddings(chunk_texts) # Call embedder's method
-
-        for i, chunk in enumerate(chunks):
-            if embeddings[i] is not None:
-                doc_id = f"{doc_source_path}_{i}" # Unique ID for each chunk
-                all_documents_to_store.append({
-                    "id": doc_id,
-                    "text": chunk.text,
-                    "source_path": doc_source_path,
-                    "vector": embeddings[i]
-                })
-            else:
-                print(f"  Skipping chunk {i} from {doc_source_path} due to embedding failure.")
-
-    await db_manager.add_documents(all_documents_to_store) # Add all processed documents to LanceDB
+    await db_manager.ensure_columns(ROW_COLUMN_BACKFILLS)
+    documents_to_store = []
+    total_pages = 0
+    async for raw_doc in aiter_documents(raw_documents):
+        documents_to_store.extend(await embed_document(raw_doc, chunker, embedder))
+        total_pages += 1
+        if total_pages % LOADER_INDEX_BATCH_PAGES == 0:
+            await db_manager.add_documents(documents_to_store)
+            documents_to_store = []
+
+    if documents_to_store:
+        await db_manager.add_documents(documents_to_store) # Add the last partial batch to LanceDB
+    print(f"Processed {total_pages} documents.")
     print(f"Total documents in LanceDB table '{TABLE_NAME}': {await db_manager.get_document_count()}")
     print("Data processing and storage complete.")
 
+async def embed_document(raw_doc: dict, chunker: Chunker, embedder: Embedder):
+    """
+    Chunks one raw document and embeds its chunks.
+
+    Documents that come with a section tree are chunked along their sections, and
+    each chunk records a deep link to its section in "section_url"; other chunks
+    link to the page's URL, if known. `source_path` is the page's Markdown path in
+    every mode (files, packed or streamed), so each mode replaces the others' rows.
+
+    Args:
+        raw_doc (dict): A document with "text", "source_path" and optionally "url" and "structure".
+        chunker (Chunker): An instance of the Chunker.
+        embedder (Embedder): An instance of the Embedder.
+
+    Returns:
+        list[dict]: LanceDB rows (id, text, source_path, section_url, vector) for the chunks that embedded.
+    """
+    doc_text = raw_doc["text"]
+    doc_source_path = raw_doc["source_path"]
+
+    print(f"\nProcessing document from: {doc_source_path}")
+    # Chunking is synchronous; keep it off the event loop so a concurrent crawl keeps going.
+    if raw_doc.get("structure"):
+        pieces = await asyncio.to_thread(chunker.chunk_sections, doc_text, raw_doc["structure"])
+    else:
+        chunks = await asyncio.to_thread(chunker.chunk_document, doc_text)
+        page_url = raw_doc.get("url") or doc_source_path
+        pieces = [(chunk.text, page_url) for chunk in chunks]
+    print(f"  Generated {len(pieces)} chunks for this document.")
+
+    chunk_texts = [text for text, _ in pieces]
+    embeddings = await embedder.get_embeddings(chunk_texts) # Call embedder's method
+
+    rows = []
+    for i, (chunk_text, section_url) in enumerate(pieces):
+        if embeddings[i] is not None:
+            doc_id = f"{doc_source_path}_{i}" # Unique ID for each chunk
+            rows.append({
+                "id": doc_id,
+                "text": chunk_text,
+                "source_path": doc_source_path,
+                "section_url": section_url,
+                "vector": embeddings[i]
+            })
+        else:
+            print(f"  Skipping chunk {i} from {doc_source_path} due to embedding failure.")
+    return rows
+
+# --- Optional Streaming Phase (crawl, chunk, embed and store in one pass) ---
+async def stream_crawl_and_index(
+    base_url: str,
+    path_filter: str,
+    output_dir: str,
+    chunker: Chunker,
+    embedder: Embedder,
+    db_manager: LanceDBManager,
+    save_markdown_files: bool = False
+):
+    """
+    Crawls a documentation site and indexes every page while the crawl is still running.
+
+    Extracted pages go from the crawler through a bounded queue straight into
+    chunking, embedding and LanceDB, without writing and re-reading Markdown files.
+    The first pages are searchable seconds after the crawl starts; a slow indexer
+    pauses extraction instead of buffering the whole site in memory.
+
+    Args:
+        base_url (str): The starting URL of the documentation.
+        path_filter (str): A string that must be in the URL path to be followed.
+        output_dir (str): Directory for the crawl state (and Markdown files, if kept).
+        chunker (Chunker): An instance of the Chunker.
+        embedder (Embedder): An instance of the Embedder.
+        db_manager (LanceDBManager): An instance of the LanceDBManager.
+        save_markdown_files (bool): Also write the Markdown files to `output_dir`.
+
+    Returns:
+        dict: The crawl report returned by `crawl_documentation`.
+    """
+    print(f"\n--- Streaming '{base_url}' into LanceDB table '{TABLE_NAME}' ---")
+    page_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    indexer = asyncio.create_task(index_page_stream(page_queue, chunker, embedder, db_manager))
+    try:
+        report = await crawl_documentation(
+            base_url=base_url,
+            output_dir=output_dir,
+            path_filter=path_filter,
+            page_sink=page_queue,
+            save_markdown_files=save_markdown_files,
+        )
+    except BaseException:
+        # Stop the indexer so the crawl's error surfaces instead of a pending task.
+        indexer.cancel()
+        await asyncio.gather(indexer, return_exceptions=True)
+        raise
+    if not indexer.done():
+        await page_queue.put(None) # End-of-stream marker
+    await indexer
+    print(f"Total documents in LanceDB table '{TABLE_NAME}': {await db_manager.get_document_count()}")
+    return report
+
+async def index_page_stream(page_queue: asyncio.Queue, chunker: Chunker, embedder: Embedder, db_manager: LanceDBManager):
+    """
+    Consumes pages from a crawl and writes them to LanceDB in small batches.
+
+    A batch is written once it holds STREAM_INDEX_BATCH_PAGES pages, or when no new
+    page arrived for STREAM_INDEX_FLUSH_INTERVAL seconds. A None item ends the stream.
+
+    Args:
+        page_queue (asyncio.Queue): Pages put there by the crawler's page sink.
+        chunker (Chunker): An instance of the Chunker.
+        embedder (Embedder): An instance of the Embedder.
+        db_manager (LanceDBManager): An instance of the LanceDBManager.
+    """
+    started = time.monotonic()
+    await db_manager.ensure_columns(ROW_COLUMN_BACKFILLS) # Rows are appended to whatever table exists
+    pages_indexed = 0
+    batch = []
+    end_of_stream = False
+    while not end_of_stream:
+        timed_out = False
+        try:
+            page = await asyncio.wait_for(page_queue.get(), timeout=STREAM_INDEX_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            timed_out = True
+        else:
+            if page is None:
+                end_of_stream = True
+            else:
+                batch.append(page)
+
+        if batch and (timed_out or end_of_stream or len(batch) >= STREAM_INDEX_BATCH_PAGES):
+            try:
+                rows = []
+                for page in batch:
+                    rows.extend(await embed_document(page, chunker, embedder))
+                # A recrawled page replaces its old chunks instead of duplicating them.
+                await db_manager.delete_documents([page["source_path"] for page in batch])
+                await db_manager.add_documents(rows)
+            except Exception as e:
+                # Keep consuming: a dead indexer would leave the crawler blocked on a full queue.
+                print(f"❌ Error indexing {len(batch)} streamed pages: {e}")
+            else:
+                if pages_indexed == 0:
+                    print(f"⏱️ First pages searchable after {time.monotonic() - started:.1f}s.")
+                pages_indexed += len(batch)
+            batch = []
+    print(f"Streaming indexer finished: {pages_indexed} pages indexed in {time.monotonic() - started:.1f}s.")
+
 # --- 4. Query and Retriever Phase ---
 async def query_and_retrieve(retriever: Retriever):
     """
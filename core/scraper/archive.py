@@ -0,0 +1,364 @@
+import os
+import gzip
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError: # zstandard is optional; gzip is always available
+    zstandard = None
+
+from config.settings import (
+    SCRAPER_ARCHIVE_CODEC, SCRAPER_ARCHIVE_BATCH_SIZE, SCRAPER_PARSER_BACKEND, SCRAPER_EXTRACT_PROCESSES,
+    SCRAPER_PAGE_STRUCTURE,
+)
+from core.scraper.dedup import DEDUP_DB_NAME, read_aliases
+from core.scraper.extractor import create_markdown_converter, extract_page
+from core.scraper.output_store import OUTPUT_FORMATS, PACKED_STORE_NAME, open_output_store, structure_path_for
+
+ARCHIVE_DIR_NAME = ".archive"
+ARCHIVE_INDEX_NAME = "index.sqlite3"
+ARCHIVE_FILE_NAMES = {"gzip": "responses.warc.gz", "zstd": "responses.warc.zst"}
+REEXTRACT_CHUNK_SIZE = 50
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    """Compresses one record as an independent gzip member or zstd frame."""
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    """Decompresses one record written by `_compress`."""
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def build_warc_record(url: str, status: int, headers, body: bytes, fetched_at: float) -> bytes:
+    """
+    Serializes a fetched response as a WARC/1.1 `response` record.
+
+    Args:
+        url (str): The fetched URL.
+        status (int): The HTTP status code.
+        headers: The response headers (any mapping with `items()`).
+        body (bytes): The response body as received.
+        fetched_at (float): UNIX timestamp of the fetch.
+
+    Returns:
+        bytes: The uncompressed record, including the trailing blank lines.
+    """
+    http_head = [f"HTTP/1.1 {status}"]
+    for name, value in headers.items():
+        # The body is stored decoded, so transfer framing headers no longer apply.
+        if name.lower() in ("content-encoding", "transfer-encoding", "content-length"):
+            continue
+        http_head.append(f"{name}: {value}")
+    http_block = ("\r\n".join(http_head) + "\r\n\r\n").encode("utf-8", errors="replace") + body
+
+    warc_date = datetime.fromtimestamp(fetched_at, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    warc_head = (
+        "WARC/1.1\r\n"
+        "WARC-Type: response\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {warc_date}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        "Content-Type: application/http;msgtype=response\r\n"
+        f"Content-Length: {len(http_block)}\r\n"
+        "\r\n"
+    ).encode("utf-8")
+    return warc_head + http_block + b"\r\n\r\n"
+
+
+def parse_warc_record(record: bytes):
+    """
+    Parses a record produced by `build_warc_record`.
+
+    Returns:
+        tuple: (url, status, headers dict, body bytes)
+    """
+    warc_head, _, rest = record.partition(b"\r\n\r\n")
+    warc_headers = {}
+    for line in warc_head.decode("utf-8", errors="replace").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        warc_headers[name.strip().lower()] = value.strip()
+    http_block = rest[:int(warc_headers.get("content-length", len(rest)))]
+
+    http_head, _, body = http_block.partition(b"\r\n\r\n")
+    head_lines = http_head.decode("utf-8", errors="replace").split("\r\n")
+    status = int(head_lines[0].split()[1])
+    headers = {}
+    for line in head_lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip()] = value.strip()
+    return warc_headers.get("warc-target-uri"), status, headers, body
+
+
+class ResponseArchive:
+    """
+    Append-only archive of raw fetched responses with an index by URL.
+
+    Each response is stored as a WARC/1.1 record compressed on its own (a gzip member
+    or a zstd frame), so the archive can be read at any record offset and, for gzip,
+    by standard WARC tools. A SQLite index maps every URL to its latest record.
+    Markdown can then be regenerated offline with `reextract` after changing the
+    extraction rules, without touching the network.
+    """
+    def __init__(self, archive_dir: str, codec: str = SCRAPER_ARCHIVE_CODEC,
+                 batch_size: int = SCRAPER_ARCHIVE_BATCH_SIZE):
+        """
+        Initializes the archive. Call `open` before writing.
+
+        Args:
+            archive_dir (str): Directory holding the archive and its index.
+            codec (str): "gzip" or "zstd". zstd falls back to gzip if `zstandard` is missing.
+            batch_size (int): Records written between index commits.
+        """
+        if codec == "zstd" and zstandard is None:
+            print("⚠️ zstandard is not installed. Falling back to a gzip archive.")
+            codec = "gzip"
+        if codec not in ARCHIVE_FILE_NAMES:
+            raise ValueError(f"Unknown archive codec: {codec}")
+        self.archive_dir = archive_dir
+        self.codec = codec
+        self.batch_size = batch_size
+        self.archive_path = os.path.join(archive_dir, ARCHIVE_FILE_NAMES[codec])
+        self.index_path = os.path.join(archive_dir, ARCHIVE_INDEX_NAME)
+        self.file = None
+        self.conn = None
+        self._lock = threading.Lock()
+        self._pending_rows = []
+
+    def open(self):
+        """Opens the archive for appending and the index for writing."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self.file = open(self.archive_path, "ab")
+        self.conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS records (
+                url TEXT PRIMARY KEY,
+                file TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+    def write(self, url: str, status: int, headers, body: bytes):
+        """
+        Appends one response. Safe to call from worker threads.
+
+        Args:
+            url (str): The fetched URL.
+            status (int): The HTTP status code.
+            headers: The response headers.
+            body (bytes): The response body.
+        """
+        fetched_at = time.time()
+        compressed = _compress(build_warc_record(url, status, headers, body, fetched_at), self.codec)
+        with self._lock:
+            offset = self.file.tell()
+            self.file.write(compressed)
+            self._pending_rows.append((
+                url, ARCHIVE_FILE_NAMES[self.codec], self.codec, offset, len(compressed), status, fetched_at
+            ))
+            if len(self._pending_rows) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        """Makes written records durable, then indexes them. Caller holds the lock."""
+        if not self._pending_rows:
+            return
+        # Data first, index second: the index never points past the end of the archive.
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO records (url, file, codec, offset, length, status, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending_rows,
+            )
+        self._pending_rows = []
+
+    def flush(self):
+        """Writes buffered index rows."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Flushes and closes the archive and its index."""
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.conn.close()
+        self.file = None
+        self.conn = None
+
+
+def read_archive_index(archive_dir: str) -> list[tuple]:
+    """
+    Lists the latest archived record of every URL.
+
+    Returns:
+        list[tuple]: (url, file, codec, offset, length) rows, ordered by file position.
+    """
+    conn = sqlite3.connect(os.path.join(archive_dir, ARCHIVE_INDEX_NAME))
+    try:
+        return conn.execute(
+            "SELECT url, file, codec, offset, length FROM records WHERE status = 200 ORDER BY file, offset"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def read_record(archive_dir: str, file_name: str, codec: str, offset: int, length: int):
+    """
+    Reads one archived response.
+
+    Returns:
+        tuple: (url, status, headers dict, body bytes)
+    """
+    with open(os.path.join(archive_dir, file_name), "rb") as f:
+        f.seek(offset)
+        return parse_warc_record(_decompress(f.read(length), codec))
+
+
+def _reextract_chunk(archive_dir: str, rows: list[tuple], parser_backend: str, page_structure: bool) -> list[tuple]:
+    """
+    Re-extracts a chunk of archived records; runs inside a worker process.
+
+    Returns:
+        list[tuple]: (url, Markdown, section tree or None) of every page that extracted.
+    """
+    markdown_converter = create_markdown_converter()
+    pages = []
+    open_files = {}
+    try:
+        for url, file_name, codec, offset, length in rows:
+            if file_name not in open_files:
+                open_files[file_name] = open(os.path.join(archive_dir, file_name), "rb")
+            archive_file = open_files[file_name]
+            archive_file.seek(offset)
+            _, _, _, body = parse_warc_record(_decompress(archive_file.read(length), codec))
+
+            structure = {} if page_structure else None
+            markdown_content, _ = extract_page(
+                body, url, url, "", markdown_converter=markdown_converter,
+                parser_backend=parser_backend, find_links=False, structure=structure,
+            )
+            if markdown_content is not None:
+                pages.append((url, markdown_content, structure or None))
+    finally:
+        for archive_file in open_files.values():
+            archive_file.close()
+    return pages
+
+
+def detect_output_format(output_dir: str) -> str:
+    """Returns "packed" if a crawl wrote a packed store to `output_dir`, otherwise "files"."""
+    return "packed" if os.path.exists(os.path.join(output_dir, PACKED_STORE_NAME)) else "files"
+
+
+def reextract(
+    archive_dir: str,
+    output_dir: str,
+    processes: int = SCRAPER_EXTRACT_PROCESSES,
+    parser_backend: str = SCRAPER_PARSER_BACKEND,
+    page_structure: bool = SCRAPER_PAGE_STRUCTURE,
+    dedup_path: str = None,
+    output_format: str = None,
+) -> int:
+    """
+    Regenerates Markdown for every archived page without any network access.
+
+    Records are split into chunks and extracted in parallel across processes, using
+    the current content-area and sidebar selectors; the pages are saved to the same
+    kind of store the crawl wrote. Each page's section tree is rebuilt alongside its
+    Markdown, or removed if `page_structure` is off, so its byte offsets never point
+    into an older version of the page. Pages the crawl recorded as near-duplicate
+    aliases are skipped, as they were during the crawl.
+
+    Args:
+        archive_dir (str): Directory holding the archive and its index.
+        output_dir (str): The directory to save the regenerated Markdown to.
+        processes (int): Number of worker processes.
+        parser_backend (str): HTML parser backend used for extraction.
+        page_structure (bool): Rebuild each page's section tree next to its Markdown.
+        dedup_path (str): The crawl's near-duplicate index. Defaults to the hidden one
+                          inside output_dir.
+        output_format (str): "files" or "packed" (see `core.scraper.output_store`).
+                             Detected from output_dir when omitted.
+
+    Returns:
+        int: The number of pages written.
+    """
+    output_format = output_format or detect_output_format(output_dir)
+    aliases = read_aliases(dedup_path or os.path.join(output_dir, DEDUP_DB_NAME))
+    rows = [row for row in read_archive_index(archive_dir) if row[0] not in aliases]
+    print(f"📦 Re-extracting {len(rows)} archived pages from {archive_dir} into {output_format} output "
+          f"with {processes} processes ({len(aliases)} near-duplicate aliases skipped)...")
+    started = time.monotonic()
+    chunks = [rows[i:i + REEXTRACT_CHUNK_SIZE] for i in range(0, len(rows), REEXTRACT_CHUNK_SIZE)]
+
+    saved = 0
+    store = open_output_store(output_format, output_dir)
+    store.open()
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, processes)) as pool:
+            futures = [
+                pool.submit(_reextract_chunk, archive_dir, chunk, parser_backend, page_structure)
+                for chunk in chunks
+            ]
+            for future in futures:
+                for url, markdown_content, structure in future.result():
+                    path = store.save(markdown_content, url, structure)
+                    if not path:
+                        continue
+                    saved += 1
+                    # A section tree left from the crawl would point into the old Markdown.
+                    stale_structure = structure_path_for(path)
+                    if output_format == "files" and structure is None and os.path.exists(stale_structure):
+                        os.remove(stale_structure)
+    finally:
+        store.close()
+
+    print(f"✅ Re-extracted {saved} pages in {time.monotonic() - started:.1f}s.")
+    return saved
+
+
+def main():
+    """Command line entry point: `python -m core.scraper.archive <output_dir>`."""
+    parser = argparse.ArgumentParser(description="Regenerate Markdown from a crawl's response archive.")
+    parser.add_argument("output_dir", help="The directory the crawl saved its Markdown files to.")
+    parser.add_argument("--archive-dir", default=None,
+                        help="Archive location (defaults to the hidden archive inside output_dir).")
+    parser.add_argument("--processes", type=int, default=SCRAPER_EXTRACT_PROCESSES,
+                        help="Number of worker processes.")
+    parser.add_argument("--parser", default=SCRAPER_PARSER_BACKEND, help="HTML parser backend.")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default=None,
+                        help="Store to write (defaults to the one the crawl wrote).")
+    args = parser.parse_args()
+
+    reextract(
+        archive_dir=args.archive_dir or os.path.join(args.output_dir, ARCHIVE_DIR_NAME),
+        output_dir=args.output_dir,
+        processes=args.processes,
+        parser_backend=args.parser,
+        output_format=args.output_format,
+    )
+
+
+if __name__ == '__main__':
+    main()
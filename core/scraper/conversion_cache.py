@@ -0,0 +1,165 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+import html2text
+
+from config.settings import SCRAPER_CONVERSION_CACHE_MB, SCRAPER_CONVERSION_CACHE_BATCH_SIZE
+
+CONVERSION_CACHE_NAME = ".conversion_cache.sqlite3"
+# html2text options that change its output; the converter's fingerprint covers them all.
+CONVERTER_SETTINGS = (
+    "body_width", "unicode_snob", "escape_snob", "links_each_paragraph", "skip_internal_links",
+    "inline_links", "protect_links", "google_list_indent", "ignore_links", "ignore_mailto_links",
+    "ignore_images", "images_as_html", "images_to_alt", "images_with_size", "ignore_emphasis",
+    "bypass_tables", "ignore_tables", "google_doc", "ul_item_mark", "emphasis_mark", "strong_mark",
+    "single_line_break", "use_automatic_links", "hide_strikethrough", "mark_code", "backquote_code_style",
+    "wrap_list_items", "wrap_links", "wrap_tables", "pad_tables", "default_image_alt", "open_quote",
+    "close_quote", "include_sup_sub", "baseurl",
+)
+
+_readers = threading.local() # Read-only connections of extraction workers, one per thread
+
+
+def converter_fingerprint(markdown_converter) -> str:
+    """Returns a short hash of the html2text version and the converter's output settings."""
+    settings = [(name, getattr(markdown_converter, name, None)) for name in CONVERTER_SETTINGS]
+    return hashlib.sha256(repr((html2text.__version__, settings)).encode("utf-8")).hexdigest()[:16]
+
+
+def conversion_key(fingerprint: str, content: str) -> str:
+    """
+    Builds the cache key of one conversion.
+
+    Args:
+        fingerprint (str): The converter's `converter_fingerprint`.
+        content (str): The pruned content area HTML.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    digest = hashlib.sha256(fingerprint.encode("ascii"))
+    digest.update(content.encode("utf-8", errors="surrogatepass"))
+    return digest.hexdigest()
+
+
+def lookup_conversion(db_path: str, key: str):
+    """
+    Looks up a cached conversion from an extraction worker.
+
+    Workers only read; the crawler process records hits and new conversions in its
+    `ConversionCache`, so the database has a single writer.
+
+    Returns:
+        str: The cached Markdown, or None on a miss or if the cache cannot be read.
+    """
+    connections = getattr(_readers, "connections", None)
+    if connections is None:
+        connections = _readers.connections = {}
+    try:
+        conn = connections.get(db_path)
+        if conn is None:
+            conn = connections[db_path] = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        row = conn.execute("SELECT markdown FROM conversions WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+class ConversionCache:
+    """
+    Caches the Markdown of converted content areas, keyed by a hash of the pruned
+    content HTML and the converter settings.
+
+    Most pages of a recrawl have a byte-identical content area even when the page
+    around it changed (navigation, build timestamps), so their conversion can be
+    reused. The cache is bounded: once it grows past `max_bytes` of Markdown, the
+    least recently used entries are evicted.
+    """
+    def __init__(self, db_path: str, max_bytes: int = SCRAPER_CONVERSION_CACHE_MB * 1024 * 1024,
+                 batch_size: int = SCRAPER_CONVERSION_CACHE_BATCH_SIZE):
+        """
+        Initializes the cache. Call `open` before using it.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+            max_bytes (int): Markdown bytes kept before evicting (0 = unbounded).
+            batch_size (int): Recorded conversions buffered before a commit.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.conn = None # Will be initialized by open()
+        self.total_bytes = 0
+        self.pending = {} # key -> Markdown of new conversions
+        self.touched = set() # keys of cache hits
+        self.hits = 0
+        self.misses = 0
+
+    def open(self):
+        """Opens (or creates) the database, so workers can read it."""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL") # Workers read while the crawler writes
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversions "
+            "(key TEXT PRIMARY KEY, markdown TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS conversions_last_used ON conversions (last_used)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM conversions").fetchone()[0]
+
+    def record(self, key: str, markdown: str, hit: bool):
+        """Records the outcome of one lookup: refreshes a hit, or stores a new conversion."""
+        if hit:
+            self.hits += 1
+            self.touched.add(key)
+        else:
+            self.misses += 1
+            self.pending[key] = markdown
+        if len(self.pending) + len(self.touched) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Commits buffered conversions and hits, then evicts down to the size bound."""
+        if not self.pending and not self.touched:
+            return
+        now = time.time()
+        with self.conn:
+            for key, markdown in self.pending.items():
+                size = len(markdown.encode("utf-8"))
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO conversions (key, markdown, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, markdown, size, now),
+                )
+                self.total_bytes += size * cursor.rowcount
+            self.conn.executemany("UPDATE conversions SET last_used = ? WHERE key = ?",
+                                  [(now, key) for key in self.touched])
+        self.pending.clear()
+        self.touched.clear()
+        if self.max_bytes and self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Deletes the least recently used conversions until the cache fits in `max_bytes`."""
+        evicted = []
+        freed = 0
+        for key, size in self.conn.execute("SELECT key, size FROM conversions ORDER BY last_used"):
+            if self.total_bytes - freed <= self.max_bytes:
+                break
+            evicted.append((key,))
+            freed += size
+        with self.conn:
+            self.conn.executemany("DELETE FROM conversions WHERE key = ?", evicted)
+        self.total_bytes -= freed
+
+    def close(self):
+        """Flushes and closes the database."""
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
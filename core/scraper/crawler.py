@@ -0,0 +1,941 @@
+import os
+import time
+import asyncio
+import aiohttp
+import itertools
+import multiprocessing
+from contextlib import nullcontext
+from functools import partial
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import (
+    SCRAPER_MAX_CONCURRENCY, SCRAPER_MAX_CONCURRENCY_PER_HOST, SCRAPER_REQUEST_TIMEOUT,
+    SCRAPER_DISCOVERY_MODE, SCRAPER_PARSER_BACKEND, SCRAPER_EXTRACT_PROCESSES,
+    SCRAPER_EXTRACT_QUEUE_SIZE, SCRAPER_USER_AGENT, SCRAPER_THROTTLE_RETRIES, SCRAPER_ARCHIVE_RESPONSES,
+    SCRAPER_NEAR_DUP_DETECTION, SCRAPER_EXTRACTION_PROFILES, SCRAPER_FETCH_RETRIES, SCRAPER_OUTPUT_FORMAT,
+    SCRAPER_METRICS_INTERVAL, SCRAPER_METRICS_PORT, SCRAPER_PAGE_STRUCTURE, SCRAPER_RESPECT_ROBOTS,
+    SCRAPER_MAX_DEPTH, SCRAPER_MAX_PAGES, SCRAPER_MAX_BYTES, SCRAPER_MAX_SECONDS,
+    SCRAPER_CONVERT_FROM_TREE, SCRAPER_CONVERSION_CACHE,
+)
+from core.scraper.extractor import extract_page, markdown_path_for_url
+from core.scraper.frontier import CrawlFrontier, FRONTIER_DB_NAME
+from core.scraper.validators import ValidatorStore, VALIDATOR_DB_NAME, content_hash
+from core.scraper.sitemap import discover_sitemap_urls
+from core.scraper.rate_limiter import RateLimiter, THROTTLE_STATUSES, parse_retry_after
+from core.scraper.retry import CircuitBreaker, backoff_delay, is_retryable
+from core.scraper.gating import ContentGate, ResponseSkipped
+from core.scraper.output_store import open_output_store
+from core.scraper.robots import RobotsCache, ROBOTS_CACHE_NAME
+from core.scraper.priority import UrlPrioritizer, CrawlBudget
+from core.scraper.archive import ResponseArchive, ARCHIVE_DIR_NAME
+from core.scraper.urls import UrlCanonicalizer
+from core.scraper.dedup import NearDuplicateIndex, DEDUP_DB_NAME, simhash
+from core.scraper.profiles import ExtractionProfiles, PROFILES_FILE_NAME
+from core.scraper.metrics import CrawlMetrics, MetricsServer, METRICS_TEXTFILE_NAME, METRICS_SUMMARY_NAME
+from core.scraper.conversion_cache import ConversionCache, CONVERSION_CACHE_NAME
+
+ROBOTS_SKIP_REASON = "disallowed by robots.txt"
+
+
+def extract_for_crawl(html, current_url, base_url, path_filter, parser_backend, fingerprint, profile,
+                      page_structure=False, convert_from_tree=SCRAPER_CONVERT_FROM_TREE, conversion_cache_path=None):
+    """
+    Runs `extract_page` in an extraction worker, with everything the crawler needs back.
+
+    Returns:
+        tuple: (markdown or None, links, SimHash fingerprint or None, selector observation,
+                {stage: seconds} timings, section tree or None, conversion cache outcome
+                {"key", "hit"} or None)
+    """
+    observation = {}
+    timings = {}
+    conversion = {}
+    structure = {} if page_structure else None
+    markdown_content, links = extract_page(
+        html, current_url, base_url, path_filter,
+        parser_backend=parser_backend, profile=profile, observation=observation, timings=timings,
+        structure=structure, convert_from_tree=convert_from_tree,
+        conversion_cache_path=conversion_cache_path, conversion=conversion,
+    )
+    page_fingerprint = None
+    if fingerprint and markdown_content:
+        started = time.perf_counter()
+        page_fingerprint = simhash(markdown_content)
+        timings["fingerprint"] = time.perf_counter() - started
+    return markdown_content, links, page_fingerprint, observation, timings, structure or None, conversion or None
+
+
+class DocsCrawler:
+    """
+    Crawls a documentation site concurrently with a pooled aiohttp session.
+
+    The crawl is a two-stage pipeline. Async fetchers, bounded by a global and a
+    per-host concurrency limit, push raw HTML into a bounded queue. Extraction
+    workers feed that HTML to a process pool for parsing, pruning, Markdown
+    conversion and link discovery, then return new links to the frontier. The
+    network and every CPU core stay busy at the same time. Each host gets an
+    adaptive request rate that backs off on throttling and ramps up while the
+    host stays healthy. URL state lives in a `CrawlFrontier`, so an interrupted crawl
+    resumes where it stopped. Recrawls are incremental: pages answering 304 or
+    with an unchanged body hash are not re-extracted or rewritten. In sitemap
+    discovery mode the frontier is seeded from the site's sitemaps up front.
+    Pages whose Markdown is a near-duplicate of a saved page (versioned or
+    localized copies) are recorded as aliases instead of being written. With a
+    `page_sink`, extracted pages are also streamed to a consumer as they arrive.
+    URLs disallowed by robots.txt are skipped, and its Crawl-delay caps the host's
+    request rate. The fetch queue is a priority queue (see `UrlPrioritizer`), so
+    shallow, high-value pages go first and a crawl capped by its depth, page, byte
+    or time budget still covers the important content. Per-stage timings and counters are collected in a `CrawlMetrics` and exported
+    as a Prometheus text file (optionally also over HTTP) and a JSON summary.
+    Content areas identical to ones converted before reuse their cached Markdown
+    (see `ConversionCache`).
+    """
+    def __init__(
+        self,
+        base_url: str,
+        output_dir: str,
+        path_filter: str,
+        max_concurrency: int = SCRAPER_MAX_CONCURRENCY,
+        max_per_host: int = SCRAPER_MAX_CONCURRENCY_PER_HOST,
+        request_timeout: float = SCRAPER_REQUEST_TIMEOUT,
+        state_path: str = None,
+        resume: bool = True,
+        validator_path: str = None,
+        incremental: bool = True,
+        discovery: str = SCRAPER_DISCOVERY_MODE,
+        parser_backend: str = SCRAPER_PARSER_BACKEND,
+        extract_processes: int = SCRAPER_EXTRACT_PROCESSES,
+        extract_queue_size: int = SCRAPER_EXTRACT_QUEUE_SIZE,
+        canonicalizer: UrlCanonicalizer = None,
+        rate_limiter: RateLimiter = None,
+        user_agent: str = SCRAPER_USER_AGENT,
+        throttle_retries: int = SCRAPER_THROTTLE_RETRIES,
+        archive_dir: str = None,
+        archive_responses: bool = SCRAPER_ARCHIVE_RESPONSES,
+        near_duplicates: bool = SCRAPER_NEAR_DUP_DETECTION,
+        dedup_path: str = None,
+        extraction_profiles: bool = SCRAPER_EXTRACTION_PROFILES,
+        profiles_path: str = None,
+        page_sink: asyncio.Queue = None,
+        save_markdown_files: bool = True,
+        fetch_retries: int = SCRAPER_FETCH_RETRIES,
+        circuit_breaker: CircuitBreaker = None,
+        replay_failed: bool = False,
+        content_gate: ContentGate = None,
+        connection_budget=None,
+        process_pool: ProcessPoolExecutor = None,
+        output_format: str = SCRAPER_OUTPUT_FORMAT,
+        metrics: CrawlMetrics = None,
+        metrics_port: int = SCRAPER_METRICS_PORT,
+        metrics_interval: float = SCRAPER_METRICS_INTERVAL,
+        page_structure: bool = SCRAPER_PAGE_STRUCTURE,
+        respect_robots: bool = SCRAPER_RESPECT_ROBOTS,
+        robots_cache: RobotsCache = None,
+        max_depth: int = SCRAPER_MAX_DEPTH,
+        max_pages: int = SCRAPER_MAX_PAGES,
+        max_bytes: int = SCRAPER_MAX_BYTES,
+        max_seconds: float = SCRAPER_MAX_SECONDS,
+        priority_weights: dict = None,
+        convert_from_tree: bool = SCRAPER_CONVERT_FROM_TREE,
+        conversion_cache: bool = SCRAPER_CONVERSION_CACHE,
+        conversion_cache_path: str = None,
+    ):
+        """
+        Initializes the crawler.
+
+        Args:
+            base_url (str): The starting URL of the documentation.
+            output_dir (str): The directory to save the scraped Markdown files.
+            path_filter (str): A string that must be in the URL path to be followed (e.g., '/docs/').
+            max_concurrency (int): Maximum number of requests in flight overall.
+            max_per_host (int): Maximum number of requests in flight per host.
+            request_timeout (float): Total timeout in seconds for a single fetch.
+            state_path (str): Path of the frontier database. Defaults to a hidden
+                              file inside `output_dir`.
+            resume (bool): Resume an interrupted crawl from the frontier if one exists.
+            validator_path (str): Path of the ETag/Last-Modified/hash database. Defaults
+                                  to a hidden file inside `output_dir`.
+            incremental (bool): Send conditional requests and skip unchanged pages. When
+                                False every page is re-extracted, but validators are
+                                still recorded for the next run.
+            discovery (str): How pages are found. "links" follows <a href> links from
+                             the base URL, "sitemap" seeds every page from the site's
+                             sitemaps and does not follow links (falling back to links
+                             when no sitemap is found), "hybrid" does both.
+            parser_backend (str): HTML parser used for extraction: "html.parser",
+                                  "lxml" or "selectolax".
+            extract_processes (int): Size of the extraction process pool. 0 runs
+                                     extraction in threads of this process instead.
+            extract_queue_size (int): Fetched pages waiting for extraction before
+                                      fetchers pause.
+            canonicalizer (UrlCanonicalizer): URL normalization rules. Defaults to the
+                                              rules in `config.settings`.
+            rate_limiter (RateLimiter): Per-host adaptive rate control. Defaults to the
+                                        AIMD settings in `config.settings`.
+            user_agent (str): User-Agent header sent with every request.
+            throttle_retries (int): Times a 429/503 response is retried after backing off.
+            archive_dir (str): Where raw responses are archived. Defaults to a hidden
+                               directory inside `output_dir`.
+            archive_responses (bool): Archive every changed response so Markdown can be
+                                      regenerated offline (see `core.scraper.archive`).
+            near_duplicates (bool): Record pages whose Markdown is a near-duplicate of an
+                                    already saved page as aliases instead of saving them.
+            dedup_path (str): Path of the near-duplicate index database. Defaults to a
+                              hidden file inside `output_dir`.
+            extraction_profiles (bool): Learn per-host extraction profiles so later pages
+                                        only run the selectors that match on that site.
+            profiles_path (str): Where the learned profiles are saved. Defaults to a
+                                 hidden file inside `output_dir`.
+            page_sink (asyncio.Queue): If given, every extracted page is put on this queue as a
+                                       {"text", "source_path", "url", "markdown_path", "structure"}
+                                       dict as soon as it is ready, so a consumer can index pages
+                                       while the crawl runs. `source_path` is the page's Markdown
+                                       path, as the file and packed loaders report it, even when
+                                       no file is written. A bounded queue applies backpressure.
+            save_markdown_files (bool): Save Markdown to `output_dir`. Can only be turned
+                                        off when a `page_sink` receives the pages.
+            fetch_retries (int): Times a URL with a transient error (timeout, connection
+                                  reset, 5xx) is requeued with backoff before it becomes
+                                  a dead letter.
+            circuit_breaker (CircuitBreaker): Per-host breaker; a default one is created
+                                              when omitted.
+            replay_failed (bool): Requeue the previous run's dead letters (see
+                                  `CrawlFrontier.open`).
+            content_gate (ContentGate): Decides which URLs are fetched and which responses
+                                        are downloaded and parsed; a default one is
+                                        created when omitted.
+            connection_budget: An async context manager held around every request, used
+                               by `core.scraper.scheduler` to share one connection budget
+                               fairly between concurrently crawled sites.
+            process_pool (ProcessPoolExecutor): A shared extraction pool, which then sets the
+                                                number of extraction workers instead of
+                                                `extract_processes`. The crawler creates (and
+                                                shuts down) its own when omitted.
+            output_format (str): "files" writes one Markdown file per page; "packed" keeps
+                                 all pages in a single SQLite file in `output_dir` (see
+                                 `core.scraper.output_store`).
+            metrics (CrawlMetrics): Where timings and counters are collected; a new one
+                                    is created when omitted.
+            metrics_port (int): Serve the metrics in the Prometheus format on this local
+                                port while crawling. 0 disables the endpoint.
+            metrics_interval (float): Seconds between rewrites of the Prometheus metrics
+                                      file in `output_dir`.
+            page_structure (bool): Also extract each page's section tree (see
+                                   `core.scraper.structure`) and save it next to the
+                                   Markdown and send it to the `page_sink`.
+            respect_robots (bool): Skip URLs robots.txt disallows for our user agent and
+                                   apply its Crawl-delay. When False robots.txt is not
+                                   fetched at all.
+            robots_cache (RobotsCache): Where robots.txt rules are cached. Defaults to one
+                                        persisted in a hidden file inside `output_dir`.
+            max_depth (int): Links followed away from the base URL. 0 is unlimited.
+            max_pages (int): Stop starting fetches after this many pages. 0 is unlimited.
+            max_bytes (int): Stop starting fetches after downloading this many bytes.
+                             0 is unlimited.
+            max_seconds (float): Stop starting fetches after crawling this long. 0 is
+                                 unlimited. URLs left over when any budget runs out stay
+                                 queued, and the next run resumes them.
+            priority_weights (dict): Regex (searched in the URL path) -> weight, see
+                                     `UrlPrioritizer`. Defaults to `SCRAPER_PRIORITY_PATTERNS`.
+            convert_from_tree (bool): Feed the parsed content area to html2text directly
+                                      instead of serializing it and parsing it again.
+            conversion_cache (bool): Reuse the Markdown of content areas that are identical
+                                     to ones converted before (see `ConversionCache`).
+            conversion_cache_path (str): Path of the conversion cache database. Defaults to
+                                         a hidden file inside `output_dir`.
+        """
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+        # Canonical like every URL the crawl fetches, so host checks on links and
+        # sitemap entries compare like with like (e.g. "Docs.Example.com:443").
+        self.base_url = self.canonicalizer.canonicalize(base_url)
+        self.output_dir = output_dir
+        self.path_filter = path_filter
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.request_timeout = request_timeout
+        self.resume = resume
+        self.incremental = incremental
+        if discovery not in ("links", "sitemap", "hybrid"):
+            raise ValueError(f"Unknown discovery mode: {discovery}")
+        self.discovery = discovery
+        self.parser_backend = parser_backend
+        self.extract_processes = extract_processes
+        self.extract_queue_size = extract_queue_size
+        self.process_pool = process_pool # Created for the duration of run() unless shared
+        self.owns_process_pool = process_pool is None
+        self.connection_budget = connection_budget
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.user_agent = user_agent
+        self.throttle_retries = throttle_retries
+        self.fetch_retries = fetch_retries
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.replay_failed = replay_failed
+        self.content_gate = content_gate or ContentGate()
+        self.metrics = metrics or CrawlMetrics()
+        self.metrics_port = metrics_port
+        self.metrics_interval = metrics_interval
+        self.page_structure = page_structure
+        self.robots = None
+        if respect_robots:
+            self.robots = robots_cache or RobotsCache(user_agent, os.path.join(output_dir, ROBOTS_CACHE_NAME))
+        self.crawl_delays = {} # host -> Crawl-delay applied to the rate limiter
+        self.max_depth = max_depth
+        self.prioritizer = UrlPrioritizer(priority_weights)
+        self.budget = CrawlBudget(max_pages, max_bytes, max_seconds)
+        self._queue_order = itertools.count() # Keeps equal priorities first in, first out
+        self.depth_limited = 0 # Links not followed because of max_depth
+        self.budget_deferred = 0 # URLs left queued because the budget ran out
+        self.attempts = {}
+        self.parked_tasks = set()
+        self.retries = 0
+        self.archive = None
+        if archive_responses:
+            self.archive = ResponseArchive(archive_dir or os.path.join(output_dir, ARCHIVE_DIR_NAME))
+        self.dedup = None
+        if near_duplicates:
+            self.dedup = NearDuplicateIndex(dedup_path or os.path.join(output_dir, DEDUP_DB_NAME))
+        if not save_markdown_files and page_sink is None:
+            raise ValueError("save_markdown_files=False needs a page_sink to deliver pages to.")
+        self.page_sink = page_sink
+        self.save_markdown_files = save_markdown_files
+        self.convert_from_tree = convert_from_tree
+        self.conversion_cache = None
+        if conversion_cache:
+            self.conversion_cache = ConversionCache(
+                conversion_cache_path or os.path.join(output_dir, CONVERSION_CACHE_NAME)
+            )
+        self.profiles = None
+        if extraction_profiles:
+            self.profiles = ExtractionProfiles(profiles_path or os.path.join(output_dir, PROFILES_FILE_NAME))
+        self.follow_links = True
+        self.sitemap_lastmod = {}
+
+        self.frontier = CrawlFrontier(
+            state_path or os.path.join(output_dir, FRONTIER_DB_NAME),
+            key_func=self.canonicalizer.key,
+        )
+        self.output_store = open_output_store(output_format, output_dir)
+        self.validators = ValidatorStore(
+            validator_path or os.path.join(output_dir, VALIDATOR_DB_NAME),
+            output_exists=self.output_store.exists,
+        )
+        self.queue = None # Created inside the running event loop
+        self.extract_queue = None
+        self.visited_urls = set()
+        self.changed_urls = set()
+        self.unchanged_urls = set()
+        self.failed_urls = set()
+        self.aliased_urls = set()
+        self.skipped_urls = {} # URL -> reason it was not fetched or parsed
+        self.host_semaphores = {}
+        self.pages_saved = 0
+        self.pages_streamed = 0
+        self.duplicate_links = 0 # Links whose exact canonical URL was already known
+        self.merged_variants = set() # Raw URLs that only matched a known URL after canonicalization
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Returns the semaphore guarding requests to the URL's host."""
+        host = urlparse(url).netloc
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self.host_semaphores[host]
+
+    def enqueue(self, url: str, depth: int):
+        """Canonicalizes a URL and schedules it unless the frontier already knows it or it is too deep."""
+        if self.max_depth and depth > self.max_depth:
+            self.depth_limited += 1
+            return
+        canonical_url = self.canonicalizer.canonicalize(url)
+        if self.frontier.add(canonical_url, depth):
+            reason = self.content_gate.url_skip_reason(canonical_url) or self._robots_skip_reason(canonical_url)
+            if reason:
+                self._skip(canonical_url, depth, reason)
+            else:
+                self._schedule(canonical_url, depth)
+        elif canonical_url == url:
+            self.duplicate_links += 1
+        else:
+            self.merged_variants.add(url)
+
+    def _schedule(self, url: str, depth: int):
+        """Puts a URL on the fetch queue at its priority."""
+        self.queue.put_nowait((self.prioritizer.score(url, depth), next(self._queue_order), url, depth))
+
+    def _robots_skip_reason(self, url: str):
+        """
+        Checks a URL against already cached robots.txt rules, without fetching.
+
+        Returns:
+            str: A skip reason if the URL is disallowed, otherwise None. URLs of
+                 hosts whose rules are not cached yet are checked again before fetching.
+        """
+        if self.robots is None:
+            return None
+        rules = self.robots.cached_rules(url)
+        if rules is not None and not rules.allowed(url):
+            return ROBOTS_SKIP_REASON
+        return None
+
+    async def _robots_allow(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """Checks a URL against its host's robots.txt, fetching it if needed, and applies its Crawl-delay."""
+        rules = await self.robots.rules_for(session, url)
+        host = urlparse(url).netloc
+        if rules.crawl_delay and self.crawl_delays.get(host) != rules.crawl_delay:
+            print(f"🤖 robots.txt asks for a Crawl-delay of {rules.crawl_delay}s on {host}.")
+            self.rate_limiter.set_crawl_delay(host, rules.crawl_delay)
+            self.crawl_delays[host] = rules.crawl_delay
+        return rules.allowed(url)
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str, headers: dict = None):
+        """
+        Fetches a single URL, respecting the host's rate and concurrency limits.
+
+        429 and 503 responses slow the host down, honor Retry-After, and are
+        retried up to `throttle_retries` times before giving up. Bodies are
+        streamed through the content gate, which can abandon them early.
+
+        Args:
+            headers (dict): Extra request headers, e.g. conditional request validators.
+
+        Returns:
+            tuple: (status, body, headers). The body is empty for a 304.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If the fetch failed.
+            ResponseSkipped: If the response is not HTML or is too large.
+        """
+        throttled = 0
+        while True:
+            await self.rate_limiter.acquire(url)
+            async with self._host_semaphore(url), (self.connection_budget or nullcontext()):
+                started = time.monotonic()
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        latency = time.monotonic() - started
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        self.rate_limiter.record(url, response.status, latency, retry_after)
+                        if response.status in THROTTLE_STATUSES and throttled < self.throttle_retries:
+                            throttled += 1
+                            self.metrics.inc("throttled", status=response.status)
+                            print(f"  -> 🐢 {response.status} from {url}, backing off "
+                                  f"(retry {throttled}/{self.throttle_retries})")
+                            continue
+                        self.metrics.inc("responses", status=response.status)
+                        response.raise_for_status()
+                        download_started = time.perf_counter()
+                        if response.status == 304:
+                            body = await response.read()
+                        else:
+                            body = await self.content_gate.read_body(response)
+                        self.metrics.observe("download", time.perf_counter() - download_started)
+                        self.metrics.inc("bytes_downloaded", len(body))
+                        return response.status, body, response.headers.copy()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    self.rate_limiter.record(url, 0, time.monotonic() - started)
+                    raise
+
+    def _park(self, url: str, depth: int, delay: float):
+        """
+        Puts a URL back on the fetch queue after `delay` seconds without holding a worker.
+
+        The URL's `task_done` is deferred until it is back in the queue, so the crawl
+        cannot finish while URLs are parked.
+        """
+        task = asyncio.create_task(self._requeue_after(url, depth, delay))
+        self.parked_tasks.add(task)
+        task.add_done_callback(self.parked_tasks.discard)
+
+    async def _requeue_after(self, url: str, depth: int, delay: float):
+        """Sleeps, requeues the URL, then releases its previous queue slot."""
+        try:
+            await asyncio.sleep(delay)
+            self._schedule(url, depth)
+        finally:
+            self.queue.task_done()
+
+    def _handle_fetch_error(self, url: str, depth: int, error: Exception) -> bool:
+        """
+        Retries a URL after a transient fetch error, or records it as a dead letter.
+
+        Returns:
+            bool: True if the URL was parked for a retry (its `task_done` is then deferred).
+        """
+        message = str(error) or type(error).__name__
+        retryable = is_retryable(error)
+        if isinstance(error, aiohttp.ClientResponseError):
+            self.metrics.inc("errors", error_class=f"http_{error.status}")
+        else:
+            self.metrics.inc("errors", error_class=type(error).__name__)
+        if retryable:
+            self.circuit_breaker.record_failure(url)
+        elif isinstance(error, aiohttp.ClientResponseError):
+            self.circuit_breaker.record_success(url) # The host answered; the page is just gone
+
+        attempts = self.attempts.get(url, 0) + 1
+        self.attempts[url] = attempts
+        if not retryable or attempts > self.fetch_retries:
+            print(f"❌ Error fetching {url}: {message}. Giving up after {attempts} attempt(s).")
+            self._fail(url, depth, f"{message} (after {attempts} attempts)")
+            return False
+
+        delay = backoff_delay(attempts)
+        print(f"  -> 🔁 {message} for {url}, retry {attempts}/{self.fetch_retries} in {delay:.1f}s")
+        self.retries += 1
+        self.metrics.inc("retries")
+        self.frontier.mark_retrying(url, depth, message)
+        self._park(url, depth, delay)
+        return True
+
+    def _skip(self, url: str, depth: int, reason: str):
+        """Records a URL that is deliberately not fetched or parsed."""
+        print(f"  -> ⏭️ Skipping {url}: {reason}")
+        self.skipped_urls[url] = reason
+        self.metrics.inc("pages_skipped")
+        self.frontier.mark_skipped(url, depth, reason)
+
+    def _fail(self, url: str, depth: int, error: str):
+        """Records a URL that could not be fetched or processed."""
+        self.failed_urls.add(url)
+        self.metrics.inc("pages_failed")
+        self.frontier.mark_failed(url, depth, error)
+
+    def _unchanged_by_lastmod(self, url: str) -> bool:
+        """Returns True if the sitemap says the page has not changed since we last fetched it."""
+        lastmod = self.sitemap_lastmod.get(url)
+        record = self.validators.get(url)
+        return bool(
+            self.incremental and lastmod is not None and record and
+            record["fetched_at"] >= lastmod and
+            self.validators.is_unchanged(url, record["content_hash"])
+        )
+
+    def _reuse_unchanged(self, url: str, depth: int, record: dict, etag: str, last_modified: str):
+        """Skips extraction for an unchanged page and follows the links stored for it."""
+        print(f"  -> 💤 Unchanged since last crawl, keeping {record['markdown_path']}")
+        self.unchanged_urls.add(url)
+        self.metrics.inc("pages_unchanged")
+        self.validators.update_validators(url, etag, last_modified)
+        if self.follow_links:
+            for link in record["links"]:
+                self.enqueue(link, depth + 1)
+        self.frontier.mark_done(url, depth)
+
+    async def process_url(self, session: aiohttp.ClientSession, url: str, depth: int) -> bool:
+        """
+        Fetch stage: fetches one page and hands changed pages to the extraction stage.
+
+        Returns:
+            bool: True if the page was queued for extraction or parked for a retry.
+                  The extraction stage (or the retry) then owns the URL's `task_done`
+                  on the fetch queue.
+        """
+        if self.budget.exhausted():
+            self._defer_for_budget()
+            return False
+
+        if self._unchanged_by_lastmod(url):
+            print(f"Scraping: {url}")
+            self._reuse_unchanged(url, depth, self.validators.get(url), None, None)
+            return False
+
+        # While the host's circuit is open its URLs wait outside the queue, so
+        # workers keep crawling other hosts instead of hammering this one.
+        wait = self.circuit_breaker.wait_time(url)
+        if wait > 0:
+            self._park(url, depth, wait)
+            return True
+
+        if self.robots is not None and not await self._robots_allow(session, url):
+            self._skip(url, depth, ROBOTS_SKIP_REASON)
+            return False
+
+        # Other fetches may have used up the budget while this one waited for robots.txt.
+        if not self.budget.reserve():
+            self._defer_for_budget()
+            return False
+
+        print(f"Scraping: {url}")
+        self.frontier.mark_in_flight(url, depth)
+        headers = self.validators.conditional_headers(url) if self.incremental else None
+        try:
+            status, body, response_headers = await self.fetch(session, url, headers)
+        except ResponseSkipped as e:
+            self.budget.release()
+            self.circuit_breaker.record_success(url)
+            self._skip(url, depth, e.reason)
+            return False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.budget.release()
+            return self._handle_fetch_error(url, depth, e)
+        self.circuit_breaker.record_success(url)
+        self.budget.record(len(body))
+
+        self.visited_urls.add(url)
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+
+        record = self.validators.get(url)
+        if status == 304:
+            if record is None:
+                print(f"❌ Got 304 for {url} without a stored copy. Skipping.")
+                self._fail(url, depth, "304 without stored validators")
+                return False
+            self._reuse_unchanged(url, depth, record, etag, last_modified)
+            return False
+
+        body_hash = content_hash(body)
+        if self.incremental and self.validators.is_unchanged(url, body_hash):
+            self._reuse_unchanged(url, depth, record, etag, last_modified)
+            return False
+
+        if self.archive is not None:
+            await asyncio.to_thread(self.archive.write, url, status, response_headers, body)
+
+        # Blocks while the extraction stage is saturated, pausing this fetcher.
+        await self.extract_queue.put((url, depth, body, etag, last_modified, body_hash))
+        return True
+
+    def _defer_for_budget(self):
+        """Leaves a URL queued in the frontier for the next run because the budget is spent."""
+        if not self.budget_deferred:
+            print(f"⏹️ Crawl {self.budget.exhausted_reason}. Leaving the remaining URLs queued for the next run.")
+        self.budget_deferred += 1
+
+    async def _run_extraction(self, body: bytes, url: str):
+        """
+        Runs extraction (and fingerprinting) in the process pool, or in a thread if there is none.
+
+        Returns:
+            tuple: (markdown or None, links, SimHash fingerprint or None, section tree or None)
+        """
+        profile = self.profiles.profile_for(url) if self.profiles is not None else None
+        job = partial(
+            extract_for_crawl, body, url, self.base_url, self.path_filter,
+            self.parser_backend, self.dedup is not None, profile, self.page_structure, self.convert_from_tree,
+            self.conversion_cache.db_path if self.conversion_cache is not None else None,
+        )
+        started = time.perf_counter()
+        if self.process_pool is None:
+            result = await asyncio.to_thread(job)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(self.process_pool, job)
+        markdown_content, new_links, fingerprint, observation, timings, structure, conversion = result
+        # Wall time including the wait for a free worker, next to the CPU stages.
+        timings["extraction"] = time.perf_counter() - started
+        self.metrics.observe_all(timings)
+        if conversion is not None and markdown_content is not None:
+            self.conversion_cache.record(conversion["key"], markdown_content, conversion["hit"])
+            self.metrics.inc("conversion_cache", result="hit" if conversion["hit"] else "miss")
+        if self.profiles is not None:
+            self.profiles.observe(url, observation, profiled=profile is not None)
+        return markdown_content, new_links, fingerprint, structure
+
+    async def extract_and_save(self, url, depth, body, etag, last_modified, body_hash):
+        """Extraction stage: converts and saves one fetched page, then schedules its links."""
+        markdown_content, new_links, fingerprint, structure = await self._run_extraction(body, url)
+        previous_fingerprint = None
+        if fingerprint is not None:
+            duplicate = self.dedup.find_duplicate(url, fingerprint)
+            if duplicate:
+                original_url, distance = duplicate
+                print(f"  -> 🪞 Near-duplicate of {original_url} ({distance} bits apart), recorded as an alias.")
+                self._record_alias(url, original_url, distance)
+                markdown_content = None
+            else:
+                # Registered before saving: a near-duplicate whose extraction finishes
+                # while this page is being written must find it.
+                previous_fingerprint = self.dedup.fingerprints.get(url)
+                self.dedup.add(url, fingerprint)
+
+        saved_path = None
+        delivered = markdown_content is None
+        if markdown_content is not None:
+            if self.save_markdown_files:
+                started = time.perf_counter()
+                saved_path = await asyncio.to_thread(self.output_store.save, markdown_content, url, structure)
+                self.metrics.observe("write", time.perf_counter() - started)
+                if saved_path:
+                    self.pages_saved += 1
+                    self.metrics.inc("pages_saved")
+            delivered = bool(saved_path) or not self.save_markdown_files
+            if delivered and self.page_sink is not None:
+                # Blocks while the consumer (e.g. the indexer) is behind, pausing extraction.
+                await self.page_sink.put({
+                    "text": markdown_content, "source_path": saved_path or markdown_path_for_url(url, self.output_dir),
+                    "url": url, "markdown_path": saved_path, "structure": structure,
+                })
+                self.pages_streamed += 1
+                self.metrics.inc("pages_streamed")
+            if not delivered and fingerprint is not None: # Nothing was saved for later pages to match
+                if previous_fingerprint is None:
+                    self.dedup.remove(url)
+                else:
+                    self.dedup.add(url, previous_fingerprint)
+        # Only remember validators once the output is safely delivered, so a failed
+        # write is retried on the next crawl instead of being treated as unchanged.
+        if delivered:
+            self.validators.put(url, etag, last_modified, body_hash, saved_path, new_links)
+        self.changed_urls.add(url)
+
+        if self.follow_links:
+            for link in new_links:
+                self.enqueue(link, depth + 1)
+        self.frontier.mark_done(url, depth)
+
+    def _record_alias(self, url: str, original_url: str, distance: int):
+        """Records a near-duplicate page and drops the Markdown an earlier crawl saved for it."""
+        self.dedup.add_alias(url, original_url, distance)
+        self.aliased_urls.add(url)
+        self.metrics.inc("pages_aliased")
+        record = self.validators.get(url)
+        if record and record["markdown_path"]:
+            self.output_store.remove(record["markdown_path"])
+
+    async def _fetch_worker(self, session: aiohttp.ClientSession):
+        """Pulls URLs off the fetch queue until cancelled."""
+        while True:
+            _, _, url, depth = await self.queue.get()
+            self.metrics.set_gauge("fetch_queue_depth", self.queue.qsize())
+            self.metrics.set_gauge("extract_queue_depth", self.extract_queue.qsize())
+            self.metrics.set_gauge("parked_urls", len(self.parked_tasks))
+            handed_off = False
+            try:
+                handed_off = await self.process_url(session, url, depth)
+            except Exception as e:
+                print(f"❌ Unexpected error processing {url}: {e}")
+                self.metrics.inc("errors", error_class=type(e).__name__)
+                self._fail(url, depth, str(e) or type(e).__name__)
+            finally:
+                if not handed_off:
+                    self.queue.task_done()
+
+    async def _extract_worker(self):
+        """Pulls fetched pages off the extraction queue until cancelled."""
+        while True:
+            url, depth, body, etag, last_modified, body_hash = await self.extract_queue.get()
+            try:
+                await self.extract_and_save(url, depth, body, etag, last_modified, body_hash)
+            except Exception as e:
+                print(f"❌ Unexpected error extracting {url}: {e}")
+                self.metrics.inc("errors", error_class=f"extract_{type(e).__name__}")
+                self._fail(url, depth, str(e) or type(e).__name__)
+            finally:
+                self.extract_queue.task_done()
+                # The URL is only finished once its links are in the frontier, so the
+                # fetch queue cannot drain while extraction is still producing work.
+                self.queue.task_done()
+
+    async def run(self):
+        """
+        Runs the crawl until no URLs are left to visit.
+
+        Returns:
+            dict: A crawl report with the sets of `visited`, `changed`, `unchanged`,
+                  `failed` and `aliased` (near-duplicate) URLs of this run,
+                  `skipped`, a mapping of gated URLs to the reason, `metrics`,
+                  the `CrawlMetrics.summary()` of the run, and `budget_exhausted`,
+                  why the crawl stopped early (None if it ran to the end).
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.queue = asyncio.PriorityQueue()
+        self.extract_queue = asyncio.Queue(maxsize=self.extract_queue_size)
+        self.output_store.open()
+        self.validators.open()
+        if self.archive is not None:
+            self.archive.open()
+        if self.dedup is not None:
+            self.dedup.open()
+        if self.profiles is not None:
+            self.profiles.open()
+        if self.robots is not None:
+            self.robots.open()
+        if self.conversion_cache is not None:
+            self.conversion_cache.open()
+        pending = self.frontier.open(resume=self.resume, replay_failed=self.replay_failed)
+        for url, depth in pending:
+            self._schedule(url, depth)
+        if not self.frontier.known_urls:
+            self.enqueue(self.base_url, 0)
+
+        try:
+            self.budget.start()
+            await self._crawl()
+            if not self.budget_deferred:
+                self.frontier.complete()
+        finally:
+            self.frontier.close()
+            self.validators.close()
+            self.output_store.close()
+            if self.archive is not None:
+                self.archive.close()
+            if self.dedup is not None:
+                self.dedup.close()
+            if self.profiles is not None:
+                self.profiles.close()
+            if self.robots is not None:
+                self.robots.close()
+            if self.conversion_cache is not None:
+                self.conversion_cache.close()
+
+        print(f"\nScraping complete! ✨ Visited {len(self.visited_urls)} pages, saved {self.pages_saved}.")
+        if self.page_sink is not None:
+            print(f"📤 Streamed {self.pages_streamed} pages to the page sink.")
+        print(f"🔄 {len(self.changed_urls)} changed, {len(self.unchanged_urls)} unchanged, "
+              f"{len(self.failed_urls)} failed, {len(self.skipped_urls)} skipped by the content gate or robots.txt.")
+        print(f"🐢 Final request rates (req/s): {self.rate_limiter.summary()}")
+        print(f"🔁 {self.retries} retries, {self.circuit_breaker.trips} circuit breaker trips, "
+              f"{len(self.failed_urls)} URLs in the dead-letter list.")
+        print(f"🔗 Canonicalization merged {len(self.merged_variants)} URL variants (fetches saved); "
+              f"{self.duplicate_links} exact duplicate links skipped.")
+        if self.budget_deferred or self.depth_limited:
+            print(f"⏹️ {self.budget_deferred} URLs deferred to the next run "
+                  f"({self.budget.exhausted_reason or 'no budget reached'}); "
+                  f"{self.depth_limited} links beyond max depth {self.max_depth} not followed.")
+        if self.dedup is not None:
+            print(f"🪞 {len(self.aliased_urls)} near-duplicate pages recorded as aliases this run "
+                  f"({len(self.dedup.aliases)} known in total).")
+        if self.conversion_cache is not None:
+            print(f"🗃️ Conversion cache: {self.conversion_cache.hits} hits, {self.conversion_cache.misses} misses "
+                  f"({self.conversion_cache.total_bytes / 1e6:.1f} MB cached).")
+        if self.profiles is not None and self.profiles.profiled_pages:
+            print(f"🧭 {self.profiles.profiled_pages} pages extracted with a site profile, "
+                  f"{self.profiles.fallback_pages} fell back to the full selector search.")
+        metrics_summary = self._write_metrics(final=True)
+        stage_means = ", ".join(
+            f"{stage} {stats['mean'] * 1000:.1f}/{stats['p95'] * 1000:.0f}"
+            for stage, stats in metrics_summary["stages"].items()
+        )
+        print(f"⏱️ {metrics_summary['pages_per_second']} pages/s, "
+              f"{self.metrics.counter_total('bytes_downloaded') / 1e6:.1f} MB downloaded. "
+              f"Stage mean/p95 ms: {stage_means or 'n/a'}")
+        return {
+            "visited": self.visited_urls,
+            "changed": self.changed_urls,
+            "unchanged": self.unchanged_urls,
+            "failed": self.failed_urls,
+            "aliased": self.aliased_urls,
+            "skipped": self.skipped_urls,
+            "metrics": metrics_summary,
+            "budget_exhausted": self.budget.exhausted_reason,
+        }
+
+    def _write_metrics(self, final: bool = False):
+        """
+        Writes the Prometheus metrics file, and at the end of the crawl the JSON summary.
+
+        Returns:
+            dict: The JSON summary when `final`, otherwise None.
+        """
+        try:
+            self.metrics.write_prometheus(os.path.join(self.output_dir, METRICS_TEXTFILE_NAME))
+            if not final:
+                return None
+            summary = self.metrics.summary()
+            summary_path = os.path.join(self.output_dir, METRICS_SUMMARY_NAME)
+            self.metrics.write_summary(summary_path)
+            print(f"📈 Crawl metrics written to {summary_path}")
+            return summary
+        except OSError as e:
+            print(f"⚠️ Could not write crawl metrics: {e}")
+            return self.metrics.summary() if final else None
+
+    async def _export_metrics_periodically(self):
+        """Refreshes the Prometheus metrics file every `metrics_interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            self._write_metrics()
+
+    async def _crawl(self):
+        """Runs the fetch and extraction workers until the frontier is drained."""
+        if not self.owns_process_pool:
+            # Sized from the shared pool; this crawler's own extract_processes does not apply.
+            extract_workers = self.process_pool._max_workers * 2
+        elif self.extract_processes > 0:
+            # spawn rather than fork: forking a process that runs an event loop and
+            # helper threads can deadlock the children.
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=self.extract_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            extract_workers = self.extract_processes * 2 # Keep the pool fed while results are handled
+        else:
+            extract_workers = self.max_concurrency
+
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.max_per_host)
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        metrics_server = None
+        if self.metrics_port:
+            metrics_server = MetricsServer(self.metrics, self.metrics_port)
+            await metrics_server.start()
+        exporter = asyncio.create_task(self._export_metrics_periodically())
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector, timeout=timeout, headers={"User-Agent": self.user_agent},
+                trace_configs=[self.metrics.trace_config()],
+            ) as session:
+                if self.robots is not None:
+                    await self._robots_allow(session, self.base_url) # Loads the base host's rules up front
+                if self.discovery != "links":
+                    await self._seed_from_sitemaps(session)
+                workers = [
+                    asyncio.create_task(self._fetch_worker(session))
+                    for _ in range(self.max_concurrency)
+                ]
+                workers.extend(
+                    asyncio.create_task(self._extract_worker())
+                    for _ in range(extract_workers)
+                )
+                await self.queue.join()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            exporter.cancel()
+            if metrics_server is not None:
+                await metrics_server.close()
+            for task in list(self.parked_tasks):
+                task.cancel()
+            if self.owns_process_pool and self.process_pool is not None:
+                self.process_pool.shutdown(cancel_futures=True)
+                self.process_pool = None
+
+    async def _seed_from_sitemaps(self, session: aiohttp.ClientSession):
+        """Queues every page listed in the site's sitemaps before crawling starts."""
+        robots_text = self.robots.cached_text(self.base_url) if self.robots is not None else None
+        sitemap_pages = await discover_sitemap_urls(session, self.base_url, self.path_filter, robots_text=robots_text)
+        self.sitemap_lastmod = {
+            self.canonicalizer.canonicalize(url): lastmod for url, lastmod in sitemap_pages.items()
+        }
+        if not self.sitemap_lastmod:
+            print("⚠️ No usable sitemap found. Falling back to link discovery.")
+            return
+        if self.discovery == "sitemap":
+            self.follow_links = False
+
+        for url in self.sitemap_lastmod:
+            self.enqueue(url, 1)
+        unchanged = sum(1 for url in self.sitemap_lastmod if self._unchanged_by_lastmod(url))
+        print(f"🗺️ Seeded {len(self.sitemap_lastmod)} pages from sitemaps; "
+              f"{len(self.sitemap_lastmod) - unchanged} need fetching, {unchanged} unchanged by <lastmod>.")
+
+
+async def crawl_documentation(base_url: str, output_dir: str, path_filter: str, **crawler_options):
+    """
+    Async entry point for crawling a documentation site. Use this from code that
+    already runs inside an event loop (e.g. `core/runner/run.py`).
+
+    Args:
+        base_url (str): The starting URL of the documentation.
+        output_dir (str): The directory to save the scraped Markdown files.
+        path_filter (str): A string that must be in the URL path to be followed (e.g., '/docs/').
+        **crawler_options: Forwarded to `DocsCrawler` (concurrency limits, timeouts,
+                           frontier and incremental-crawl settings).
+
+    Returns:
+        dict: A crawl report with the sets of `visited`, `changed`, `unchanged`
+              and `failed` URLs of this run.
+    """
+    crawler = DocsCrawler(base_url=base_url, output_dir=output_dir, path_filter=path_filter, **crawler_options)
+    return await crawler.run()
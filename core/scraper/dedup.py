@@ -0,0 +1,222 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+from collections import Counter
+
+from config.settings import (
+    SCRAPER_NEAR_DUP_MAX_DISTANCE, SCRAPER_NEAR_DUP_MIN_WORDS, SCRAPER_NEAR_DUP_SHINGLE_SIZE,
+    SCRAPER_NEAR_DUP_BATCH_SIZE, SCRAPER_FRONTIER_FLUSH_INTERVAL,
+)
+
+DEDUP_DB_NAME = ".dedup.sqlite3"
+FINGERPRINT_BITS = 64
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def simhash(text: str, shingle_size: int = SCRAPER_NEAR_DUP_SHINGLE_SIZE,
+            min_words: int = SCRAPER_NEAR_DUP_MIN_WORDS):
+    """
+    Computes a 64-bit SimHash fingerprint of a text from its word shingles.
+
+    Texts that differ only slightly (a version banner, a localized footer) get
+    fingerprints a few bits apart.
+
+    Args:
+        text (str): The page's Markdown.
+        shingle_size (int): Number of consecutive words per feature.
+        min_words (int): Texts shorter than this get no fingerprint; tiny pages collide too easily.
+
+    Returns:
+        int: The fingerprint, or None if the text is too short.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < max(min_words, shingle_size):
+        return None
+
+    features = Counter(
+        " ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)
+    )
+    weights = [0] * FINGERPRINT_BITS
+    for feature, count in features.items():
+        feature_hash = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            if feature_hash >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Returns the number of differing bits between two fingerprints."""
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """
+    Finds pages whose SimHash is within `max_distance` bits of an already saved page.
+
+    Fingerprints are split into `max_distance + 1` blocks; by the pigeonhole principle
+    two fingerprints within the distance share at least one identical block, so a
+    lookup only compares against pages in the matching buckets instead of every page.
+    Fingerprints and recorded aliases persist in SQLite so incremental recrawls still
+    detect duplicates of pages that were not re-extracted. Like the frontier, writes
+    are buffered and committed in batches.
+    """
+    def __init__(self, db_path: str, max_distance: int = SCRAPER_NEAR_DUP_MAX_DISTANCE,
+                 batch_size: int = SCRAPER_NEAR_DUP_BATCH_SIZE,
+                 flush_interval: float = SCRAPER_FRONTIER_FLUSH_INTERVAL):
+        """
+        Initializes the index. Call `open` before using it.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+            max_distance (int): Largest Hamming distance (out of 64 bits) treated as a near-duplicate.
+            batch_size (int): Number of buffered fingerprints and aliases that triggers a flush.
+            flush_interval (float): Seconds after which buffered writes are flushed anyway.
+        """
+        self.db_path = db_path
+        self.max_distance = max_distance
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.num_blocks = max_distance + 1
+        self.block_bits = -(-FINGERPRINT_BITS // self.num_blocks) # Ceiling division
+        self.conn = None # Will be initialized by open()
+        self.fingerprints = {}
+        self.buckets = [{} for _ in range(self.num_blocks)]
+        self.aliases = {}
+        self._pending_writes = {} # url -> ("saved", fingerprint), ("alias",) or ("removed",)
+        self._last_flush = time.monotonic()
+
+    def open(self):
+        """Opens (or creates) the database and loads known fingerprints and aliases."""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS fingerprints (url TEXT PRIMARY KEY, fingerprint TEXT NOT NULL)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS aliases (url TEXT PRIMARY KEY, original_url TEXT NOT NULL, distance INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+        for url, fingerprint in self.conn.execute("SELECT url, fingerprint FROM fingerprints"):
+            self._index(url, int(fingerprint, 16))
+        for url, original_url, distance in self.conn.execute("SELECT url, original_url, distance FROM aliases"):
+            self.aliases[url] = (original_url, distance)
+
+    def _blocks(self, fingerprint: int):
+        """Yields (block number, block value) pairs of a fingerprint."""
+        mask = (1 << self.block_bits) - 1
+        for block in range(self.num_blocks):
+            yield block, fingerprint >> (block * self.block_bits) & mask
+
+    def _index(self, url: str, fingerprint: int):
+        """Adds a fingerprint to the in-memory buckets."""
+        self._unindex(url)
+        self.fingerprints[url] = fingerprint
+        for block, value in self._blocks(fingerprint):
+            self.buckets[block].setdefault(value, set()).add(url)
+
+    def _unindex(self, url: str):
+        """Removes a URL's previous fingerprint from the in-memory buckets."""
+        fingerprint = self.fingerprints.pop(url, None)
+        if fingerprint is None:
+            return
+        for block, value in self._blocks(fingerprint):
+            bucket = self.buckets[block].get(value)
+            if bucket:
+                bucket.discard(url)
+
+    def find_duplicate(self, url: str, fingerprint: int):
+        """
+        Looks for a saved page that is a near-duplicate of this one.
+
+        Returns:
+            tuple: (original_url, distance) of the closest match, or None.
+        """
+        best = None
+        for block, value in self._blocks(fingerprint):
+            for candidate in self.buckets[block].get(value, ()):
+                if candidate == url:
+                    continue
+                distance = hamming_distance(fingerprint, self.fingerprints[candidate])
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (candidate, distance)
+        return best
+
+    def add(self, url: str, fingerprint: int):
+        """Records the fingerprint of a page that was saved."""
+        self._index(url, fingerprint)
+        self.aliases.pop(url, None)
+        self._record(url, ("saved", fingerprint))
+
+    def add_alias(self, url: str, original_url: str, distance: int):
+        """Records that a page was skipped as a near-duplicate of another."""
+        self._unindex(url)
+        self.aliases[url] = (original_url, distance)
+        self._record(url, ("alias",))
+
+    def remove(self, url: str):
+        """Forgets a page's fingerprint, e.g. when saving the page failed after `add`."""
+        self._unindex(url)
+        self._record(url, ("removed",))
+
+    def _record(self, url: str, write: tuple):
+        """Buffers a write and flushes once the batch is full or stale."""
+        self._pending_writes[url] = write
+        if (len(self._pending_writes) >= self.batch_size or
+            time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered fingerprints and aliases in a single transaction."""
+        self._last_flush = time.monotonic()
+        if not self._pending_writes or self.conn is None:
+            return
+        writes = self._pending_writes.items()
+        saved = [(url, f"{write[1]:016x}") for url, write in writes if write[0] == "saved"]
+        aliased = [(url, *self.aliases[url]) for url, write in writes if write[0] == "alias" and url in self.aliases]
+        removed = [(url,) for url, write in writes if write[0] == "removed"]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO fingerprints (url, fingerprint) VALUES (?, ?)", saved)
+            self.conn.executemany("DELETE FROM aliases WHERE url = ?", [(url,) for url, _ in saved])
+            self.conn.executemany(
+                "DELETE FROM fingerprints WHERE url = ?", [(url,) for url, _, _ in aliased] + removed
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO aliases (url, original_url, distance) VALUES (?, ?, ?)", aliased
+            )
+        self._pending_writes.clear()
+
+    def close(self):
+        """Flushes buffered writes and closes the database."""
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+
+def read_aliases(db_path: str) -> dict:
+    """
+    Reads the near-duplicate aliases recorded by a crawl.
+
+    Returns:
+        dict: url -> (original_url, distance); empty if the crawl kept no index.
+    """
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return {url: (original_url, distance) for url, original_url, distance
+                in conn.execute("SELECT url, original_url, distance FROM aliases")}
+    except sqlite3.OperationalError: # No aliases table yet
+        return {}
+    finally:
+        conn.close()
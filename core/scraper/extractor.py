@@ -0,0 +1,357 @@
+import os
+import re
+import time
+import html2text
+from html2text.utils import pad_tables_in_text
+from urllib.parse import urlparse
+
+from config.settings import SCRAPER_PARSER_BACKEND, SCRAPER_CONVERT_FROM_TREE
+from core.scraper.conversion_cache import converter_fingerprint, conversion_key, lookup_conversion
+from core.scraper.parsers import parse_html
+from core.scraper.links import link_extractor_for
+from core.scraper.structure import collect_html_outline, build_page_structure
+
+# --- 1. Robust Content Area Identification ---
+# Prioritize semantic HTML5 elements for main content.
+# Then, look for common div classes that hold main content.
+CONTENT_AREA_SELECTORS = [
+    'main',                   # Standard semantic HTML for main content
+    'article',                # For self-contained content
+    'div.docs-content',       # Common for documentation sites
+    'div.main-content',       # Another common pattern
+    'div.content-wrapper',    # General content container
+    'div.td-main',            # As seen in Istio, useful general if not too specific
+    'div#content',            # Common ID for content
+    'div[role="main"]',       # ARIA role for main content
+]
+
+# --- 2. Generalized Sidebar Removal ---
+# Define a broad set of selectors for potential sidebars.
+# Order of selectors might matter for performance, but for `decompose`, not functionally.
+POTENTIAL_SIDEBAR_SELECTORS = [
+    'nav',                    # Most common semantic tag for navigation
+    'aside',                  # Semantic tag for content indirectly related to main content
+    '[role="navigation"]',    # ARIA role for navigation
+    '[class*="sidebar"]',     # Classes containing "sidebar" (e.g., "left-sidebar", "sidebar-menu")
+    '[id*="sidebar"]',        # IDs containing "sidebar"
+    '[class*="sidenav"]',     # Classes containing "sidenav"
+    '[id*="sidenav"]',        # IDs containing "sidenav"
+    '[class*="nav-menu"]',    # Classes containing "nav-menu"
+    '[id*="nav-menu"]',       # IDs containing "nav-menu"
+    '[class*="table-of-contents"]', # Some TOCs are standalone sidebars
+    '[id*="toc"]',            # Common ID for Table of Contents
+    # Add other common patterns you observe across documentation sites:
+    # 'div.td-sidebar-nav',   # Specific to Istio, but if you want to include common ones
+    # '.md-sidebar',          # Common in MkDocs-based themes
+    # '.doc-sidebar',
+]
+
+
+def create_markdown_converter():
+    """
+    Creates the html2text converter used for every scraped page.
+
+    Returns:
+        html2text.HTML2Text: A converter configured not to wrap lines.
+    """
+    markdown_converter = html2text.HTML2Text()
+    markdown_converter.body_width = 0 # Don't wrap lines
+    return markdown_converter
+
+
+ENTITY_CHARACTERS = re.compile(r"([&<>])") # Serialized as entities, which html2text leaves unescaped
+
+
+def convert_markup(markdown_converter, events) -> str:
+    """
+    Converts a parsed subtree to Markdown without serializing it to HTML first.
+
+    The parser events of `iter_markup` are fed straight to the converter's handlers,
+    so html2text does not re-tokenize a string the parser already took apart. The
+    result matches `markdown_converter.handle(page.outer_html(node))`.
+
+    Args:
+        markdown_converter (html2text.HTML2Text): The converter.
+        events (iterable): The events of `page.iter_markup(node)`.
+
+    Returns:
+        str: The Markdown.
+    """
+    markdown_converter.start = True
+    for event in events:
+        kind = event[0]
+        if kind == "text":
+            for i, part in enumerate(ENTITY_CHARACTERS.split(event[1])):
+                if part:
+                    markdown_converter.handle_data(part, i % 2 == 1)
+        elif kind == "start":
+            markdown_converter.handle_starttag(event[1], event[2])
+        elif kind == "end":
+            markdown_converter.handle_endtag(event[1])
+        else:
+            markdown_converter.handle_data(event[1])
+    markdown = markdown_converter.optwrap(markdown_converter.finish())
+    return pad_tables_in_text(markdown) if markdown_converter.pad_tables else markdown
+
+
+def match_content_area(page, selectors=CONTENT_AREA_SELECTORS):
+    """
+    Tries content area selectors in order.
+
+    Returns:
+        tuple: (selector, node) for the first selector that matches, or (None, None).
+    """
+    for selector in selectors:
+        content_area = page.select_one(selector)
+        if content_area is not None:
+            return selector, content_area
+    return None, None
+
+
+def find_content_area(page, current_url, observation=None):
+    """
+    Finds the element holding the main content of a page.
+
+    Args:
+        page: The parsed page, as returned by `core.scraper.parsers.parse_html`.
+        current_url (str): The URL of the page, used for log messages.
+        observation (dict): If given, the winning selector is stored under
+                            "content_selector" (None when falling back to <body>).
+
+    Returns:
+        The content area node, or None if not even <body> exists.
+    """
+    selector, content_area = match_content_area(page)
+    if observation is not None:
+        observation["content_selector"] = selector
+
+    if content_area is None:
+        print(f"⚠️ Could not find a primary content area for {current_url}. Falling back to body content.")
+        # Fallback to body content if no specific content area found,
+        # but this increases the risk of including unwanted elements.
+        content_area = page.body()
+        if content_area is None: # Should ideally not happen for valid HTML
+            print(f"❌ Could not even find body for {current_url}. Skipping.")
+            return None
+    return content_area
+
+
+def remove_sidebars(page, content_area, selectors=POTENTIAL_SIDEBAR_SELECTORS, observation=None, verbose=True):
+    """
+    Removes sidebar and navigation elements from the page.
+
+    Strategy:
+    a. Target common semantic navigation tags (nav, aside).
+    b. Target elements with common "sidebar-like" class/ID names (e.g., "sidebar", "nav", "menu").
+    c. Crucially, *exclude* the `content_area` itself and every element that contains it.
+
+    The content area's ancestor chain is computed once per page, so deciding whether a
+    candidate is safe to remove is a constant-time set lookup instead of a walk over
+    the candidate's whole subtree.
+
+    Args:
+        page: The parsed page, as returned by `core.scraper.parsers.parse_html`.
+        content_area: The content area identified by `find_content_area`.
+        selectors (list[str]): Sidebar selectors to run, all of them by default.
+        observation (dict): If given, the selectors that matched a removable element
+                            are stored under "sidebar_selectors".
+        verbose (bool): Log the outcome.
+
+    Returns:
+        int: The number of elements removed.
+    """
+    # The content area and all of its ancestors must survive. Elements are tracked
+    # by the backend's identity key: Tag equality and hashing in bs4 are structural
+    # (and hashing serializes the whole subtree), which is both slow and wrong here.
+    protected_keys = {page.node_key(content_area)}
+    protected_keys.update(page.node_key(parent) for parent in page.ancestors(content_area))
+
+    # Get all potential sidebar elements, de-duplicated in case an element matches
+    # several selectors, skipping the content area and any wrapper that contains it.
+    unique_potential_sidebars = {}
+    matched_selectors = []
+    for selector in selectors:
+        matched = False
+        for element in page.select(selector):
+            key = page.node_key(element)
+            if key not in protected_keys:
+                unique_potential_sidebars.setdefault(key, element)
+                matched = True
+        if matched:
+            matched_selectors.append(selector)
+    if observation is not None:
+        observation["sidebar_selectors"] = matched_selectors
+
+    removed_sidebars_count = page.remove_nodes(list(unique_potential_sidebars.values()))
+
+    if not verbose:
+        return removed_sidebars_count
+    if removed_sidebars_count > 0:
+        print(f"  -> ✔️ Removed {removed_sidebars_count} potential sidebar/navigation elements.")
+    else:
+        print("  -> ℹ️ No common sidebar/navigation elements found or removed based on general selectors.")
+    return removed_sidebars_count
+
+
+def discover_links(page, current_url, base_url, path_filter):
+    """
+    Collects the links on a page that stay on the same host and match the path filter.
+
+    Args:
+        page: The parsed (and pruned) page.
+        current_url (str): The URL of the page, used to resolve relative links.
+        base_url (str): The starting URL of the crawl.
+        path_filter (str): A string that must be in the URL to be followed.
+
+    Returns:
+        list[str]: Absolute URLs with their fragments stripped, without repeats.
+    """
+    return link_extractor_for(base_url, path_filter).extract(current_url, page.hrefs())
+
+
+def extract_page(html, current_url, base_url, path_filter, markdown_converter=None,
+                 parser_backend=SCRAPER_PARSER_BACKEND, find_links=True, profile=None, observation=None,
+                 timings=None, structure=None, convert_from_tree=SCRAPER_CONVERT_FROM_TREE,
+                 conversion_cache_path=None, conversion=None):
+    """
+    Extracts the main content of a fetched page as Markdown and discovers new links.
+
+    Args:
+        html (bytes | str): The raw page body.
+        current_url (str): The URL the page was fetched from.
+        base_url (str): The starting URL of the crawl.
+        path_filter (str): A string that must be in the URL to be followed.
+        markdown_converter (html2text.HTML2Text): Converter to reuse. A new one is
+            created when omitted, which keeps the function safe to call from threads.
+        parser_backend (str): HTML parser backend, see `core.scraper.parsers.PARSER_BACKENDS`.
+        find_links (bool): Skip link discovery when False (e.g. offline re-extraction).
+        profile (dict): A learned site profile (see `core.scraper.profiles`) with the
+            "content_selector" and "sidebar_selectors" to try first. The full selector
+            lists are used whenever the profile does not match the page.
+        observation (dict): If given, filled with the selectors that matched and whether
+            the profile had to fall back, so the caller can refine its profiles.
+        timings (dict): If given, filled with the seconds spent in each stage: "parse",
+            "prune" (content area search and sidebar removal), "convert" and "links".
+        structure (dict): If given, filled with the page's section tree (headings with
+            anchors, code blocks, tables and byte offsets into the Markdown), see
+            `core.scraper.structure.build_page_structure`.
+        convert_from_tree (bool): Convert from the parsed tree (see `convert_markup`)
+            instead of serializing the content area and letting html2text re-parse it.
+        conversion_cache_path (str): A `ConversionCache` database to look the content
+            area up in before converting it (see `core.scraper.conversion_cache`).
+        conversion (dict): If given and a cache is used, filled with the cache "key"
+            and whether it was a "hit", so the caller can record the outcome.
+
+    Returns:
+        tuple: (markdown_content, new_links). markdown_content is None when the page
+               has no usable content, in which case no links are returned either.
+    """
+    if markdown_converter is None:
+        markdown_converter = create_markdown_converter()
+
+    if timings is None:
+        timings = {}
+    started = time.perf_counter()
+    page = parse_html(html, parser_backend)
+    timings["parse"] = time.perf_counter() - started
+    started = time.perf_counter()
+    if observation is None:
+        observation = {}
+    observation["fallback"] = False
+
+    content_area = None
+    if profile is not None:
+        selector, content_area = match_content_area(page, [profile["content_selector"]])
+        observation["content_selector"] = selector
+    if content_area is None:
+        observation["fallback"] = profile is not None
+        content_area = find_content_area(page, current_url, observation)
+    if content_area is None:
+        timings["prune"] = time.perf_counter() - started
+        return None, []
+
+    removed = 0
+    if profile is not None and not observation["fallback"]:
+        removed = remove_sidebars(page, content_area, profile["sidebar_selectors"], observation, verbose=False)
+        if removed:
+            print(f"  -> ✔️ Removed {removed} sidebar/navigation elements using the site profile.")
+        else:
+            observation["fallback"] = True
+    if not removed:
+        remove_sidebars(page, content_area, observation=observation)
+    timings["prune"] = time.perf_counter() - started
+
+    # --- 3. Convert to Markdown ---
+    started = time.perf_counter()
+    content_html = None
+    markdown_content = None
+    if conversion_cache_path is not None:
+        # Keyed by the content HTML in both conversion modes, which give the same Markdown.
+        content_html = page.outer_html(content_area)
+        key = conversion_key(converter_fingerprint(markdown_converter), content_html)
+        markdown_content = lookup_conversion(conversion_cache_path, key)
+        if conversion is not None:
+            conversion.update(key=key, hit=markdown_content is not None)
+    if markdown_content is None:
+        if convert_from_tree:
+            markdown_content = convert_markup(markdown_converter, page.iter_markup(content_area))
+        else:
+            markdown_content = markdown_converter.handle(content_html or page.outer_html(content_area))
+    timings["convert"] = time.perf_counter() - started
+
+    if structure is not None:
+        started = time.perf_counter()
+        outline = collect_html_outline(page, content_area)
+        structure.update(build_page_structure(markdown_content, current_url, outline))
+        timings["structure"] = time.perf_counter() - started
+
+    # --- 4. Discover New Links ---
+    started = time.perf_counter()
+    new_links = discover_links(page, current_url, base_url, path_filter) if find_links else []
+    timings["links"] = time.perf_counter() - started
+    return markdown_content, new_links
+
+
+def markdown_path_for_url(current_url, output_dir):
+    """
+    Maps a page URL to the Markdown file it is saved as.
+
+    Args:
+        current_url (str): The URL of the page.
+        output_dir (str): The directory the scraped Markdown files live in.
+
+    Returns:
+        str: The file path, mirroring the URL path below `output_dir`.
+    """
+    parsed_url = urlparse(current_url)
+    path_segments = parsed_url.path.strip('/').split('/')
+
+    filename = "index.md" if not path_segments[-1] else path_segments[-1] + ".md"
+
+    dir_path = os.path.join(output_dir, *path_segments[:-1])
+    return os.path.join(dir_path, filename)
+
+
+def save_markdown(markdown_content, current_url, output_dir):
+    """
+    Saves a page's Markdown under `output_dir`, mirroring the URL path.
+
+    Args:
+        markdown_content (str): The converted page content.
+        current_url (str): The URL of the page.
+        output_dir (str): The directory to save the scraped Markdown files.
+
+    Returns:
+        str: The file path written, or None if saving failed.
+    """
+    file_path = markdown_path_for_url(current_url, output_dir)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    try:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(markdown_content)
+        print(f"  -> ✅ Saved to {file_path}")
+        return file_path
+    except OSError as e:
+        print(f"❌ Error saving file {file_path}: {e}")
+        return None
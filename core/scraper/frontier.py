@@ -0,0 +1,238 @@
+import os
+import time
+import sqlite3
+
+from config.settings import SCRAPER_FRONTIER_BATCH_SIZE, SCRAPER_FRONTIER_FLUSH_INTERVAL
+
+FRONTIER_DB_NAME = ".frontier.sqlite3"
+
+QUEUED = "queued"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def read_urls_with_status(db_path: str, status: str) -> list:
+    """
+    Reads the URLs in one status from a frontier database without opening it for crawling.
+
+    Args:
+        db_path (str): Path of the frontier database.
+        status (str): E.g. FAILED for the dead-letter list or SKIPPED for gated URLs.
+
+    Returns:
+        list[tuple]: (url, depth, error, updated_at) rows, oldest first. Empty if the
+                     database does not exist.
+    """
+    if not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute(
+            "SELECT url, depth, error, updated_at FROM urls WHERE status = ? ORDER BY updated_at", (status,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def read_dead_letters(db_path: str) -> list:
+    """Reads the dead-letter list of a frontier database, see `read_urls_with_status`."""
+    return read_urls_with_status(db_path, FAILED)
+
+
+class CrawlFrontier:
+    """
+    Disk-backed crawl frontier stored in a local SQLite database.
+
+    Every known URL is recorded with its depth and status (queued, in_flight, done,
+    failed or skipped) so an interrupted crawl can resume where it stopped. Status changes
+    are buffered in memory and written in batches, one transaction per flush, so
+    checkpointing stays cheap even at thousands of pages per minute.
+
+    De-duplication uses `key_func(url)`, so URL variants that share a canonical
+    key (see `core.scraper.urls.UrlCanonicalizer.key`) are scheduled once.
+
+    URLs that failed for good stay in the database as a dead-letter list, with the
+    last error, and can be replayed by a later run.
+    """
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = SCRAPER_FRONTIER_BATCH_SIZE,
+        flush_interval: float = SCRAPER_FRONTIER_FLUSH_INTERVAL,
+        key_func=None,
+    ):
+        """
+        Initializes the frontier. Call `open` before using it.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+            batch_size (int): Number of buffered status changes that triggers a flush.
+            flush_interval (float): Seconds after which buffered changes are flushed anyway.
+            key_func (callable): Maps a URL to its de-duplication key. Defaults to the URL itself.
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.key_func = key_func or (lambda url: url)
+        self.conn = None # Will be initialized by open()
+        self.known_urls = set()
+        self._pending_writes = {}
+        self._last_flush = time.monotonic()
+
+    def open(self, resume: bool = True, replay_failed: bool = False):
+        """
+        Opens (or creates) the frontier database.
+
+        A crawl that finished cleanly is never resumed: its frontier is cleared so the
+        next run starts over from the base URL. When replaying, the dead-letter list
+        is requeued instead and every other known URL is kept as it is.
+
+        Args:
+            resume (bool): If False, any previous state is discarded.
+            replay_failed (bool): Requeue the URLs that failed in the previous run.
+
+        Returns:
+            list[tuple[str, int]]: The (url, depth) pairs still left to visit.
+        """
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS urls_status ON urls (status)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'state'").fetchone()
+        previous_state = row[0] if row else None
+        if replay_failed:
+            replayed = self.conn.execute(
+                "UPDATE urls SET status = ? WHERE status IN (?, ?)", (QUEUED, FAILED, IN_FLIGHT)
+            ).rowcount
+            print(f"♻️ Replaying {replayed} dead-letter URLs from {self.db_path}.")
+        elif not resume or previous_state == "complete":
+            self.conn.execute("DELETE FROM urls")
+        else:
+            # Pages that were being fetched when the process died need fetching again.
+            self.conn.execute(
+                "UPDATE urls SET status = ? WHERE status = ?", (QUEUED, IN_FLIGHT)
+            )
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('state', 'running')")
+        self.conn.commit()
+
+        self.known_urls = {self.key_func(url) for (url,) in self.conn.execute("SELECT url FROM urls")}
+        pending = self.conn.execute(
+            "SELECT url, depth FROM urls WHERE status = ? ORDER BY depth", (QUEUED,)
+        ).fetchall()
+        if pending:
+            print(f"↩️ Resuming crawl from {self.db_path}: {len(pending)} queued of {len(self.known_urls)} known URLs.")
+        return pending
+
+    def add(self, url: str, depth: int) -> bool:
+        """
+        Records a newly discovered URL as queued.
+
+        Returns:
+            bool: True if the URL was new, False if it (or a variant with the same key)
+                  was already known.
+        """
+        key = self.key_func(url)
+        if key in self.known_urls:
+            return False
+        self.known_urls.add(key)
+        self._record(url, depth, QUEUED)
+        return True
+
+    def mark_in_flight(self, url: str, depth: int):
+        """Records that a URL is being fetched."""
+        self._record(url, depth, IN_FLIGHT)
+
+    def mark_done(self, url: str, depth: int):
+        """Records that a URL was fetched and processed."""
+        self._record(url, depth, DONE)
+
+    def mark_failed(self, url: str, depth: int, error: str):
+        """Records that fetching or processing a URL failed for good (a dead letter)."""
+        self._record(url, depth, FAILED, error)
+
+    def mark_skipped(self, url: str, depth: int, reason: str):
+        """Records that a URL was deliberately not fetched or parsed (binary, too large, ...)."""
+        self._record(url, depth, SKIPPED, reason)
+
+    def mark_retrying(self, url: str, depth: int, error: str):
+        """Records that a URL failed transiently and is queued for another attempt."""
+        self._record(url, depth, QUEUED, error)
+
+    def dead_letters(self) -> list:
+        """
+        Returns the URLs that failed for good.
+
+        Returns:
+            list[tuple]: (url, depth, error, updated_at) rows, oldest first.
+        """
+        self.flush()
+        return self.conn.execute(
+            "SELECT url, depth, error, updated_at FROM urls WHERE status = ? ORDER BY updated_at", (FAILED,)
+        ).fetchall()
+
+    def _record(self, url, depth, status, error=None):
+        """Buffers a status change and flushes once the batch is full or stale."""
+        self._pending_writes[url] = (url, depth, status, error, time.time())
+        if (len(self._pending_writes) >= self.batch_size or
+            time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered status changes in a single transaction."""
+        self._last_flush = time.monotonic()
+        if not self._pending_writes or self.conn is None:
+            return
+        rows = list(self._pending_writes.values())
+        self._pending_writes.clear()
+        with self.conn:
+            self.conn.executemany(
+                """INSERT INTO urls (url, depth, status, error, updated_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(url) DO UPDATE SET
+                       depth = excluded.depth,
+                       status = excluded.status,
+                       error = excluded.error,
+                       updated_at = excluded.updated_at""",
+                rows,
+            )
+
+    def counts(self) -> dict:
+        """
+        Returns the number of URLs in each status.
+
+        Returns:
+            dict: A mapping of status to URL count.
+        """
+        self.flush()
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status"))
+
+    def complete(self):
+        """Marks the crawl as finished so the next run starts fresh."""
+        self.flush()
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('state', 'complete')")
+
+    def close(self):
+        """Flushes buffered changes and closes the database."""
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
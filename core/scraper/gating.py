@@ -0,0 +1,88 @@
+import posixpath
+from urllib.parse import urlsplit
+
+from config.settings import SCRAPER_SKIP_EXTENSIONS, SCRAPER_ALLOWED_CONTENT_TYPES, SCRAPER_MAX_BODY_BYTES
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class ResponseSkipped(Exception):
+    """Raised when a response is not worth downloading or parsing."""
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ContentGate:
+    """
+    Decides which URLs and responses reach the HTML parser.
+
+    URLs whose path ends in a known binary or asset extension are never fetched.
+    Responses are checked from their headers before the body is read (Content-Type
+    must be an HTML type, Content-Length within the byte cap), and bodies are read
+    in chunks and abandoned as soon as they pass the cap, since Content-Length is
+    missing for chunked or compressed responses.
+    """
+    def __init__(
+        self,
+        skip_extensions=SCRAPER_SKIP_EXTENSIONS,
+        allowed_content_types=SCRAPER_ALLOWED_CONTENT_TYPES,
+        max_body_bytes: int = SCRAPER_MAX_BODY_BYTES,
+    ):
+        """
+        Initializes the gate.
+
+        Args:
+            skip_extensions (list[str]): Lowercase path extensions (with the dot) never fetched.
+            allowed_content_types (list[str]): Media types that are parsed. A response without
+                                               a Content-Type is let through.
+            max_body_bytes (int): Largest body downloaded, in bytes. None disables the cap.
+        """
+        self.skip_extensions = frozenset(ext.lower() for ext in skip_extensions)
+        self.allowed_content_types = frozenset(t.lower() for t in allowed_content_types)
+        self.max_body_bytes = max_body_bytes
+
+    def url_skip_reason(self, url: str):
+        """
+        Returns why a URL should not be fetched, or None if it should.
+        """
+        extension = posixpath.splitext(urlsplit(url).path)[1].lower()
+        if extension in self.skip_extensions:
+            return f"extension {extension}"
+        return None
+
+    def header_skip_reason(self, headers):
+        """
+        Returns why a response should not be downloaded, judging by its headers, or None.
+
+        Args:
+            headers (Mapping): The response headers.
+        """
+        content_type = headers.get("Content-Type")
+        if content_type:
+            media_type = content_type.split(";", 1)[0].strip().lower()
+            if media_type not in self.allowed_content_types:
+                return f"content type {media_type}"
+        content_length = headers.get("Content-Length")
+        if self.max_body_bytes is not None and content_length and content_length.isdigit():
+            if int(content_length) > self.max_body_bytes:
+                return f"Content-Length {int(content_length):,} bytes over the {self.max_body_bytes:,} byte cap"
+        return None
+
+    async def read_body(self, response) -> bytes:
+        """
+        Reads an aiohttp response body in chunks, enforcing the byte cap.
+
+        Raises:
+            ResponseSkipped: If the headers fail the gate or the body grows past the cap.
+                             The rest of the body is never downloaded.
+        """
+        reason = self.header_skip_reason(response.headers)
+        if reason:
+            raise ResponseSkipped(reason)
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+            body.extend(chunk)
+            if self.max_body_bytes is not None and len(body) > self.max_body_bytes:
+                raise ResponseSkipped(f"body over the {self.max_body_bytes:,} byte cap")
+        return bytes(body)
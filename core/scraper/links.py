@@ -0,0 +1,110 @@
+import re
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse, urlsplit
+
+# An href starting with a URL scheme ("https:", "mailto:", ...), as urllib detects it.
+SCHEME_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+# The authority of an absolute ("https://host/...") or scheme-relative ("//host/...") href.
+NETLOC_PATTERN = re.compile(r"(?:[A-Za-z][A-Za-z0-9+.-]*:)?//([^/?#]*)")
+# Characters urllib deletes anywhere in a URL before parsing it.
+UNSAFE_URL_CHARS = re.compile(r"[\t\r\n]")
+# Relative hrefs that `urljoin` resolves by plain concatenation: no dot segments,
+# no empty segments, no params or query, and no whitespace or control characters.
+PLAIN_RELATIVE_PATTERN = re.compile(r"(?!\.)(?!.*(?:/\.|//))[^\x00-\x20;?]*\Z")
+
+
+class LinkExtractor:
+    """
+    Resolves and filters the hrefs of crawled pages for one crawl.
+
+    The base URL's host and the path filter are parsed once per crawl, and each
+    page's URL once per page, instead of once per link. Relative hrefs (the vast
+    majority on documentation sites) inherit the page's host, so they skip the host
+    check, and plain ones are resolved by concatenating them to the page's
+    directory instead of going through `urljoin`. Absolute links to other sites are
+    dropped from the host in the href without being resolved, and repeated hrefs on
+    a page are handled once. The result is the same as resolving every href with
+    `urljoin` and comparing hosts with `urlparse`, except that malformed hrefs are
+    skipped instead of raising.
+    """
+    def __init__(self, base_url: str, path_filter: str):
+        """
+        Initializes the extractor.
+
+        Args:
+            base_url (str): The starting URL of the crawl; links must stay on its host.
+            path_filter (str): A string that must be in the URL to be followed.
+        """
+        self.base_netloc = urlsplit(base_url).netloc
+        self.path_filter = path_filter
+
+    def extract(self, current_url: str, hrefs) -> list[str]:
+        """
+        Resolves a page's hrefs and keeps those on the crawl's host that match the filter.
+
+        Args:
+            current_url (str): The URL of the page, used to resolve relative links.
+            hrefs (Iterable[str]): Raw href attribute values, in document order.
+
+        Returns:
+            list[str]: Absolute URLs with their fragments stripped, without repeats,
+                       in the order they first appear.
+        """
+        parsed_page = urlparse(current_url)
+        page = {
+            "url": current_url,
+            "same_host": parsed_page.netloc == self.base_netloc,
+            "origin": f"{parsed_page.scheme}://{parsed_page.netloc}",
+            # urljoin also normalizes the page's own path; only concatenate when there is nothing to normalize.
+            "concat_ok": bool(parsed_page.scheme and parsed_page.netloc) and not re.search(r"/\.|//", parsed_page.path),
+        }
+        page_path = parsed_page.path or "/"
+        page["dir"] = page["origin"] + page_path[:page_path.rfind('/') + 1]
+
+        seen_hrefs = set()
+        seen_links = set()
+        new_links = []
+        for href in hrefs:
+            if href in seen_hrefs or href.startswith('#'):
+                continue
+            seen_hrefs.add(href)
+            try:
+                absolute_url = self._resolve(href, page)
+            except ValueError: # Malformed href, e.g. an unbalanced IPv6 bracket
+                continue
+            if absolute_url and self.path_filter in absolute_url and absolute_url not in seen_links:
+                seen_links.add(absolute_url)
+                new_links.append(absolute_url)
+        return new_links
+
+    def _resolve(self, href: str, page: dict):
+        """
+        Resolves one href against the page it appears on.
+
+        Returns:
+            str: The absolute URL without its fragment, or None if it leaves the crawl's host.
+        """
+        # urllib strips leading whitespace and control characters, and tabs and
+        # newlines anywhere, before looking for a scheme; such hrefs take the slow path.
+        clean = href[:1] > ' ' and not UNSAFE_URL_CHARS.search(href)
+        if clean and not href.startswith('//') and not SCHEME_PATTERN.match(href):
+            if not page["same_host"]: # Relative links stay on the page's host
+                return None
+            if page["concat_ok"] and PLAIN_RELATIVE_PATTERN.match(href):
+                absolute_url = page["origin"] + href if href[0] == '/' else page["dir"] + href
+                return absolute_url.split('#')[0]
+            return urljoin(page["url"], href).split('#')[0]
+
+        if clean and (match := NETLOC_PATTERN.match(href)) and match.group(1):
+            if match.group(1) != self.base_netloc:
+                return None
+            return urljoin(page["url"], href).split('#')[0]
+
+        absolute_url = urljoin(page["url"], href).split('#')[0]
+        return absolute_url if urlsplit(absolute_url).netloc == self.base_netloc else None
+
+
+@lru_cache(maxsize=32)
+def link_extractor_for(base_url: str, path_filter: str) -> LinkExtractor:
+    """Returns a shared `LinkExtractor`, so worker processes build one per crawl instead of one per page."""
+    return LinkExtractor(base_url, path_filter)
@@ -0,0 +1,291 @@
+import os
+import json
+import time
+import asyncio
+import aiohttp
+
+METRICS_TEXTFILE_NAME = ".crawl_metrics.prom"
+METRICS_SUMMARY_NAME = ".crawl_metrics.json"
+
+# Per-page stages, in pipeline order. Network stages come from aiohttp tracing
+# (ttfb runs from sending the request to receiving the response headers), the
+# extraction stages are measured inside the extraction worker.
+STAGES = (
+    "dns", "connect", "ttfb", "download",
+    "parse", "prune", "convert", "structure", "links", "fingerprint", "extraction", "write",
+)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """A cumulative-bucket latency histogram, as used by Prometheus."""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Records one observation."""
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile from the buckets.
+
+        Returns:
+            float: The upper bound of the bucket holding the quantile (the largest
+                   observation if it falls past the last bucket), or 0.0 when empty.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class CrawlMetrics:
+    """
+    Counters, gauges and per-stage timing histograms for one crawl.
+
+    Everything is updated from the event loop thread, so no locking is needed.
+    The metrics can be rendered in the Prometheus text format (written to a file
+    for the node_exporter textfile collector, or served by `MetricsServer`) and
+    summarized as JSON at the end of the crawl.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initializes empty metrics.
+
+        Args:
+            buckets (tuple): Upper bounds in seconds of the timing histogram buckets.
+        """
+        self.started_at = time.monotonic()
+        self.histograms = {stage: Histogram(buckets) for stage in STAGES}
+        self.counters = {} # (name, sorted label items) -> value
+        self.gauges = {}
+        self.gauge_peaks = {}
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Adds `amount` to a counter, e.g. `inc("errors", error_class="TimeoutError")`."""
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def counter_total(self, name: str) -> float:
+        """Returns the sum of a counter over all of its labels."""
+        return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    def set_gauge(self, name: str, value: float):
+        """Sets a gauge and tracks its peak."""
+        self.gauges[name] = value
+        self.gauge_peaks[name] = max(self.gauge_peaks.get(name, value), value)
+
+    def observe(self, stage: str, seconds: float):
+        """Records the time one page spent in a stage."""
+        self.histograms[stage].observe(seconds)
+
+    def observe_all(self, timings: dict):
+        """Records a {stage: seconds} dict, e.g. the timings of one extraction."""
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+
+    def elapsed(self) -> float:
+        """Seconds since the metrics were created."""
+        return time.monotonic() - self.started_at
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Builds an aiohttp trace config that times DNS, connect and TTFB of every request.
+
+        Returns:
+            aiohttp.TraceConfig: Pass it in `trace_configs` when creating the session.
+        """
+        loop_time = lambda: asyncio.get_running_loop().time()
+
+        async def on_request_start(session, context, params):
+            context.request_start = loop_time()
+
+        async def on_request_end(session, context, params):
+            self.observe("ttfb", loop_time() - context.request_start)
+
+        async def on_dns_start(session, context, params):
+            context.dns_start = loop_time()
+
+        async def on_dns_end(session, context, params):
+            self.observe("dns", loop_time() - context.dns_start)
+
+        async def on_connect_start(session, context, params):
+            context.connect_start = loop_time()
+
+        async def on_connect_end(session, context, params):
+            self.observe("connect", loop_time() - context.connect_start)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_dns_resolvehost_start.append(on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_end)
+        trace_config.on_connection_create_start.append(on_connect_start)
+        trace_config.on_connection_create_end.append(on_connect_end)
+        return trace_config
+
+    def render_prometheus(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metric families prefixed with `scraper_`.
+        """
+        lines = [
+            "# TYPE scraper_stage_seconds histogram",
+        ]
+        for stage, histogram in self.histograms.items():
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+        declared = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f"scraper_{name}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        gauges = dict(self.gauges)
+        gauges["pages_per_second"] = round(self.pages_per_second(), 3)
+        gauges["uptime_seconds"] = round(self.elapsed(), 3)
+        for name, value in sorted(gauges.items()):
+            lines.append(f"# TYPE scraper_{name} gauge")
+            lines.append(f"scraper_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def pages_per_second(self) -> float:
+        """Fetched pages per second over the whole crawl so far."""
+        elapsed = self.elapsed()
+        return self.counter_total("responses") / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> dict:
+        """
+        Summarizes the crawl's metrics.
+
+        Returns:
+            dict: elapsed seconds, pages/sec, counters (labelled ones as nested dicts),
+                  peak gauges and, per stage with observations, count/total/mean/p50/p95/max
+                  in seconds.
+        """
+        counters = {}
+        for (name, labels), value in sorted(self.counters.items()):
+            if labels:
+                counters.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+            else:
+                counters[name] = value
+        stages = {
+            stage: {
+                "count": histogram.count,
+                "total": round(histogram.sum, 6),
+                "mean": round(histogram.sum / histogram.count, 6),
+                "p50": round(histogram.quantile(0.5), 6),
+                "p95": round(histogram.quantile(0.95), 6),
+                "max": round(histogram.max, 6),
+            }
+            for stage, histogram in self.histograms.items() if histogram.count
+        }
+        return {
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "pages_per_second": round(self.pages_per_second(), 3),
+            "counters": counters,
+            "peak_gauges": dict(self.gauge_peaks),
+            "stages": stages,
+        }
+
+    def write_prometheus(self, path: str):
+        """Writes the Prometheus text atomically, so a collector never reads half a file."""
+        _write_atomically(path, self.render_prometheus())
+
+    def write_summary(self, path: str):
+        """Writes the JSON summary."""
+        _write_atomically(path, json.dumps(self.summary(), indent=2))
+
+
+class MetricsServer:
+    """
+    Serves `CrawlMetrics` in the Prometheus text format at http://<host>:<port>/metrics.
+
+    A deliberately tiny HTTP responder on the event loop, so scraping the metrics
+    needs no extra dependency or thread.
+    """
+    def __init__(self, metrics: CrawlMetrics, port: int, host: str = "127.0.0.1"):
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self.server = None # Will be initialized by start()
+
+    async def start(self):
+        """Starts listening."""
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"📈 Serving crawl metrics at http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        """Stops listening."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers one request: the metrics for GET /metrics, 404 for anything else."""
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass # Headers are not needed
+            parts = request_line.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                status, body = "200 OK", self.metrics.render_prometheus().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("ascii") + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _format_labels(labels) -> str:
+    """Formats sorted (name, value) label pairs as a Prometheus label set."""
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _write_atomically(path: str, text: str):
+    """Writes a file through a temporary file and a rename."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
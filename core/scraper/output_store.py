@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from config.settings import SCRAPER_PACKED_BATCH_SIZE
+from core.scraper.extractor import markdown_path_for_url, save_markdown
+
+PACKED_STORE_NAME = "pages.sqlite3"
+OUTPUT_FORMATS = ("files", "packed")
+PACKED_READ_CHUNK = 256 # Rows fetched per round trip when streaming a packed store
+STRUCTURE_SUFFIX = ".structure.json"
+PAGE_COLUMNS = ("url", "path", "content_hash", "fetched_at", "markdown", "structure")
+
+
+def structure_path_for(markdown_path: str) -> str:
+    """Returns where the section tree of a saved Markdown file is kept, e.g. `docs/a.structure.json`."""
+    return os.path.splitext(markdown_path)[0] + STRUCTURE_SUFFIX
+
+
+def _page_from_row(row) -> dict:
+    """Turns a pages row into a dict, decoding the section tree."""
+    page = dict(zip(PAGE_COLUMNS, row))
+    page["structure"] = json.loads(page["structure"]) if page["structure"] else None
+    return page
+
+
+class FileMarkdownStore:
+    """Saves every page as its own Markdown file below `output_dir`, mirroring the URL path."""
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+
+    def open(self):
+        """Nothing to open; files are written directly."""
+
+    def save(self, markdown_content: str, url: str, structure: dict = None):
+        """
+        Saves a page, and its section tree (if given) in a JSON file beside it.
+
+        Returns:
+            str: The file path written, or None if saving failed.
+        """
+        file_path = save_markdown(markdown_content, url, self.output_dir)
+        if file_path and structure is not None:
+            try:
+                with open(structure_path_for(file_path), "w", encoding="utf-8") as f:
+                    json.dump(structure, f, ensure_ascii=False)
+            except OSError as e:
+                print(f"❌ Error saving section tree for {file_path}: {e}")
+        return file_path
+
+    def exists(self, path: str) -> bool:
+        """Returns True if the page saved at `path` is still there."""
+        return os.path.exists(path)
+
+    def remove(self, path: str):
+        """Deletes a saved page and its section tree, if they are still there."""
+        for file_path in (path, structure_path_for(path)):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def close(self):
+        """Nothing to close."""
+
+
+class PackedMarkdownStore:
+    """
+    Keeps every page in a single SQLite file instead of one Markdown file per page.
+
+    Each row holds the URL, the path the page would have as a file (used as its
+    stable identifier, so both formats produce the same `source_path`), a SHA-256 of
+    the Markdown, the fetch time, the Markdown itself and its section tree as JSON. The URL is the primary key
+    and the path is indexed, so single pages can be looked up directly, and
+    `iter_packed_pages` streams the whole store in insertion order. Writes are
+    buffered and committed in batches.
+    """
+    def __init__(self, db_path: str, batch_size: int = SCRAPER_PACKED_BATCH_SIZE):
+        """
+        Initializes the store. Call `open` before using it.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+            batch_size (int): Number of buffered pages that triggers a commit.
+        """
+        self.db_path = db_path
+        self.output_dir = os.path.dirname(db_path)
+        self.batch_size = batch_size
+        self.conn = None # Will be initialized by open()
+        self.paths = set()
+        self._pending_writes = {}
+        self._lock = threading.Lock() # save() is called from worker threads
+
+    def open(self):
+        """Opens (or creates) the database and loads the paths of stored pages."""
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                markdown TEXT NOT NULL,
+                structure TEXT
+            )"""
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        if "structure" not in columns: # Stores written before section trees existed
+            self.conn.execute("ALTER TABLE pages ADD COLUMN structure TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_path ON pages (path)")
+        self.conn.commit()
+        self.paths = {path for (path,) in self.conn.execute("SELECT path FROM pages")}
+
+    def save(self, markdown_content: str, url: str, structure: dict = None):
+        """
+        Buffers a page (and its section tree, if given) for the next batch commit.
+
+        Returns:
+            str: The page's path identifier.
+        """
+        path = markdown_path_for_url(url, self.output_dir)
+        digest = hashlib.sha256(markdown_content.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._pending_writes[url] = (
+                url, path, digest, time.time(), markdown_content,
+                json.dumps(structure, ensure_ascii=False) if structure is not None else None,
+            )
+            self.paths.add(path)
+            if len(self._pending_writes) >= self.batch_size:
+                self._flush_locked()
+        print(f"  -> ✅ Packed into {self.db_path} as {path}")
+        return path
+
+    def exists(self, path: str) -> bool:
+        """Returns True if a page with this path identifier is stored."""
+        return path in self.paths
+
+    def remove(self, path: str):
+        """Deletes the page with this path identifier."""
+        with self._lock:
+            self._flush_locked()
+            self.paths.discard(path)
+            with self.conn:
+                self.conn.execute("DELETE FROM pages WHERE path = ?", (path,))
+
+    def get(self, url: str):
+        """
+        Looks up one page by URL.
+
+        Returns:
+            dict: The page's url, path, content_hash, fetched_at, markdown and structure, or None.
+        """
+        with self._lock:
+            self._flush_locked()
+            row = self.conn.execute(
+                f"SELECT {', '.join(PAGE_COLUMNS)} FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        return _page_from_row(row) if row else None
+
+    def _flush_locked(self):
+        """Commits buffered pages in one transaction. The caller holds the lock."""
+        if not self._pending_writes or self.conn is None:
+            return
+        rows = list(self._pending_writes.values())
+        self._pending_writes.clear()
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO pages ({', '.join(PAGE_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def flush(self):
+        """Commits buffered pages."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Commits buffered pages and closes the database."""
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+
+
+def open_output_store(output_format: str, output_dir: str):
+    """
+    Creates the Markdown store for an output format.
+
+    Args:
+        output_format (str): "files" (one Markdown file per page) or "packed" (a single SQLite file).
+        output_dir (str): The crawl's output directory.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if output_format == "files":
+        return FileMarkdownStore(output_dir)
+    if output_format == "packed":
+        return PackedMarkdownStore(os.path.join(output_dir, PACKED_STORE_NAME))
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def iter_packed_pages(db_path: str):
+    """
+    Streams the pages of a packed store without loading it into memory.
+
+    Args:
+        db_path (str): Path of the packed store, e.g. `<output_dir>/pages.sqlite3`.
+
+    Yields:
+        dict: url, path, content_hash, fetched_at, markdown and structure (the decoded
+              section tree, or None) of each page.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(PAGE_COLUMNS)} FROM pages ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(PACKED_READ_CHUNK)
+            if not rows:
+                break
+            for row in rows:
+                yield _page_from_row(row)
+    finally:
+        conn.close()
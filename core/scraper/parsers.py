@@ -0,0 +1,366 @@
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, UnicodeDammit
+from bs4.element import Tag, NavigableString, Comment, CData, Declaration, Doctype, ProcessingInstruction
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+except ImportError: # lxml and cssselect are optional
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError: # selectolax is optional
+    LexborHTMLParser = None
+
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+RAW_TEXT_ELEMENTS = {"script", "style"} # Their text is serialized without escaping
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+}
+# bs4 strings that serialize as markup rather than text; every other NavigableString
+# subclass (<rt>, <rp> and <template> text among them) is text.
+MARKUP_STRINGS = (Comment, CData, Declaration, Doctype, ProcessingInstruction)
+
+_missing_backend_warnings = set()
+
+
+def _decode(html):
+    """Decodes raw bytes the same way BeautifulSoup would, so every backend sees the same text."""
+    if isinstance(html, str):
+        return html
+    return UnicodeDammit(html, is_html=True).unicode_markup or ""
+
+
+def _top_level(nodes, node_key, ancestors):
+    """
+    Drops nodes nested inside another node of the list.
+
+    Must run before any node is removed: some backends free removed subtrees, so
+    nested nodes cannot be inspected afterwards.
+    """
+    keys = {node_key(node) for node in nodes}
+    return [
+        node for node in nodes
+        if not any(node_key(parent) in keys for parent in ancestors(node))
+    ]
+
+
+class _MarkupEvents(HTMLParser):
+    """Collects the `iter_markup` events of an HTML fragment."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.events = []
+
+    def handle_starttag(self, tag, attrs):
+        self.events.append(("start", tag, [(name, "" if value is None else value) for name, value in attrs]))
+
+    def handle_endtag(self, tag):
+        self.events.append(("end", tag))
+
+    def handle_data(self, data):
+        self.events.append(("rawtext" if self.cdata_elem else "text", data))
+
+
+def _fragment_markup(html: str) -> list:
+    """Returns the `iter_markup` events of an HTML fragment, as html2text would see them."""
+    parser = _MarkupEvents()
+    parser.feed(html)
+    parser.close()
+    return parser.events
+
+
+class BeautifulSoupPage:
+    """
+    A parsed page backed by BeautifulSoup with Python's built-in html.parser.
+    This is the reference backend the others are checked against.
+    """
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser')
+
+    def select(self, selector):
+        """Returns every node matching a CSS selector, in document order."""
+        return self.soup.select(selector)
+
+    def select_one(self, selector):
+        """Returns the first node matching a CSS selector, or None."""
+        return self.soup.select_one(selector)
+
+    def body(self):
+        """Returns the <body> node, or None if the page has none."""
+        return self.soup.find('body')
+
+    def node_key(self, node):
+        """Returns a hashable key identifying the node for the lifetime of the page."""
+        # Tags are never garbage collected while the soup is alive, so identity is stable.
+        return id(node)
+
+    def node_name(self, node):
+        """Returns the node's tag name, for log messages."""
+        return node.name
+
+    def ancestors(self, node):
+        """Iterates over the node's ancestors, nearest first."""
+        return node.parents
+
+    def remove_nodes(self, nodes) -> int:
+        """Removes the nodes (and their subtrees) from the page and returns how many were removed."""
+        removed = 0
+        for node in nodes:
+            # Already gone because an enclosing node was decomposed first.
+            if node.decomposed:
+                continue
+            try:
+                node.decompose()
+                removed += 1
+            except Exception as e:
+                print(f"  -> ❌ Error decomposing element: {node.name} - {e}")
+        return removed
+
+    def outer_html(self, node) -> str:
+        """Serializes the node, including its own tag."""
+        return str(node)
+
+    def select_within(self, node, selector):
+        """Returns every descendant of the node matching a CSS selector, in document order."""
+        return node.select(selector)
+
+    def node_attr(self, node, name):
+        """Returns an attribute of the node as a string, or None. Multi-valued attributes are space-joined."""
+        value = node.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def node_text(self, node) -> str:
+        """Returns the text content of the node and its descendants."""
+        return node.get_text()
+
+    def iter_markup(self, node):
+        """
+        Walks the node's subtree as the events an HTML parser would report for `outer_html(node)`.
+
+        Yields:
+            tuple: ("start", tag, [(name, value)]), ("end", tag), ("text", unescaped text)
+                   or ("rawtext", text) for the content of <script> and <style>.
+                   Comments and declarations are skipped.
+        """
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if type(item) is tuple: # A pending end tag
+                yield item
+            elif isinstance(item, Tag):
+                attrs = [(name, " ".join(value) if isinstance(value, list) else value)
+                         for name, value in item.attrs.items()]
+                yield ("start", item.name, attrs)
+                # bs4 writes void elements as <br/>, which parsers report as a start and an end.
+                stack.append(("end", item.name))
+                stack.extend(reversed(item.contents))
+            elif isinstance(item, NavigableString) and not isinstance(item, MARKUP_STRINGS):
+                yield ("rawtext" if item.parent.name in RAW_TEXT_ELEMENTS else "text", str(item))
+
+    def hrefs(self) -> list[str]:
+        """Returns the href of every <a> element still in the page."""
+        return [link['href'] for link in self.soup.find_all('a', href=True)]
+
+
+class LxmlPage:
+    """A parsed page backed by lxml's libxml2 HTML parser and cssselect."""
+    _selector_cache = {}
+
+    def __init__(self, html):
+        text = _decode(html)
+        try:
+            self.root = lxml.html.document_fromstring(text) if text.strip() else None
+        except ValueError:
+            # Unicode input with an XML encoding declaration; let lxml decode the bytes.
+            self.root = lxml.html.document_fromstring(html)
+
+    def _compiled(self, selector):
+        compiled = self._selector_cache.get(selector)
+        if compiled is None:
+            compiled = self._selector_cache[selector] = CSSSelector(selector)
+        return compiled
+
+    def select(self, selector):
+        if self.root is None:
+            return []
+        return self._compiled(selector)(self.root)
+
+    def select_one(self, selector):
+        matches = self.select(selector)
+        return matches[0] if matches else None
+
+    def body(self):
+        if self.root is None:
+            return None
+        return self.root.find('body')
+
+    def node_key(self, node):
+        # lxml keeps one proxy per node while it is referenced, and the key set holds
+        # those references, so the proxy itself is a stable key.
+        return node
+
+    def node_name(self, node):
+        return node.tag
+
+    def ancestors(self, node):
+        return node.iterancestors()
+
+    def remove_nodes(self, nodes) -> int:
+        removed = 0
+        for node in _top_level(nodes, self.node_key, self.ancestors):
+            if node.getparent() is None:
+                continue
+            node.drop_tree() # Keeps the tail text, like decompose() in bs4
+            removed += 1
+        return removed
+
+    def outer_html(self, node) -> str:
+        return lxml.html.tostring(node, encoding='unicode', with_tail=False)
+
+    def select_within(self, node, selector):
+        return self._compiled(selector)(node)
+
+    def node_attr(self, node, name):
+        return node.get(name)
+
+    def node_text(self, node) -> str:
+        return node.text_content()
+
+    def iter_markup(self, node):
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if type(item) is tuple:
+                yield item
+                continue
+            tag = item.tag
+            yield ("start", tag, list(item.attrib.items()))
+            if tag not in VOID_ELEMENTS:
+                stack.append(("end", tag))
+            for child in reversed(item):
+                if child.tail:
+                    stack.append(("text", child.tail))
+                if isinstance(child.tag, str): # Skips comments and processing instructions
+                    stack.append(child)
+            if item.text:
+                stack.append(("rawtext" if tag in RAW_TEXT_ELEMENTS else "text", item.text))
+
+    def hrefs(self) -> list[str]:
+        if self.root is None:
+            return []
+        return [link.get('href') for link in self.root.iter('a') if link.get('href') is not None]
+
+
+class SelectolaxPage:
+    """A parsed page backed by selectolax's bindings to the lexbor HTML engine."""
+    def __init__(self, html):
+        self.tree = LexborHTMLParser(_decode(html))
+
+    def select(self, selector):
+        return self.tree.css(selector)
+
+    def select_one(self, selector):
+        return self.tree.css_first(selector)
+
+    def body(self):
+        return self.tree.body
+
+    def node_key(self, node):
+        # Node wrappers are recreated on every access; mem_id is the underlying pointer.
+        return node.mem_id
+
+    def node_name(self, node):
+        return node.tag
+
+    def ancestors(self, node):
+        parent = node.parent
+        while parent is not None:
+            yield parent
+            parent = parent.parent
+
+    def remove_nodes(self, nodes) -> int:
+        # lexbor frees decomposed subtrees, so nested nodes are filtered out up front.
+        top_level = _top_level(nodes, self.node_key, self.ancestors)
+        for node in top_level:
+            node.decompose()
+        return len(top_level)
+
+    def outer_html(self, node) -> str:
+        return node.html or ""
+
+    def select_within(self, node, selector):
+        return node.css(selector)
+
+    def node_attr(self, node, name):
+        return node.attributes.get(name)
+
+    def node_text(self, node) -> str:
+        return node.text(deep=True)
+
+    def iter_markup(self, node):
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if type(item) is tuple:
+                yield item
+                continue
+            tag = item.tag
+            if tag == "-text":
+                parent_tag = item.parent.tag if item.parent is not None else None
+                yield ("rawtext" if parent_tag in RAW_TEXT_ELEMENTS else "text", item.text_content)
+                continue
+            if tag.startswith("-") or tag.startswith("!"): # Comments and doctypes
+                continue
+            if tag == "template":
+                # lexbor keeps template contents in a separate fragment the node API cannot walk.
+                stack.extend(reversed(_fragment_markup(item.html or "")))
+                continue
+            # lexbor writes valueless attributes as name="".
+            yield ("start", tag, [(name, "" if value is None else value) for name, value in item.attributes.items()])
+            if tag not in VOID_ELEMENTS:
+                stack.append(("end", tag))
+            stack.extend(reversed(list(item.iter(include_text=True))))
+
+    def hrefs(self) -> list[str]:
+        return [
+            link.attributes['href'] for link in self.tree.css('a[href]')
+            if link.attributes.get('href') is not None
+        ]
+
+
+def available_backends() -> list[str]:
+    """Returns the parser backends whose dependencies are installed."""
+    backends = ["html.parser"]
+    if lxml is not None:
+        backends.append("lxml")
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    return backends
+
+
+def parse_html(html, backend: str = "html.parser"):
+    """
+    Parses a page with the requested backend.
+
+    Args:
+        html (bytes | str): The raw page body.
+        backend (str): One of "html.parser", "lxml" or "selectolax". Falls back to
+                       "html.parser" if the backend's package is not installed.
+
+    Returns:
+        A page object exposing select, select_one, body, node_key, node_name,
+        ancestors, remove_nodes, outer_html, hrefs, select_within, node_attr,
+        node_text and iter_markup.
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}. Choose from {', '.join(PARSER_BACKENDS)}.")
+    if backend == "lxml" and lxml is not None:
+        return LxmlPage(html)
+    if backend == "selectolax" and LexborHTMLParser is not None:
+        return SelectolaxPage(html)
+    if backend != "html.parser" and backend not in _missing_backend_warnings:
+        _missing_backend_warnings.add(backend)
+        print(f"⚠️ Parser backend '{backend}' is not installed. Falling back to html.parser.")
+    return BeautifulSoupPage(html)
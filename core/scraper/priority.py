@@ -0,0 +1,124 @@
+import re
+import time
+from urllib.parse import urlsplit
+
+from config.settings import (
+    SCRAPER_PRIORITY_DEPTH_WEIGHT, SCRAPER_PRIORITY_PATH_WEIGHT, SCRAPER_PRIORITY_PATTERNS,
+    SCRAPER_MAX_PAGES, SCRAPER_MAX_BYTES, SCRAPER_MAX_SECONDS,
+)
+
+
+class UrlPrioritizer:
+    """
+    Scores URLs so the most valuable documentation pages are fetched first.
+
+    Lower scores go first. A URL's score grows with its link depth and with the
+    number of segments in its path (shallow pages like `/docs/install/` tend to be
+    overviews, deep ones like `/docs/api/x/y/z/` generated references), and drops
+    by the weight of every configured pattern its path matches. Positive weights
+    pull matching URLs forward, negative ones push them back.
+    """
+    def __init__(
+        self,
+        pattern_weights: dict = None,
+        depth_weight: float = SCRAPER_PRIORITY_DEPTH_WEIGHT,
+        path_weight: float = SCRAPER_PRIORITY_PATH_WEIGHT,
+    ):
+        """
+        Initializes the prioritizer.
+
+        Args:
+            pattern_weights (dict): Regex (searched in the URL path) -> weight. Defaults
+                                    to `SCRAPER_PRIORITY_PATTERNS`.
+            depth_weight (float): Score added per link of depth.
+            path_weight (float): Score added per path segment.
+        """
+        if pattern_weights is None:
+            pattern_weights = SCRAPER_PRIORITY_PATTERNS
+        self.patterns = [(re.compile(pattern), weight) for pattern, weight in pattern_weights.items()]
+        self.depth_weight = depth_weight
+        self.path_weight = path_weight
+
+    def score(self, url: str, depth: int) -> float:
+        """Returns the URL's priority; lower is fetched sooner."""
+        path = urlsplit(url).path
+        segments = len([segment for segment in path.split('/') if segment])
+        score = depth * self.depth_weight + segments * self.path_weight
+        for pattern, weight in self.patterns:
+            if pattern.search(path):
+                score -= weight
+        return score
+
+
+class CrawlBudget:
+    """
+    Page, byte and time limits for one site's crawl. A limit of 0 is unlimited.
+
+    Pages are charged when their fetch starts (see `reserve`), so the page limit
+    is a hard bound even with many fetches in flight. The byte and time limits are
+    soft: once one is reached no new fetch starts, but requests already in flight finish.
+    """
+    def __init__(
+        self,
+        max_pages: int = SCRAPER_MAX_PAGES,
+        max_bytes: int = SCRAPER_MAX_BYTES,
+        max_seconds: float = SCRAPER_MAX_SECONDS,
+    ):
+        """
+        Initializes the budget. The clock starts with `start`.
+
+        Args:
+            max_pages (int): Pages fetched (including unchanged ones).
+            max_bytes (int): Response bytes downloaded.
+            max_seconds (float): Wall-clock seconds of crawling.
+        """
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.pages = 0
+        self.bytes = 0
+        self.started_at = None
+        self.exhausted_reason = None
+
+    def start(self):
+        """Starts the time budget."""
+        self.started_at = time.monotonic()
+
+    def reserve(self) -> bool:
+        """
+        Charges a page to the budget before its fetch starts.
+
+        Returns:
+            bool: False if the budget is spent and the page must not be fetched.
+        """
+        if self.exhausted():
+            return False
+        self.pages += 1
+        return True
+
+    def release(self):
+        """Refunds a reserved page whose fetch failed or was skipped."""
+        self.pages -= 1
+        if self.exhausted_reason and self.exhausted_reason.startswith("page budget"):
+            self.exhausted_reason = None
+
+    def record(self, body_bytes: int):
+        """Charges the body of a fetched (reserved) page to the budget."""
+        self.bytes += body_bytes
+
+    def exhausted(self):
+        """
+        Checks the limits.
+
+        Returns:
+            str: Why the budget is spent (the first limit hit stays the reason), or None.
+        """
+        if self.exhausted_reason is None:
+            if self.max_pages and self.pages >= self.max_pages:
+                self.exhausted_reason = f"page budget of {self.max_pages} pages reached"
+            elif self.max_bytes and self.bytes >= self.max_bytes:
+                self.exhausted_reason = f"byte budget of {self.max_bytes:,} bytes reached"
+            elif (self.max_seconds and self.started_at is not None and
+                  time.monotonic() - self.started_at >= self.max_seconds):
+                self.exhausted_reason = f"time budget of {self.max_seconds:.0f}s reached"
+        return self.exhausted_reason
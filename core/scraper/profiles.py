@@ -0,0 +1,112 @@
+import os
+import json
+from collections import Counter
+from urllib.parse import urlparse
+
+from config.settings import SCRAPER_PROFILE_LEARN_PAGES
+from core.scraper.extractor import CONTENT_AREA_SELECTORS, POTENTIAL_SIDEBAR_SELECTORS
+
+PROFILES_FILE_NAME = ".extraction_profiles.json"
+
+
+class ExtractionProfiles:
+    """
+    Learns, per host, which extraction selectors actually match.
+
+    Pages of one documentation site share a theme, so the same content selector and
+    the same few sidebar selectors win on almost every page. After `learn_pages`
+    fully searched pages of a host, its profile is the most frequent content
+    selector plus every sidebar selector that ever removed something. Later pages
+    try only those, and `extract_page` falls back to the full search when they do
+    not match. Fallback pages are searched fully and keep refining the statistics.
+    The statistics are saved as JSON so later crawls start with a trained profile.
+    """
+    def __init__(self, path: str, learn_pages: int = SCRAPER_PROFILE_LEARN_PAGES):
+        """
+        Initializes the profiles. Call `open` before using them.
+
+        Args:
+            path (str): Path of the JSON file the statistics are persisted in.
+            learn_pages (int): Fully searched pages observed before a host's profile is used.
+        """
+        self.path = path
+        self.learn_pages = learn_pages
+        self.hosts = {}
+        self.profiled_pages = 0
+        self.fallback_pages = 0
+
+    def open(self):
+        """Loads the statistics saved by a previous crawl, if any."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load extraction profiles from {self.path}: {e}. Relearning.")
+            return
+        for host, stats in saved.items():
+            self.hosts[host] = {
+                "pages": stats.get("pages", 0),
+                "content": Counter(stats.get("content", {})),
+                "sidebar": Counter(stats.get("sidebar", {})),
+            }
+
+    def _stats(self, host: str) -> dict:
+        """Returns the (possibly new) statistics of a host."""
+        if host not in self.hosts:
+            self.hosts[host] = {"pages": 0, "content": Counter(), "sidebar": Counter()}
+        return self.hosts[host]
+
+    def profile_for(self, url: str):
+        """
+        Returns the extraction profile for a URL's host.
+
+        Returns:
+            dict: {"content_selector", "sidebar_selectors"}, or None while the host is
+                  still being learned or has no content selector that ever matched.
+        """
+        stats = self.hosts.get(urlparse(url).netloc)
+        if not stats or stats["pages"] < self.learn_pages:
+            return None
+        # Selectors that are no longer in the extractor's lists are ignored.
+        content_counts = [(stats["content"][selector], -rank, selector)
+                          for rank, selector in enumerate(CONTENT_AREA_SELECTORS) if stats["content"][selector]]
+        if not content_counts:
+            return None
+        return {
+            "content_selector": max(content_counts)[2],
+            "sidebar_selectors": [selector for selector in POTENTIAL_SIDEBAR_SELECTORS if stats["sidebar"][selector]],
+        }
+
+    def observe(self, url: str, observation: dict, profiled: bool):
+        """
+        Records which selectors matched on one extracted page.
+
+        Only fully searched pages (no profile, or the profile fell back) count towards
+        learning, since a profiled page never tries the other selectors.
+
+        Args:
+            url (str): The page URL.
+            observation (dict): The observation filled in by `extract_page`.
+            profiled (bool): Whether a profile was passed to `extract_page`.
+        """
+        if profiled:
+            self.profiled_pages += 1
+            if not observation.get("fallback"):
+                return
+            self.fallback_pages += 1
+        stats = self._stats(urlparse(url).netloc)
+        stats["pages"] += 1
+        if observation.get("content_selector"):
+            stats["content"][observation["content_selector"]] += 1
+        for selector in observation.get("sidebar_selectors", ()):
+            stats["sidebar"][selector] += 1
+
+    def close(self):
+        """Saves the statistics for the next crawl."""
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.hosts, f, indent=2, sort_keys=True)
+        except OSError as e:
+            print(f"⚠️ Could not save extraction profiles to {self.path}: {e}")
@@ -0,0 +1,178 @@
+import time
+import asyncio
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from config.settings import (
+    SCRAPER_RATE_INITIAL, SCRAPER_RATE_MIN, SCRAPER_RATE_MAX, SCRAPER_RATE_ADDITIVE_INCREASE,
+    SCRAPER_RATE_DECREASE_FACTOR, SCRAPER_RATE_LATENCY_FACTOR, SCRAPER_MAX_RETRY_AFTER,
+)
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: str, now: float = None):
+    """
+    Parses a Retry-After header given either as seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait (never negative), or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class HostRateController:
+    """
+    Adaptive request rate for a single host (additive increase, multiplicative decrease).
+
+    Requests are spaced 1/rate seconds apart. Healthy responses raise the rate by
+    roughly `additive_increase` requests per second every second; 429/503 responses
+    or latency well above the host's baseline cut it by `decrease_factor`.
+    Retry-After pauses the host outright, and a robots.txt Crawl-delay caps the rate.
+    """
+    def __init__(
+        self,
+        initial_rate: float = SCRAPER_RATE_INITIAL,
+        min_rate: float = SCRAPER_RATE_MIN,
+        max_rate: float = SCRAPER_RATE_MAX,
+        additive_increase: float = SCRAPER_RATE_ADDITIVE_INCREASE,
+        decrease_factor: float = SCRAPER_RATE_DECREASE_FACTOR,
+        latency_factor: float = SCRAPER_RATE_LATENCY_FACTOR,
+        max_retry_after: float = SCRAPER_MAX_RETRY_AFTER,
+    ):
+        """
+        Initializes the controller.
+
+        Args:
+            initial_rate (float): Starting rate in requests per second.
+            min_rate (float): The rate never drops below this.
+            max_rate (float): The rate never rises above this.
+            additive_increase (float): Requests per second gained per second of healthy responses.
+            decrease_factor (float): Multiplier applied to the rate on a back-off.
+            latency_factor (float): Back off when a response is slower than this multiple
+                                    of the host's baseline latency.
+            max_retry_after (float): Upper bound on honored Retry-After pauses, in seconds.
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.max_retry_after = max_retry_after
+
+        self.next_slot = 0.0
+        self.paused_until = 0.0
+        self.baseline_latency = None
+        self.last_decrease = 0.0
+        self.throttled_responses = 0
+
+    def set_crawl_delay(self, delay: float):
+        """Caps the rate so requests are at least `delay` seconds apart."""
+        if delay and delay > 0:
+            self.max_rate = min(self.max_rate, 1.0 / delay)
+            self.min_rate = min(self.min_rate, self.max_rate)
+            self.rate = min(self.rate, self.max_rate)
+
+    def reserve(self) -> float:
+        """
+        Reserves the next request slot.
+
+        Returns:
+            float: Seconds the caller must wait before sending its request.
+        """
+        now = time.monotonic()
+        slot = max(now, self.next_slot, self.paused_until)
+        self.next_slot = slot + 1.0 / self.rate
+        return slot - now
+
+    def _decrease(self, now: float):
+        """Cuts the rate, at most once per current request interval so one burst counts once."""
+        if now - self.last_decrease < 1.0 / self.rate:
+            return
+        self.last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+    def record(self, status: int, latency: float, retry_after: float = None):
+        """
+        Updates the rate from a finished request.
+
+        Args:
+            status (int): The HTTP status, or 0 for a connection error or timeout.
+            latency (float): Seconds until the response headers arrived.
+            retry_after (float): Parsed Retry-After header, if any.
+        """
+        now = time.monotonic()
+        if status in THROTTLE_STATUSES:
+            self.throttled_responses += 1
+            self._decrease(now)
+            if retry_after is not None:
+                self.paused_until = max(self.paused_until, now + min(retry_after, self.max_retry_after))
+            return
+        if status == 0:
+            self._decrease(now)
+            return
+
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        elif latency > self.baseline_latency * self.latency_factor:
+            self._decrease(now)
+            return
+        else:
+            # Slow-moving average so a gradual slowdown still registers as rising latency.
+            self.baseline_latency = 0.9 * self.baseline_latency + 0.1 * latency
+
+        # Each healthy response adds additive_increase / rate, i.e. about
+        # additive_increase requests per second for every second of healthy traffic.
+        self.rate = min(self.max_rate, self.rate + self.additive_increase / self.rate)
+
+
+class RateLimiter:
+    """Keeps one `HostRateController` per host."""
+    def __init__(self, **controller_options):
+        """
+        Initializes the limiter.
+
+        Args:
+            **controller_options: Forwarded to every `HostRateController`.
+        """
+        self.controller_options = controller_options
+        self.hosts = {}
+
+    def for_host(self, host: str) -> HostRateController:
+        """Returns the controller for a host, creating it on first use."""
+        if host not in self.hosts:
+            self.hosts[host] = HostRateController(**self.controller_options)
+        return self.hosts[host]
+
+    def for_url(self, url: str) -> HostRateController:
+        """Returns the controller for a URL's host."""
+        return self.for_host(urlparse(url).netloc)
+
+    async def acquire(self, url: str):
+        """Waits until the URL's host may receive another request."""
+        delay = self.for_url(url).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, url: str, status: int, latency: float, retry_after: float = None):
+        """Feeds a response back into the URL's host controller."""
+        self.for_url(url).record(status, latency, retry_after)
+
+    def set_crawl_delay(self, host: str, delay: float):
+        """Applies a robots.txt Crawl-delay to a host."""
+        self.for_host(host).set_crawl_delay(delay)
+
+    def summary(self) -> dict:
+        """Returns the current rate (requests per second) per host."""
+        return {host: round(controller.rate, 2) for host, controller in self.hosts.items()}
@@ -0,0 +1,122 @@
+import time
+import random
+import asyncio
+import aiohttp
+from urllib.parse import urlparse
+
+from config.settings import (
+    SCRAPER_BACKOFF_BASE, SCRAPER_BACKOFF_MAX, SCRAPER_BREAKER_FAILURE_THRESHOLD,
+    SCRAPER_BREAKER_COOLDOWN, SCRAPER_BREAKER_MAX_COOLDOWN,
+)
+
+# Statuses that describe a temporary condition on the server side.
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+HALF_OPEN_RECHECK = 2.0 # Seconds other URLs of a host wait while its probe request is in flight
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classifies a fetch error as transient (worth retrying) or permanent.
+
+    Timeouts, dropped connections, truncated bodies and 408/425/429/5xx responses are
+    transient. Other HTTP errors (404, 410, ...), invalid URLs, redirect loops and
+    certificate failures will not go away by asking again.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    if isinstance(error, (aiohttp.ClientConnectorCertificateError, aiohttp.InvalidURL)):
+        return False
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+
+def backoff_delay(attempt: int, base: float = SCRAPER_BACKOFF_BASE, cap: float = SCRAPER_BACKOFF_MAX) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt (int): The number of the retry, starting at 1.
+        base (float): Upper bound of the first delay, in seconds.
+        cap (float): Upper bound of any delay, in seconds.
+
+    Returns:
+        float: A random delay between 0 and min(cap, base * 2 ** (attempt - 1)).
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After `failure_threshold` consecutive transient failures the host's circuit opens
+    and no requests go to it for a cooldown; the crawler parks the host's URLs
+    meanwhile. When the cooldown ends a single probe request is let through
+    (half-open): success closes the circuit, failure reopens it with twice the
+    previous cooldown, up to `max_cooldown`.
+    """
+    def __init__(
+        self,
+        failure_threshold: int = SCRAPER_BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = SCRAPER_BREAKER_COOLDOWN,
+        max_cooldown: float = SCRAPER_BREAKER_MAX_COOLDOWN,
+    ):
+        """
+        Initializes the breaker.
+
+        Args:
+            failure_threshold (int): Consecutive transient failures that open a host's circuit.
+            cooldown (float): Seconds a circuit stays open the first time it trips.
+            max_cooldown (float): Upper bound on the cooldown after repeated trips.
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.hosts = {}
+        self.trips = 0
+
+    def _state(self, url: str) -> dict:
+        """Returns the (possibly new) breaker state of the URL's host."""
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = {"failures": 0, "trips": 0, "open_until": 0.0, "probe_started": None}
+        return self.hosts[host]
+
+    def wait_time(self, url: str) -> float:
+        """
+        Checks whether a request to the URL's host may go out now.
+
+        Returns:
+            float: 0 if the request may proceed, otherwise the seconds to wait before asking again.
+        """
+        state = self._state(url)
+        now = time.monotonic()
+        if state["open_until"] > now:
+            return state["open_until"] - now
+        if state["trips"] == 0:
+            return 0.0
+        # Half-open: one probe at a time. A probe that never reported back (e.g. an
+        # unexpected error) is replaced once a full cooldown has passed.
+        probe_started = state["probe_started"]
+        if probe_started is not None and now - probe_started < self.cooldown:
+            return HALF_OPEN_RECHECK
+        state["probe_started"] = now
+        return 0.0
+
+    def record_success(self, url: str):
+        """Closes the host's circuit after a request got an answer from the server."""
+        state = self._state(url)
+        if state["trips"]:
+            print(f"  -> 🔌 {urlparse(url).netloc} recovered, closing its circuit.")
+        state.update(failures=0, trips=0, open_until=0.0, probe_started=None)
+
+    def record_failure(self, url: str):
+        """Counts a transient failure and opens the host's circuit once there are too many."""
+        state = self._state(url)
+        state["failures"] += 1
+        if state["probe_started"] is None and state["failures"] < self.failure_threshold:
+            return
+        state["trips"] += 1
+        self.trips += 1
+        cooldown = min(self.max_cooldown, self.cooldown * 2 ** (state["trips"] - 1))
+        state.update(failures=0, open_until=time.monotonic() + cooldown, probe_started=None)
+        print(f"  -> 🔌 Circuit open for {urlparse(url).netloc}: pausing it for {cooldown:.0f}s.")
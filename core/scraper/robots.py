@@ -0,0 +1,275 @@
+import os
+import re
+import json
+import time
+import asyncio
+import aiohttp
+from urllib.parse import urlsplit, quote, unquote
+
+from config.settings import SCRAPER_ROBOTS_TTL, SCRAPER_ROBOTS_ERROR_TTL
+
+ROBOTS_CACHE_NAME = ".robots_cache.json"
+ROBOTS_MAX_BYTES = 512 * 1024 # RFC 9309 asks crawlers to parse at least 500 KiB
+PATH_SAFE_CHARS = "/?=&;:@!$'()*+,~-._" # Kept verbatim when paths and patterns are normalized
+
+
+def _normalize_path(path: str) -> str:
+    """Brings a URL path or a rule pattern to one percent-encoding, so both compare byte for byte."""
+    return quote(unquote(path), safe=PATH_SAFE_CHARS)
+
+
+def _agent_token(user_agent: str) -> str:
+    """Returns the product token of a User-Agent header, e.g. 'docsbot' for 'DocsBot/1.0 (+url)'."""
+    return user_agent.split('/')[0].strip().lower()
+
+
+def _select_groups(robots_text: str, user_agent: str):
+    """
+    Collects the rule lines of the groups that apply to a user agent.
+
+    Groups naming our agent's product token win over the `*` group; several groups
+    for the same agent are merged.
+
+    Returns:
+        list[tuple]: (key, value) pairs in file order, keys lowercased.
+    """
+    agent_token = _agent_token(user_agent)
+    groups = {}
+    group_agents = []
+    in_rules = False
+    for raw_line in robots_text.splitlines():
+        line = raw_line.split('#', 1)[0].strip()
+        key, _, value = line.partition(':')
+        key = key.strip().lower()
+        value = value.strip()
+        if key == 'user-agent':
+            if in_rules:
+                group_agents = []
+                in_rules = False
+            group_agents.append(value.lower())
+        elif key and key != 'sitemap': # Sitemap lines are global, not part of a group
+            in_rules = True
+            for agent in group_agents:
+                groups.setdefault(agent, []).append((key, value))
+
+    for agent, lines in groups.items():
+        if agent != '*' and agent == agent_token:
+            return lines
+    return groups.get('*', [])
+
+
+class RobotsRules:
+    """
+    The compiled allow/disallow rules of one host for our user agent.
+
+    Precedence follows RFC 9309: the longest matching pattern wins and Allow wins
+    a tie. Plain prefix patterns are kept in a dict keyed by the pattern and probed
+    with one slice per distinct pattern length, longest first, so a check costs a
+    handful of dict lookups however many rules the file has. Only patterns with
+    `*` or `$` are compiled to regular expressions, and they are only tried when
+    they are longer than the best prefix match.
+    """
+    def __init__(self, rules=(), crawl_delay: float = None):
+        """
+        Compiles the rules.
+
+        Args:
+            rules (iterable): (pattern, allow) pairs. An empty pattern matches nothing.
+            crawl_delay (float): The Crawl-delay of the group, if any.
+        """
+        self.crawl_delay = crawl_delay
+        self.prefixes = {}
+        self.wildcards = []
+        for pattern, allow in rules:
+            if not pattern:
+                continue
+            pattern = _normalize_path(pattern)
+            if '*' in pattern or pattern.endswith('$'):
+                anchored = pattern.endswith('$')
+                body = pattern[:-1] if anchored else pattern
+                regex = ".*".join(re.escape(part) for part in body.split('*')) + ("$" if anchored else "")
+                self.wildcards.append((len(pattern), allow, re.compile(regex)))
+            else:
+                # Allow wins when the same path is both allowed and disallowed.
+                self.prefixes[pattern] = self.prefixes.get(pattern, False) or allow
+        self.prefix_lengths = sorted({len(pattern) for pattern in self.prefixes}, reverse=True)
+        self.wildcards.sort(key=lambda rule: (-rule[0], not rule[1]))
+
+    def allowed(self, url: str) -> bool:
+        """Returns True if the rules let us fetch the URL."""
+        parts = urlsplit(url)
+        if parts.path == "/robots.txt":
+            return True
+        path = _normalize_path(parts.path or "/")
+        if parts.query:
+            path = f"{path}?{_normalize_path(parts.query)}"
+
+        best_length, verdict = -1, True
+        for length in self.prefix_lengths:
+            if length <= len(path):
+                allow = self.prefixes.get(path[:length])
+                if allow is not None:
+                    best_length, verdict = length, allow
+                    break
+        for length, allow, regex in self.wildcards:
+            if length < best_length or (length == best_length and not allow):
+                break
+            if regex.match(path):
+                return allow
+        return verdict
+
+
+def parse_robots(robots_text: str, user_agent: str) -> RobotsRules:
+    """
+    Parses the rules of a robots.txt file that apply to a user agent.
+
+    Args:
+        robots_text (str): The robots.txt content.
+        user_agent (str): Our User-Agent header value.
+
+    Returns:
+        RobotsRules: The compiled Allow/Disallow rules and Crawl-delay of our group.
+    """
+    rules = []
+    crawl_delay = None
+    for key, value in _select_groups(robots_text, user_agent):
+        if key in ('allow', 'disallow'):
+            rules.append((value, key == 'allow'))
+        elif key == 'crawl-delay' and crawl_delay is None:
+            try:
+                crawl_delay = float(value)
+            except ValueError:
+                continue
+    return RobotsRules(rules, crawl_delay)
+
+
+def parse_crawl_delay(robots_text: str, user_agent: str):
+    """
+    Reads the Crawl-delay that applies to a user agent from a robots.txt file.
+
+    The group naming our user agent wins over the `*` group, following the usual
+    robots.txt precedence.
+
+    Args:
+        robots_text (str): The robots.txt content.
+        user_agent (str): Our User-Agent header value.
+
+    Returns:
+        float: The delay in seconds, or None if none applies.
+    """
+    return parse_robots(robots_text, user_agent).crawl_delay
+
+
+class RobotsCache:
+    """
+    Fetches robots.txt once per origin and keeps the compiled rules for a TTL.
+
+    Concurrent lookups for an origin share one fetch. The raw files are saved as
+    JSON, so a resumed or repeated crawl within the TTL does not fetch them again.
+    A missing robots.txt (4xx) allows everything. An unreachable one (5xx or a
+    network error) also allows everything, but is only cached for `error_ttl` so
+    it is retried soon, rather than blocking a crawl on a flaky host.
+    """
+    def __init__(self, user_agent: str, path: str = None,
+                 ttl: float = SCRAPER_ROBOTS_TTL, error_ttl: float = SCRAPER_ROBOTS_ERROR_TTL):
+        """
+        Initializes the cache. Call `open` before using it.
+
+        Args:
+            user_agent (str): Our User-Agent header value, used to pick the rule group.
+            path (str): JSON file the fetched files are persisted in. Nothing is
+                        persisted when omitted.
+            ttl (float): Seconds a fetched robots.txt stays valid.
+            error_ttl (float): Seconds an unreachable robots.txt is treated as empty.
+        """
+        self.user_agent = user_agent
+        self.path = path
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.entries = {} # origin -> {"fetched_at", "status", "text"}
+        self.rules = {} # origin -> RobotsRules, compiled on first use
+        self.fetches = {} # origin -> in-flight fetch task
+
+    def open(self):
+        """Loads the robots.txt files saved by a previous crawl, if any."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load the robots.txt cache from {self.path}: {e}. Refetching.")
+            self.entries = {}
+
+    def close(self):
+        """Saves the fetched robots.txt files."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+        except OSError as e:
+            print(f"⚠️ Could not save the robots.txt cache to {self.path}: {e}")
+
+    def _fresh(self, origin: str) -> bool:
+        """Returns True if the origin's robots.txt is cached and within its TTL."""
+        entry = self.entries.get(origin)
+        if entry is None:
+            return False
+        ttl = self.error_ttl if entry["status"] == 0 or entry["status"] >= 500 else self.ttl
+        return time.time() - entry["fetched_at"] < ttl
+
+    def _compiled(self, origin: str) -> RobotsRules:
+        """Returns the origin's compiled rules, compiling them on first use."""
+        rules = self.rules.get(origin)
+        if rules is None:
+            entry = self.entries[origin]
+            text = entry["text"] if 200 <= entry["status"] < 300 else ""
+            rules = self.rules[origin] = parse_robots(text, self.user_agent)
+        return rules
+
+    def cached_text(self, url: str):
+        """Returns the cached robots.txt of a URL's origin ("" if it has none), or None if it is not cached."""
+        parts = urlsplit(url)
+        entry = self.entries.get(f"{parts.scheme}://{parts.netloc}")
+        return entry["text"] if entry else None
+
+    def cached_rules(self, url: str):
+        """
+        Returns the rules for a URL's origin without fetching.
+
+        Returns:
+            RobotsRules: The rules, or None if they are not cached or have expired.
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        return self._compiled(origin) if self._fresh(origin) else None
+
+    async def rules_for(self, session: aiohttp.ClientSession, url: str) -> RobotsRules:
+        """Returns the rules for a URL's origin, fetching robots.txt if needed."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if self._fresh(origin):
+            return self._compiled(origin)
+        task = self.fetches.get(origin)
+        if task is None:
+            task = self.fetches[origin] = asyncio.create_task(self._fetch(session, origin))
+            task.add_done_callback(lambda _: self.fetches.pop(origin, None))
+        await asyncio.shield(task)
+        return self._compiled(origin)
+
+    async def _fetch(self, session: aiohttp.ClientSession, origin: str):
+        """Fetches an origin's robots.txt and replaces its cache entry."""
+        status, text = 0, ""
+        try:
+            async with session.get(f"{origin}/robots.txt") as response:
+                status = response.status
+                if 200 <= status < 300:
+                    body = await response.content.read(ROBOTS_MAX_BYTES)
+                    text = body.decode('utf-8', errors='replace')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠️ Could not fetch {origin}/robots.txt: {e}. Allowing all URLs for now.")
+        if status >= 500:
+            print(f"⚠️ {origin}/robots.txt answered {status}. Allowing all URLs for now.")
+        self.entries[origin] = {"fetched_at": time.time(), "status": status, "text": text}
+        self.rules.pop(origin, None)
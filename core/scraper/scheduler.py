@@ -0,0 +1,293 @@
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import (
+    SCRAPER_SCHEDULER_MAX_CONNECTIONS, SCRAPER_SCHEDULER_PROGRESS_INTERVAL, SCRAPER_EXTRACT_PROCESSES,
+)
+from core.scraper.crawler import DocsCrawler
+from core.scraper.rate_limiter import RateLimiter
+
+SITE_REQUIRED_KEYS = ("base_url", "output_dir", "path_filter")
+SITE_SHARED_KEYS = ("extract_processes",) # Set once for all sites, which share one extraction pool
+
+
+class FairShareBudget:
+    """
+    A global budget of concurrent connections shared fairly between sites.
+
+    Requests take a slot for their duration. While every slot is busy, freed slots
+    are handed out by stride scheduling: each grant advances the site's "pass" by
+    1/weight and the waiting site with the lowest pass goes next, so busy sites get
+    slots in proportion to their weights and a site with a huge frontier cannot
+    starve small ones. A site that is idle (or held back by its own politeness
+    limits) leaves its share to the others, and does not bank credit meanwhile.
+    """
+    def __init__(self, max_connections: int):
+        """
+        Initializes the budget.
+
+        Args:
+            max_connections (int): Requests in flight across all sites.
+        """
+        self.max_connections = max_connections
+        self.in_use = 0
+        self.sites = {}
+        self.virtual_time = 0.0 # Pass of the most recent grant
+
+    def for_site(self, name: str, weight: float = 1.0) -> "SiteShare":
+        """Registers a site and returns the async context manager its crawler holds around requests."""
+        self.sites[name] = {"weight": weight, "in_use": 0, "pass": 0.0, "waiters": deque()}
+        return SiteShare(self, name)
+
+    async def acquire(self, name: str):
+        """Waits for a connection slot for the site."""
+        site = self.sites[name]
+        if self.in_use < self.max_connections and not any(s["waiters"] for s in self.sites.values()):
+            self._grant(site)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        if not site["waiters"]:
+            site["pass"] = max(site["pass"], self.virtual_time)
+        site["waiters"].append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(name) # Granted just before the cancellation landed
+            else:
+                site["waiters"].remove(waiter)
+            raise
+
+    def release(self, name: str):
+        """Returns a slot and hands free slots to the most under-served waiting site."""
+        self.sites[name]["in_use"] -= 1
+        self.in_use -= 1
+        self._dispatch()
+
+    def _grant(self, site: dict):
+        """Books a slot for a site."""
+        site["in_use"] += 1
+        self.in_use += 1
+        site["pass"] += 1 / site["weight"]
+        self.virtual_time = site["pass"]
+
+    def _dispatch(self):
+        """Wakes waiting sites, fairest first, while slots are free."""
+        while self.in_use < self.max_connections:
+            waiting = [site for site in self.sites.values() if site["waiters"]]
+            if not waiting:
+                return
+            site = min(waiting, key=lambda s: s["pass"])
+            waiter = site["waiters"].popleft()
+            if waiter.done(): # Cancelled while queued
+                continue
+            self._grant(site)
+            waiter.set_result(None)
+
+
+class SiteShare:
+    """One site's handle on a `FairShareBudget`, usable as `async with share:` around a request."""
+    def __init__(self, budget: FairShareBudget, name: str):
+        self.budget = budget
+        self.name = name
+
+    async def __aenter__(self):
+        await self.budget.acquire(self.name)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.budget.release(self.name)
+        return False
+
+
+def load_manifest(path: str) -> dict:
+    """
+    Loads a crawl manifest.
+
+    The manifest is a JSON object with a "sites" list (and optionally
+    "max_connections"), or just the list. Each site needs base_url, output_dir and
+    path_filter, and may set "name", "weight" (its share of the connection budget)
+    and any other `DocsCrawler` option, e.g. max_concurrency, max_per_host or discovery,
+    except extract_processes: all sites share the scheduler's extraction pool.
+
+    Returns:
+        dict: {"sites": [...], "max_connections": int or None}
+
+    Raises:
+        ValueError: If a site is missing a required key, sets a shared option, or
+                    two sites share a name.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"sites": manifest}
+
+    names = set()
+    for index, site in enumerate(manifest.get("sites", [])):
+        missing = [key for key in SITE_REQUIRED_KEYS if key not in site]
+        if missing:
+            raise ValueError(f"Site #{index} in {path} is missing {', '.join(missing)}")
+        shared = [key for key in SITE_SHARED_KEYS if key in site]
+        if shared:
+            raise ValueError(f"Site #{index} in {path} sets {', '.join(shared)}, which applies to all "
+                             f"sites; set it for the whole scheduler instead")
+        site.setdefault("name", site["output_dir"])
+        if site["name"] in names:
+            raise ValueError(f"Duplicate site name in {path}: {site['name']}")
+        names.add(site["name"])
+    return {"sites": manifest.get("sites", []), "max_connections": manifest.get("max_connections")}
+
+
+class MultiSiteScheduler:
+    """
+    Crawls several documentation sites concurrently under one connection budget.
+
+    Every site gets its own `DocsCrawler` (frontier, output directory, limits), but
+    they share a `FairShareBudget` of connections, one `RateLimiter` so per-host
+    politeness holds even when two sites live on the same host, and one extraction
+    process pool. The total run time is bounded by the slowest site rather than
+    the sum of all sites.
+    """
+    def __init__(
+        self,
+        sites: list[dict],
+        max_connections: int = SCRAPER_SCHEDULER_MAX_CONNECTIONS,
+        extract_processes: int = SCRAPER_EXTRACT_PROCESSES,
+        progress_interval: float = SCRAPER_SCHEDULER_PROGRESS_INTERVAL,
+        rate_limiter: RateLimiter = None,
+    ):
+        """
+        Initializes the scheduler.
+
+        Args:
+            sites (list[dict]): Site entries as returned by `load_manifest`.
+            max_connections (int): Requests in flight across all sites.
+            extract_processes (int): Size of the shared extraction pool (0 = threads).
+            progress_interval (float): Seconds between aggregate progress lines.
+            rate_limiter (RateLimiter): Per-host pacing shared by all sites; a default one
+                                        is created if omitted.
+        """
+        self.sites = sites
+        self.budget = FairShareBudget(max_connections)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.extract_processes = extract_processes
+        self.progress_interval = progress_interval
+        self.crawlers = {}
+        self.durations = {}
+
+    async def _crawl_site(self, site: dict, process_pool):
+        """Runs one site's crawl and records how long it took."""
+        options = {key: value for key, value in site.items() if key not in ("name", "weight")}
+        crawler = DocsCrawler(**{
+            "extract_processes": self.extract_processes,
+            **options,
+            "connection_budget": self.budget.for_site(site["name"], site.get("weight", 1.0)),
+            "rate_limiter": self.rate_limiter,
+            "process_pool": process_pool,
+        })
+        self.crawlers[site["name"]] = crawler
+        started = time.monotonic()
+        try:
+            return await crawler.run()
+        finally:
+            self.durations[site["name"]] = time.monotonic() - started
+
+    def _pages_visited(self) -> int:
+        """Returns the pages fetched so far across all sites."""
+        return sum(len(crawler.visited_urls) for crawler in self.crawlers.values())
+
+    async def _report_progress(self, started: float):
+        """Prints aggregate throughput until cancelled."""
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            elapsed = time.monotonic() - started
+            pages = self._pages_visited()
+            print(f"📊 {pages} pages from {len(self.crawlers)} sites in {elapsed:.0f}s "
+                  f"({pages / elapsed:.1f} pages/s, {self.budget.in_use}/{self.budget.max_connections} connections busy)")
+
+    async def run(self) -> dict:
+        """
+        Crawls every site in the manifest concurrently.
+
+        A site whose crawl raises does not stop the others; its error is reported.
+
+        Returns:
+            dict: Site name -> the crawl report of `DocsCrawler.run`, or the exception it raised.
+        """
+        process_pool = None
+        if self.extract_processes > 0:
+            process_pool = ProcessPoolExecutor(
+                max_workers=self.extract_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        started = time.monotonic()
+        progress = asyncio.create_task(self._report_progress(started))
+        try:
+            results = await asyncio.gather(
+                *(self._crawl_site(site, process_pool) for site in self.sites), return_exceptions=True
+            )
+        finally:
+            progress.cancel()
+            if process_pool is not None:
+                process_pool.shutdown(cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        pages = self._pages_visited()
+        print(f"\n🏁 Crawled {len(self.sites)} sites: {pages} pages in {elapsed:.1f}s "
+              f"({pages / elapsed if elapsed else 0:.1f} pages/s overall).")
+        reports = {}
+        for site, result in zip(self.sites, results):
+            name = site["name"]
+            reports[name] = result
+            duration = self.durations.get(name, 0.0)
+            if isinstance(result, BaseException):
+                print(f"  ❌ {name}: {type(result).__name__}: {result}")
+            else:
+                visited = len(result["visited"])
+                print(f"  ✅ {name}: {visited} pages in {duration:.1f}s ({visited / duration if duration else 0:.1f} pages/s)")
+        return reports
+
+
+async def crawl_sites(manifest_path: str, max_connections: int = None, **scheduler_options) -> dict:
+    """
+    Async entry point: crawls every site of a manifest file concurrently.
+
+    Args:
+        manifest_path (str): Path of the JSON manifest (see `load_manifest`).
+        max_connections (int): Overrides the manifest's (or the default) connection budget.
+        **scheduler_options: Forwarded to `MultiSiteScheduler`.
+
+    Returns:
+        dict: Site name -> crawl report (or exception).
+    """
+    manifest = load_manifest(manifest_path)
+    scheduler = MultiSiteScheduler(
+        manifest["sites"],
+        max_connections=max_connections or manifest["max_connections"] or SCRAPER_SCHEDULER_MAX_CONNECTIONS,
+        **scheduler_options,
+    )
+    return await scheduler.run()
+
+
+def main():
+    """Command line entry point: `python -m core.scraper.scheduler <manifest.json>`."""
+    parser = argparse.ArgumentParser(description="Crawl several documentation sites concurrently.")
+    parser.add_argument("manifest", help="JSON manifest of the sites to crawl (e.g. config/sites.json).")
+    parser.add_argument("--max-connections", type=int, default=None,
+                        help="Requests in flight across all sites (overrides the manifest).")
+    parser.add_argument("--extract-processes", type=int, default=SCRAPER_EXTRACT_PROCESSES,
+                        help="Size of the shared extraction process pool (0 extracts in threads).")
+    args = parser.parse_args()
+    reports = asyncio.run(crawl_sites(args.manifest, args.max_connections, extract_processes=args.extract_processes))
+    if any(isinstance(report, BaseException) for report in reports.values()):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
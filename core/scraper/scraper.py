@@ -1,214 +1,149 @@
 import os
-import time
-import requests
-import html2text
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-
-def scrape_documentation(base_url, output_dir, path_filter):
+import asyncio
+import argparse
+from datetime import datetime
+
+from config.settings import (
+    SCRAPER_MAX_CONCURRENCY, SCRAPER_MAX_CONCURRENCY_PER_HOST, SCRAPER_REQUEST_TIMEOUT,
+    SCRAPER_DISCOVERY_MODE, SCRAPER_PARSER_BACKEND, SCRAPER_EXTRACT_PROCESSES, SCRAPER_FETCH_RETRIES,
+    SCRAPER_OUTPUT_FORMAT, SCRAPER_METRICS_PORT, SCRAPER_RESPECT_ROBOTS, SCRAPER_CONVERSION_CACHE,
+    SCRAPER_MAX_DEPTH, SCRAPER_MAX_PAGES, SCRAPER_MAX_BYTES, SCRAPER_MAX_SECONDS,
+)
+from core.scraper.parsers import PARSER_BACKENDS
+from core.scraper.crawler import crawl_documentation
+from core.scraper.frontier import FRONTIER_DB_NAME, SKIPPED, read_dead_letters, read_urls_with_status
+from core.scraper.output_store import OUTPUT_FORMATS
+
+
+def scrape_documentation(base_url, output_dir, path_filter, **crawler_options):
     """
     Scrapes the main content of a documentation website, converts it to Markdown,
     and saves the files locally, following only links that match a specific path.
 
+    Pages are fetched concurrently by `core.scraper.crawler.DocsCrawler`. Crawl state
+    is checkpointed to a SQLite frontier, so rerunning after a crash resumes the
+    crawl, and recrawls only re-extract pages that changed. This is a blocking
+    wrapper around `crawl_documentation`; async callers should await that directly.
+
     Args:
         base_url (str): The starting URL of the documentation.
         output_dir (str): The directory to save the scraped Markdown files.
         path_filter (str): A string that must be in the URL path to be followed (e.g., '/docs/').
+        **crawler_options: Forwarded to `DocsCrawler`, e.g. max_concurrency, max_per_host,
+                           request_timeout, state_path, resume, incremental, discovery,
+                           parser_backend, extract_processes, archive_responses,
+                           near_duplicates, extraction_profiles, fetch_retries,
+                           replay_failed.
+
+    Returns:
+        dict: A crawl report with the sets of `visited`, `changed`, `unchanged`,
+              `failed` and `aliased` URLs of this run, and `skipped` (URL -> reason).
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"✅ Created directory: {output_dir}")
-
-    visited_urls = set()
-    urls_to_visit = [base_url]
-
-    markdown_converter = html2text.HTML2Text()
-    markdown_converter.body_width = 0 # Don't wrap lines
-
-    while urls_to_visit:
-        current_url = urls_to_visit.pop(0)
-
-        if current_url in visited_urls:
-            continue
-
-        print(f"Scraping: {current_url}")
-        time.sleep(1) 
-
-        try:
-            response = requests.get(current_url, timeout=10)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"❌ Error fetching {current_url}: {e}")
-            continue
-
-        visited_urls.add(current_url)
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # --- 1. Robust Content Area Identification ---
-        # Prioritize semantic HTML5 elements for main content.
-        # Then, look for common div classes that hold main content.
-        content_area_selectors = [
-            'main',                   # Standard semantic HTML for main content
-            'article',                # For self-contained content
-            'div.docs-content',       # Common for documentation sites
-            'div.main-content',       # Another common pattern
-            'div.content-wrapper',    # General content container
-            'div.td-main',            # As seen in Istio, useful general if not too specific
-            'div#content',            # Common ID for content
-            'div[role="main"]',       # ARIA role for main content
-        ]
-        content_area = None
-        for selector in content_area_selectors:
-            content_area = soup.select_one(selector)
-            if content_area:
-                break
-        
-        if not content_area:
-            print(f"⚠️ Could not find a primary content area for {current_url}. Falling back to body content.")
-            # Fallback to body content if no specific content area found,
-            # but this increases the risk of including unwanted elements.
-            content_area = soup.find('body')
-            if not content_area: # Should ideally not happen for valid HTML
-                print(f"❌ Could not even find body for {current_url}. Skipping.")
-                continue
-
-        # --- 2. Generalized Sidebar Removal ---
-        # Strategy:
-        # a. Target common semantic navigation tags (nav, aside).
-        # b. Target elements with common "sidebar-like" class/ID names (e.g., "sidebar", "nav", "menu").
-        # c. Crucially, *exclude* elements that are direct ancestors or within the identified `content_area`.
-        
-        removed_sidebars_count = 0
-
-        # Define a broad set of selectors for potential sidebars.
-        # Order of selectors might matter for performance, but for `decompose`, not functionally.
-        potential_sidebar_selectors = [
-            'nav',                    # Most common semantic tag for navigation
-            'aside',                  # Semantic tag for content indirectly related to main content
-            '[role="navigation"]',    # ARIA role for navigation
-            '[class*="sidebar"]',     # Classes containing "sidebar" (e.g., "left-sidebar", "sidebar-menu")
-            '[id*="sidebar"]',        # IDs containing "sidebar"
-            '[class*="sidenav"]',     # Classes containing "sidenav"
-            '[id*="sidenav"]',        # IDs containing "sidenav"
-            '[class*="nav-menu"]',    # Classes containing "nav-menu"
-            '[id*="nav-menu"]',       # IDs containing "nav-menu"
-            '[class*="table-of-contents"]', # Some TOCs are standalone sidebars
-            '[id*="toc"]',            # Common ID for Table of Contents
-            # Add other common patterns you observe across documentation sites:
-            # 'div.td-sidebar-nav',   # Specific to Istio, but if you want to include common ones
-            # '.md-sidebar',          # Common in MkDocs-based themes
-            # '.doc-sidebar',
-        ]
-
-        # Get all potential sidebar elements
-        all_potential_sidebars = []
-        for selector in potential_sidebar_selectors:
-            all_potential_sidebars.extend(soup.select(selector))
-        
-        # Use a set to avoid processing the same element multiple times if it matches multiple selectors
-        unique_potential_sidebars = set(all_potential_sidebars)
-
-        for element_to_remove in unique_potential_sidebars:
-            # IMPORTANT: Ensure we are not removing the main content area itself,
-            # or any of its direct children or crucial ancestors.
-            # We want to remove elements *around* the content_area.
-
-            # Check if the element to remove is the content_area itself
-            if element_to_remove == content_area:
-                continue
-
-            # Check if the element to remove contains the content_area
-            # (i.e., content_area is a descendant of element_to_remove)
-            if content_area in element_to_remove.find_all(True): # find_all(True) gets all descendants
-                # If content_area is inside this element, this element might be a legitimate parent wrapper
-                # that we don't want to remove entirely, or it's a very broad selector.
-                # In such cases, we might need to be more surgical or skip this element.
-                # For now, let's skip removing an element that *contains* the main content.
-                continue
-
-            # Check if the element to remove is an ancestor of the content_area
-            # This is implicitly covered by the previous check if content_area is a descendant.
-            # A more direct check: if content_area.find_parent(element_to_remove) is not None
-
-            # Check if the element to remove is one of the parents of the main content area
-            # that we've already identified as a content area (e.g., 'div.main-content').
-            # This prevents us from removing the very container we identified as content.
-            is_ancestor_of_content_area = False
-            current = content_area
-            while current:
-                if current == element_to_remove:
-                    is_ancestor_of_content_area = True
-                    break
-                current = current.parent
-            if is_ancestor_of_content_area:
-                continue
-            
-            # Additional heuristic: avoid removing elements that are direct parents of <body>,
-            # which could be major layout wrappers, unless they explicitly look like a sidebar.
-            # This is tricky as some sites put sidebars directly under <body>.
-            # A safer approach is to ensure the element isn't broadly structuring the page.
-            # For now, rely on the content_area check.
-
-            # Perform removal
-            try:
-                element_to_remove.decompose()
-                removed_sidebars_count += 1
-                # print(f"  -> ✔️ Removed element matching selector: {element_to_remove.name} (class: {element_to_remove.get('class')})")
-            except Exception as e:
-                print(f"  -> ❌ Error decomposing element: {element_to_remove.name} - {e}")
-
-        if removed_sidebars_count > 0:
-            print(f"  -> ✔️ Removed {removed_sidebars_count} potential sidebar/navigation elements.")
-        else:
-            print("  -> ℹ️ No common sidebar/navigation elements found or removed based on general selectors.")
-
-        # --- 3. Convert to Markdown and Save ---
-        # Ensure content_area is still valid after potential decompositions
-        if not content_area:
-            print(f"❌ Content area disappeared after sidebar removal for {current_url}. Skipping content save.")
-            continue
-
-        html_content = str(content_area)
-        markdown_content = markdown_converter.handle(html_content)
-
-        parsed_url = urlparse(current_url)
-        path_segments = parsed_url.path.strip('/').split('/')
-        
-        filename = "index.md" if not path_segments[-1] else path_segments[-1] + ".md"
-        
-        dir_path = os.path.join(output_dir, *path_segments[:-1])
-        if not os.path.exists(dir_path):
-            os.makedirs(dir_path)
-
-        file_path = os.path.join(dir_path, filename)
-        
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            print(f"  -> ✅ Saved to {file_path}")
-        except OSError as e:
-            print(f"❌ Error saving file {file_path}: {e}")
-
-        # --- 4. Discover New Links ---
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            
-            if href.startswith('#'):
-                continue
-
-            absolute_url = urljoin(current_url, href).split('#')[0]
-
-            if (absolute_url not in visited_urls and
-                urlparse(absolute_url).netloc == urlparse(base_url).netloc and
-                path_filter in absolute_url):
-                
-                urls_to_visit.append(absolute_url)
-
-    print("\nScraping complete! ✨")
-
-
-# if __name__ == '__main__':
+    return asyncio.run(crawl_documentation(base_url, output_dir, path_filter, **crawler_options))
+
+
+def main():
+    """Command line entry point: `python -m core.scraper.scraper <base_url> <output_dir> <path_filter>`."""
+    parser = argparse.ArgumentParser(description="Scrape a documentation site into Markdown files.")
+    parser.add_argument("base_url", help="The starting URL of the documentation.")
+    parser.add_argument("output_dir", help="The directory to save the scraped Markdown files.")
+    parser.add_argument("path_filter", help="A string that must be in the URL path to be followed.")
+    parser.add_argument("--concurrency", type=int, default=SCRAPER_MAX_CONCURRENCY,
+                        help="Maximum number of requests in flight overall.")
+    parser.add_argument("--per-host", type=int, default=SCRAPER_MAX_CONCURRENCY_PER_HOST,
+                        help="Maximum number of requests in flight per host.")
+    parser.add_argument("--timeout", type=float, default=SCRAPER_REQUEST_TIMEOUT,
+                        help="Total timeout in seconds for a single fetch.")
+    parser.add_argument("--state-path", default=None,
+                        help="Path of the frontier database (defaults to a hidden file in output_dir).")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Discard any interrupted crawl state and start from base_url.")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-extract every page instead of skipping unchanged ones.")
+    parser.add_argument("--discovery", choices=["links", "sitemap", "hybrid"], default=SCRAPER_DISCOVERY_MODE,
+                        help="Follow links, seed from sitemaps, or both.")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default=SCRAPER_PARSER_BACKEND,
+                        help="HTML parser backend used for extraction.")
+    parser.add_argument("--extract-processes", type=int, default=SCRAPER_EXTRACT_PROCESSES,
+                        help="Extraction worker processes (0 extracts in threads of the main process).")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Do not keep raw responses for offline re-extraction.")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default=SCRAPER_OUTPUT_FORMAT,
+                        help="Write one Markdown file per page, or pack all pages into a single SQLite file.")
+    parser.add_argument("--metrics-port", type=int, default=SCRAPER_METRICS_PORT,
+                        help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics while crawling (0 = off).")
+    parser.add_argument("--ignore-robots", action="store_true", default=not SCRAPER_RESPECT_ROBOTS,
+                        help="Do not fetch robots.txt; crawl disallowed URLs and ignore its Crawl-delay.")
+    parser.add_argument("--max-depth", type=int, default=SCRAPER_MAX_DEPTH,
+                        help="Links followed away from the base URL (0 = unlimited).")
+    parser.add_argument("--max-pages", type=int, default=SCRAPER_MAX_PAGES,
+                        help="Stop after fetching this many pages (0 = unlimited). Leftover URLs resume next run.")
+    parser.add_argument("--max-mb", type=float, default=SCRAPER_MAX_BYTES / 1e6,
+                        help="Stop after downloading this many megabytes (0 = unlimited).")
+    parser.add_argument("--time-budget", type=float, default=SCRAPER_MAX_SECONDS,
+                        help="Stop after crawling this many seconds (0 = unlimited).")
+    parser.add_argument("--no-conversion-cache", action="store_true", default=not SCRAPER_CONVERSION_CACHE,
+                        help="Convert every page again instead of reusing unchanged content areas' Markdown.")
+    parser.add_argument("--keep-near-duplicates", action="store_true",
+                        help="Save near-duplicate pages instead of recording them as aliases.")
+    parser.add_argument("--no-profiles", action="store_true",
+                        help="Always run the full extraction selector search.")
+    parser.add_argument("--retries", type=int, default=SCRAPER_FETCH_RETRIES,
+                        help="Times a URL with a transient error is retried before it becomes a dead letter.")
+    parser.add_argument("--replay-failed", action="store_true",
+                        help="Retry the dead-letter URLs of the previous crawl (and any new links they lead to).")
+    parser.add_argument("--dead-letters", action="store_true",
+                        help="Print the dead-letter list of the last crawl and exit without crawling.")
+    parser.add_argument("--skipped", action="store_true",
+                        help="Print the URLs the content gate skipped in the last crawl, with reasons, and exit.")
+    parser.add_argument("--list-changed", action="store_true",
+                        help="Print the URLs whose content changed in this crawl.")
+    args = parser.parse_args()
+
+    if args.dead_letters or args.skipped:
+        state_path = args.state_path or os.path.join(args.output_dir, FRONTIER_DB_NAME)
+        rows = read_dead_letters(state_path) if args.dead_letters else read_urls_with_status(state_path, SKIPPED)
+        for url, depth, error, updated_at in rows:
+            print(f"{datetime.fromtimestamp(updated_at):%Y-%m-%d %H:%M:%S}  depth={depth}  {url}  {error}")
+        return
+
+    report = scrape_documentation(
+        base_url=args.base_url,
+        output_dir=args.output_dir,
+        path_filter=args.path_filter,
+        max_concurrency=args.concurrency,
+        max_per_host=args.per_host,
+        request_timeout=args.timeout,
+        state_path=args.state_path,
+        resume=not args.no_resume,
+        incremental=not args.full,
+        discovery=args.discovery,
+        parser_backend=args.parser,
+        extract_processes=args.extract_processes,
+        archive_responses=not args.no_archive,
+        near_duplicates=not args.keep_near_duplicates,
+        extraction_profiles=not args.no_profiles,
+        fetch_retries=args.retries,
+        replay_failed=args.replay_failed,
+        output_format=args.output_format,
+        metrics_port=args.metrics_port,
+        respect_robots=not args.ignore_robots,
+        max_depth=args.max_depth,
+        max_pages=args.max_pages,
+        max_bytes=int(args.max_mb * 1e6),
+        max_seconds=args.time_budget,
+        conversion_cache=not args.no_conversion_cache,
+    )
+    if args.list_changed:
+        for url in sorted(report["changed"]):
+            print(url)
+
+
+if __name__ == '__main__':
+    main()
+
+
+# Example crawls (e.g. from a Python shell or another script):
 #     # --- Example 1: Pydantic Docs ---
 #     print("\n--- Scraping Pydantic Docs ---")
 #     PYDANTIC_BASE_URL = 'https://docs.pydantic.dev/latest/'
@@ -0,0 +1,155 @@
+import gzip
+import asyncio
+import aiohttp
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+
+from config.settings import SCRAPER_MAX_SITEMAPS
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_robots_sitemaps(robots_text: str) -> list[str]:
+    """
+    Extracts the `Sitemap:` entries from a robots.txt file.
+
+    Args:
+        robots_text (str): The robots.txt content.
+
+    Returns:
+        list[str]: The sitemap URLs, in file order.
+    """
+    sitemaps = []
+    for line in robots_text.splitlines():
+        key, _, value = line.partition(':')
+        if key.strip().lower() == 'sitemap' and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+def parse_lastmod(value: str):
+    """
+    Parses a W3C datetime `<lastmod>` value (e.g. '2024-05-01' or '2024-05-01T10:00:00Z').
+
+    Returns:
+        float: A UTC timestamp, or None if the value is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_sitemap(body: bytes):
+    """
+    Parses a sitemap or sitemap index, transparently un-gzipping it.
+
+    Args:
+        body (bytes): The raw sitemap file.
+
+    Returns:
+        tuple: (kind, entries) where kind is 'urlset' or 'sitemapindex' and entries is a
+               list of (loc, lastmod timestamp or None). Returns (None, []) for unparsable input.
+    """
+    if body.startswith(GZIP_MAGIC):
+        try:
+            body = gzip.decompress(body)
+        except (OSError, EOFError):
+            return None, []
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return None, []
+
+    kind = root.tag.rsplit('}', 1)[-1]
+    entries = []
+    for entry in root:
+        loc = None
+        lastmod = None
+        for child in entry:
+            tag = child.tag.rsplit('}', 1)[-1]
+            if tag == 'loc' and child.text:
+                loc = child.text.strip()
+            elif tag == 'lastmod':
+                lastmod = parse_lastmod(child.text)
+        if loc:
+            entries.append((loc, lastmod))
+    return kind, entries
+
+
+async def fetch_optional_bytes(session: aiohttp.ClientSession, url: str):
+    """Fetches a small auxiliary file (robots.txt, sitemaps), returning None if it is unavailable."""
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"⚠️ Could not fetch {url}: {e}")
+        return None
+
+
+async def discover_sitemap_urls(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    path_filter: str,
+    max_sitemaps: int = SCRAPER_MAX_SITEMAPS,
+    robots_text: str = None,
+) -> dict:
+    """
+    Lists the pages of a site from its sitemaps.
+
+    Sitemaps are found through robots.txt `Sitemap:` entries, falling back to
+    `/sitemap.xml` at the site root and next to `base_url`. Sitemap index files are
+    followed, and gzipped sitemaps are supported.
+
+    Args:
+        session (aiohttp.ClientSession): The session to fetch sitemaps with.
+        base_url (str): The starting URL of the documentation.
+        path_filter (str): A string that must be in the URL to be kept.
+        max_sitemaps (int): Upper bound on sitemap files fetched, to stop runaway indexes.
+        robots_text (str): The site's robots.txt if the caller already has it, to save a fetch.
+
+    Returns:
+        dict: A mapping of page URL to its `<lastmod>` timestamp (or None), restricted
+              to the base URL's host and the path filter.
+    """
+    parsed_base = urlparse(base_url)
+    site_root = f"{parsed_base.scheme}://{parsed_base.netloc}/"
+
+    if robots_text is None:
+        robots_body = await fetch_optional_bytes(session, urljoin(site_root, 'robots.txt'))
+        robots_text = robots_body.decode('utf-8', errors='replace') if robots_body else ""
+    sitemap_queue = parse_robots_sitemaps(robots_text)
+    if not sitemap_queue:
+        sitemap_queue = [urljoin(site_root, 'sitemap.xml'), urljoin(base_url, 'sitemap.xml')]
+
+    seen_sitemaps = set()
+    pages = {}
+    while sitemap_queue and len(seen_sitemaps) < max_sitemaps:
+        sitemap_url = sitemap_queue.pop(0)
+        if sitemap_url in seen_sitemaps:
+            continue
+        seen_sitemaps.add(sitemap_url)
+
+        body = await fetch_optional_bytes(session, sitemap_url)
+        if body is None:
+            continue
+        kind, entries = parse_sitemap(body)
+        if kind == 'sitemapindex':
+            sitemap_queue.extend(loc for loc, _ in entries)
+            continue
+
+        for loc, lastmod in entries:
+            page_url = loc.split('#')[0]
+            if urlparse(page_url).netloc == parsed_base.netloc and path_filter in page_url:
+                pages[page_url] = lastmod
+
+    print(f"🗺️ Read {len(seen_sitemaps)} sitemap file(s), found {len(pages)} matching pages.")
+    return pages
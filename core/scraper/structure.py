@@ -0,0 +1,257 @@
+import re
+from bisect import bisect_right
+
+HEADING_SELECTOR = "h1, h2, h3, h4, h5, h6"
+PERMALINK_LABELS = {"¶", "#", "🔗", "§", "link"} # Text of "link to this heading" anchors
+HEADING_LOOKAHEAD = 8 # HTML headings searched for a Markdown heading's match, keeping matching linear
+
+ATX_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s{0,3}(`{3,}|~{3,})\s*([\w+#.-]*)")
+LIST_ITEM_PATTERN = re.compile(r"^\s*(?:[*+-]|\d+\.)\s")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(?:\|\s*:?-{3,}:?\s*)+\|?\s*$")
+MARKDOWN_LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+LANGUAGE_CLASS_PATTERN = re.compile(r"(?:^|\s)(?:language|lang|highlight-source|highlight)-([\w+#.-]+)")
+NON_WORD_PATTERN = re.compile(r"\W+")
+
+
+def _normalize_title(text: str) -> str:
+    """Reduces a heading to lowercase word characters, so HTML and Markdown titles compare equal."""
+    return NON_WORD_PATTERN.sub("", text.replace("¶", "")).lower()
+
+
+def _clean_title(markdown_title: str) -> str:
+    """Strips permalink anchors, link syntax and emphasis from a Markdown heading."""
+    def link_label(match):
+        label = match.group(1).strip()
+        return "" if label in PERMALINK_LABELS else label
+    title = MARKDOWN_LINK_PATTERN.sub(link_label, markdown_title)
+    return title.replace("**", "").replace("`", "").strip(" *_")
+
+
+def _code_language(page, pre):
+    """Finds the language of a <pre> block from its own, its <code>'s or its wrappers' classes."""
+    candidates = [pre] + page.select_within(pre, "code")[:1]
+    for depth, ancestor in enumerate(page.ancestors(pre)):
+        if depth == 2:
+            break
+        candidates.append(ancestor)
+    for node in candidates:
+        match = LANGUAGE_CLASS_PATTERN.search(page.node_attr(node, "class") or "")
+        if match:
+            return match.group(1).lower()
+    return page.node_attr(pre, "data-lang") or None
+
+
+def _heading_anchor(page, heading):
+    """Returns the fragment that links to a heading: its id, a named child anchor or a permalink."""
+    anchor = page.node_attr(heading, "id")
+    if anchor:
+        return anchor
+    for node in page.select_within(heading, "[id], a[name]"):
+        anchor = page.node_attr(node, "id") or page.node_attr(node, "name")
+        if anchor:
+            return anchor
+    for link in page.select_within(heading, 'a[href^="#"]'):
+        href = page.node_attr(link, "href")
+        if href and len(href) > 1:
+            return href[1:]
+    # Sphinx and MkDocs put the id on the enclosing <section>/<div> instead.
+    for ancestor in page.ancestors(heading):
+        if page.node_name(ancestor) in ("section", "div"):
+            return page.node_attr(ancestor, "id") or None
+        break
+    return None
+
+
+def collect_html_outline(page, content_area) -> dict:
+    """
+    Collects what Markdown conversion loses from the pruned content area.
+
+    Args:
+        page: The parsed page (see `core.scraper.parsers`).
+        content_area: The node that is converted to Markdown.
+
+    Returns:
+        dict: "headings", a list of (normalized title, anchor or None) in document
+              order, and "code_languages", the language of every <pre> block in
+              document order (None where it is not marked up).
+    """
+    headings = [
+        (_normalize_title(page.node_text(heading)), _heading_anchor(page, heading))
+        for heading in page.select_within(content_area, HEADING_SELECTOR)
+    ]
+    code_languages = [_code_language(page, pre) for pre in page.select_within(content_area, "pre")]
+    return {"headings": headings, "code_languages": code_languages}
+
+
+def build_page_structure(markdown: str, url: str, outline: dict = None) -> dict:
+    """
+    Builds the section tree of a converted page in a single pass over its Markdown.
+
+    Offsets are byte offsets into the UTF-8 encoded Markdown, with `end` exclusive.
+    A section spans from its heading to the next heading of the same or a higher
+    level, so it includes its subsections. Heading anchors and code languages come
+    from the HTML `outline`; a section without an anchor of its own deep-links to
+    its nearest ancestor that has one (or to the page).
+
+    Args:
+        markdown (str): The page's Markdown.
+        url (str): The page URL, used to build deep links.
+        outline (dict): The result of `collect_html_outline`, if available.
+
+    Returns:
+        dict: {"url", "title", "sections", "code_blocks", "tables"}. Each section is
+              {"level", "title", "anchor", "url", "parent", "start", "body_start", "end"},
+              where `parent` is the index of the enclosing section (None at the top)
+              and `body_start` is where the text after the heading line begins. Code
+              blocks are {"language", "start", "end", "section"} and tables are
+              {"start", "end", "columns", "rows", "section"}, where `section` is the
+              index of the innermost enclosing section (None before the first heading).
+    """
+    outline = outline or {"headings": [], "code_languages": []}
+    html_headings = outline["headings"]
+    code_languages = outline["code_languages"]
+    lines = markdown.splitlines(keepends=True)
+
+    sections = []
+    code_blocks = []
+    tables = []
+    open_sections = [] # Indexes of the sections enclosing the current line
+    next_html_heading = 0
+    offset = 0
+    fence = None # (marker, block) while inside a fenced code block
+    indented_block = None
+    previous_blank = True
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        size = len(line.encode("utf-8"))
+        stripped = line.strip()
+        current_section = open_sections[-1] if open_sections else None
+
+        if fence is not None:
+            marker, block = fence
+            if stripped.startswith(marker) and not stripped.strip(marker[0]):
+                block["end"] = offset + size
+                fence = None
+            offset += size
+            i += 1
+            continue
+
+        if indented_block is not None:
+            if not stripped or line.startswith(("    ", "\t")):
+                if stripped:
+                    indented_block["end"] = offset + size
+                offset += size
+                previous_blank = not stripped
+                i += 1
+                continue
+            indented_block = None
+
+        fence_match = FENCE_PATTERN.match(line)
+        heading_match = ATX_HEADING_PATTERN.match(line)
+        if fence_match:
+            block = {"language": fence_match.group(2).lower() or None, "start": offset,
+                     "end": len(markdown.encode("utf-8")), "section": current_section}
+            code_blocks.append(block)
+            fence = (fence_match.group(1), block)
+        elif heading_match:
+            level = len(heading_match.group(1))
+            title = _clean_title(heading_match.group(2))
+            while open_sections and sections[open_sections[-1]]["level"] >= level:
+                sections[open_sections.pop()]["end"] = offset
+            parent = open_sections[-1] if open_sections else None
+
+            anchor = None
+            normalized = _normalize_title(title)
+            for j in range(next_html_heading, min(next_html_heading + HEADING_LOOKAHEAD, len(html_headings))):
+                if html_headings[j][0] == normalized:
+                    anchor = html_headings[j][1]
+                    next_html_heading = j + 1
+                    break
+            if anchor:
+                section_url = f"{url}#{anchor}"
+            else:
+                section_url = sections[parent]["url"] if parent is not None else url
+
+            sections.append({
+                "level": level, "title": title, "anchor": anchor, "url": section_url, "parent": parent,
+                "start": offset, "body_start": offset + size, "end": None,
+            })
+            open_sections.append(len(sections) - 1)
+        elif previous_blank and line.startswith(("    ", "\t")) and stripped and not LIST_ITEM_PATTERN.match(line):
+            indented_block = {"language": None, "start": offset, "end": offset + size, "section": current_section}
+            code_blocks.append(indented_block)
+        elif "|" in line and i + 1 < len(lines) and TABLE_SEPARATOR_PATTERN.match(lines[i + 1]):
+            columns = len(stripped.strip("|").split("|"))
+            start = offset
+            offset += size + len(lines[i + 1].encode("utf-8"))
+            i += 2
+            rows = 0
+            while i < len(lines) and "|" in lines[i] and lines[i].strip():
+                offset += len(lines[i].encode("utf-8"))
+                rows += 1
+                i += 1
+            tables.append({"start": start, "end": offset, "columns": columns, "rows": rows, "section": current_section})
+            previous_blank = False
+            continue
+
+        previous_blank = not stripped
+        offset += size
+        i += 1
+
+    for index in open_sections:
+        sections[index]["end"] = offset
+
+    # html2text renders <pre> blocks as indented code, so languages are matched by
+    # position; that is only safe when every block was found.
+    if len(code_languages) == len(code_blocks):
+        for block, language in zip(code_blocks, code_languages):
+            block["language"] = block["language"] or language
+
+    title = next((section["title"] for section in sections if section["level"] == 1), None)
+    return {"url": url, "title": title, "sections": sections, "code_blocks": code_blocks, "tables": tables}
+
+
+def section_at(structure: dict, offset: int):
+    """
+    Finds the innermost section containing a byte offset, e.g. the start of a chunk.
+
+    Returns:
+        dict: The section, or None if the offset lies before the first heading.
+    """
+    sections = structure["sections"]
+    index = bisect_right([section["start"] for section in sections], offset) - 1
+    while index >= 0 and sections[index]["end"] <= offset:
+        index = sections[index]["parent"] if sections[index]["parent"] is not None else -1
+    return sections[index] if index >= 0 else None
+
+
+def iter_section_spans(markdown: str, structure: dict):
+    """
+    Splits a page at its headings, in linear time.
+
+    Each span runs from one heading to the next heading of any level, so spans do
+    not overlap and together cover the whole page (text before the first heading
+    forms a span of its own).
+
+    Yields:
+        dict: {"text", "url", "breadcrumb"}, where `url` deep-links to the span's
+              section and `breadcrumb` lists the titles from the top-level section down.
+    """
+    data = markdown.encode("utf-8")
+    sections = structure["sections"]
+    boundaries = [section["start"] for section in sections] + [len(data)]
+    if boundaries[0] > 0 and data[:boundaries[0]].strip():
+        yield {"text": data[:boundaries[0]].decode("utf-8"), "url": structure["url"], "breadcrumb": []}
+    for index, section in enumerate(sections):
+        breadcrumb = []
+        node = index
+        while node is not None:
+            breadcrumb.append(sections[node]["title"])
+            node = sections[node]["parent"]
+        yield {
+            "text": data[section["start"]:boundaries[index + 1]].decode("utf-8"),
+            "url": section["url"],
+            "breadcrumb": breadcrumb[::-1],
+        }
@@ -0,0 +1,111 @@
+from fnmatch import fnmatchcase
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config.settings import (
+    SCRAPER_CANONICAL_TRAILING_SLASH, SCRAPER_CANONICAL_DEFAULT_DOCUMENTS,
+    SCRAPER_QUERY_PARAM_ALLOWLIST, SCRAPER_QUERY_PARAM_DENYLIST,
+)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class UrlCanonicalizer:
+    """
+    Normalizes URLs so that variants of the same page are scheduled only once.
+
+    `canonicalize` returns the URL that is actually fetched: lower-cased scheme and
+    host, no default port or fragment, default documents such as `index.html`
+    dropped, the trailing-slash policy applied, and query parameters filtered
+    and sorted. `key` additionally ignores trailing slashes when the policy is
+    "keep", so `/docs/page` and `/docs/page/` share one frontier entry while
+    the first-seen spelling is the one fetched.
+    """
+    def __init__(
+        self,
+        trailing_slash: str = SCRAPER_CANONICAL_TRAILING_SLASH,
+        default_documents=SCRAPER_CANONICAL_DEFAULT_DOCUMENTS,
+        query_allowlist=SCRAPER_QUERY_PARAM_ALLOWLIST,
+        query_denylist=SCRAPER_QUERY_PARAM_DENYLIST,
+    ):
+        """
+        Initializes the canonicalizer.
+
+        Args:
+            trailing_slash (str): "keep" leaves paths as written, "strip" removes a
+                                  trailing slash, "add" appends one to paths whose last
+                                  segment has no file extension.
+            default_documents (list[str]): File names served as a directory index,
+                                           removed from the end of paths.
+            query_allowlist (list[str]): If set, only these query parameters are kept.
+            query_denylist (list[str]): Query parameters to drop. Shell-style
+                                        patterns such as "utm_*" are supported.
+        """
+        if trailing_slash not in ("keep", "strip", "add"):
+            raise ValueError(f"Unknown trailing slash policy: {trailing_slash}")
+        self.trailing_slash = trailing_slash
+        self.default_documents = {name.lower() for name in default_documents}
+        self.query_allowlist = set(query_allowlist) if query_allowlist is not None else None
+        self.query_denylist = list(query_denylist)
+
+    def _keep_param(self, name: str) -> bool:
+        """Applies the query parameter allow and deny lists."""
+        if self.query_allowlist is not None and name not in self.query_allowlist:
+            return False
+        return not any(fnmatchcase(name, pattern) for pattern in self.query_denylist)
+
+    def canonicalize(self, url: str) -> str:
+        """
+        Returns the canonical form of a URL.
+
+        Args:
+            url (str): An absolute URL.
+
+        Returns:
+            str: The canonical URL, or the input unchanged if it cannot be parsed.
+        """
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return url
+
+        scheme = parts.scheme.lower()
+        netloc = (parts.hostname or "").lower()
+        if port is not None and port != DEFAULT_PORTS.get(scheme):
+            netloc = f"{netloc}:{port}"
+        if parts.username is not None:
+            userinfo = parts.username if parts.password is None else f"{parts.username}:{parts.password}"
+            netloc = f"{userinfo}@{netloc}"
+
+        path = parts.path or "/"
+        head, _, last_segment = path.rpartition("/")
+        if last_segment.lower() in self.default_documents:
+            path, last_segment = head + "/", ""
+
+        if self.trailing_slash == "strip" and path != "/" and path.endswith("/"):
+            path = path.rstrip("/") or "/"
+        elif self.trailing_slash == "add" and not path.endswith("/") and "." not in last_segment:
+            path += "/"
+
+        params = [
+            (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if self._keep_param(name)
+        ]
+        query = urlencode(sorted(params))
+
+        return urlunsplit((scheme, netloc, path, query, ""))
+
+    def key(self, url: str) -> str:
+        """
+        Returns the de-duplication key of a URL.
+
+        Returns:
+            str: The canonical URL, with any trailing slash ignored under the "keep" policy.
+        """
+        canonical = self.canonicalize(url)
+        if self.trailing_slash != "keep":
+            return canonical
+        parts = urlsplit(canonical)
+        if parts.path != "/" and parts.path.endswith("/"):
+            canonical = urlunsplit(parts._replace(path=parts.path.rstrip("/") or "/"))
+        return canonical
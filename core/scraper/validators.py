@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+
+from config.settings import SCRAPER_VALIDATOR_BATCH_SIZE
+
+VALIDATOR_DB_NAME = ".validators.sqlite3"
+
+
+def content_hash(body: bytes) -> str:
+    """Returns the hex SHA-256 digest used to detect unchanged page bodies."""
+    return hashlib.sha256(body).hexdigest()
+
+
+class ValidatorStore:
+    """
+    Remembers HTTP validators (ETag, Last-Modified) and a content hash per URL.
+
+    Recrawls use these to send conditional requests and to skip extraction for
+    pages that did not change. The links discovered on each page are stored too,
+    so an unchanged page can still seed the crawl without being re-parsed.
+    Unlike the frontier, this store is kept across completed crawls.
+    """
+    def __init__(self, db_path: str, batch_size: int = SCRAPER_VALIDATOR_BATCH_SIZE, output_exists=os.path.exists):
+        """
+        Initializes the store. Call `open` before using it.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+            batch_size (int): Number of buffered records that triggers a write.
+            output_exists (callable): Tells whether a page's saved Markdown is still there,
+                                      given its markdown_path. Defaults to a file check.
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.output_exists = output_exists
+        self.conn = None # Will be initialized by open()
+        self.records = {}
+        self._pending_writes = {}
+
+    def open(self):
+        """Opens (or creates) the database and loads all known records."""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                markdown_path TEXT,
+                links TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+        for url, etag, last_modified, body_hash, markdown_path, links, fetched_at in self.conn.execute(
+            "SELECT url, etag, last_modified, content_hash, markdown_path, links, fetched_at FROM validators"
+        ):
+            self.records[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_hash": body_hash,
+                "markdown_path": markdown_path,
+                "links": json.loads(links),
+                "fetched_at": fetched_at,
+            }
+
+    def get(self, url: str):
+        """
+        Returns the stored record for a URL.
+
+        Returns:
+            dict: The record with etag, last_modified, content_hash, markdown_path,
+                  links and fetched_at, or None if the URL was never stored.
+        """
+        return self.records.get(url)
+
+    def conditional_headers(self, url: str) -> dict:
+        """
+        Builds the If-None-Match / If-Modified-Since headers for a recrawl.
+
+        The headers are only sent while the page's Markdown file still exists, since a
+        304 response would otherwise leave nothing on disk.
+        """
+        record = self.records.get(url)
+        if not record or not record["markdown_path"] or not self.output_exists(record["markdown_path"]):
+            return {}
+        headers = {}
+        if record["etag"]:
+            headers["If-None-Match"] = record["etag"]
+        if record["last_modified"]:
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def is_unchanged(self, url: str, body_hash: str) -> bool:
+        """Returns True if the body hash matches the last crawl and its output still exists."""
+        record = self.records.get(url)
+        return bool(
+            record and
+            record["content_hash"] == body_hash and
+            (record["markdown_path"] is None or self.output_exists(record["markdown_path"]))
+        )
+
+    def put(self, url, etag, last_modified, body_hash, markdown_path, links):
+        """Records the validators and outputs of a freshly processed page."""
+        record = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": body_hash,
+            "markdown_path": markdown_path,
+            "links": list(links),
+            "fetched_at": time.time(),
+        }
+        self.records[url] = record
+        self._pending_writes[url] = record
+        if len(self._pending_writes) >= self.batch_size:
+            self.flush()
+
+    def update_validators(self, url, etag, last_modified):
+        """Refreshes the validators of an unchanged page, keeping its outputs."""
+        record = self.records.get(url)
+        if record is None:
+            return
+        record["etag"] = etag or record["etag"]
+        record["last_modified"] = last_modified or record["last_modified"]
+        record["fetched_at"] = time.time()
+        self._pending_writes[url] = record
+        if len(self._pending_writes) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered records in a single transaction."""
+        if not self._pending_writes or self.conn is None:
+            return
+        rows = [
+            (url, r["etag"], r["last_modified"], r["content_hash"], r["markdown_path"],
+             json.dumps(r["links"]), r["fetched_at"])
+            for url, r in self._pending_writes.items()
+        ]
+        self._pending_writes.clear()
+        with self.conn:
+            self.conn.executemany(
+                """INSERT OR REPLACE INTO validators
+                   (url, etag, last_modified, content_hash, markdown_path, links, fetched_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+
+    def close(self):
+        """Flushes buffered records and closes the database."""
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
@@ -50,6 +50,35 @@ class LanceDBManager:
             # Re-raise to ensure main knows about the failure if critical
             raise
 
+    async def ensure_columns(self, columns: dict[str, str]):
+        """
+        Adds columns that an existing table was created without, so rows carrying
+        them can be appended.
+
+        Args:
+            columns (dict[str, str]): Column name -> SQL expression that fills the
+                                      column for rows already in the table.
+        """
+        self._connect()
+        if self.table_name not in self.db.table_names():
+            return
+        table = self.db.open_table(self.table_name)
+        missing = {name: expression for name, expression in columns.items() if name not in table.schema.names}
+        if missing:
+            print(f"Adding columns {', '.join(missing)} to table '{self.table_name}'.")
+            table.add_columns(missing)
+
+    async def delete_documents(self, source_paths: list[str]):
+        """
+        Removes all chunks of the given sources, e.g. before re-adding a page that changed.
+        """
+        self._connect()
+        if not source_paths or self.table_name not in self.db.table_names():
+            return
+        table = self.db.open_table(self.table_name)
+        quoted = ", ".join("'" + path.replace("'", "''") + "'" for path in source_paths)
+        table.delete(f"source_path IN ({quoted})")
+
     async def get_table(self):
         """
         Returns the LanceDB table instance.
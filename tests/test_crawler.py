@@ -0,0 +1,145 @@
+"""
+Crawls a small synthetic documentation site served by `benchmarks.fixture_server`
+from inside the test process.
+"""
+import os
+import asyncio
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from benchmarks.bench_crawl import UNTHROTTLED
+from benchmarks.fixture_server import SyntheticSite, build_app
+from core.data_ingestion.data_loader import iter_markdown_files, read_packed_markdown
+from core.scraper.archive import ARCHIVE_DIR_NAME, reextract
+from core.scraper.crawler import DocsCrawler, crawl_documentation
+from core.scraper.links import LinkExtractor
+from core.scraper.output_store import PACKED_STORE_NAME, iter_packed_pages
+from core.scraper.rate_limiter import RateLimiter
+
+SITE_PAGES = 30
+
+
+async def crawl_site(tmp_path, base_url: str = None, **options) -> dict:
+    """Serves the synthetic site and crawls it; `base_url` may use "{port}" to spell the host differently."""
+    site = SyntheticSite(SITE_PAGES)
+    async with TestServer(build_app(site)) as server:
+        start_url = base_url.format(port=server.port) if base_url else str(server.make_url("/docs/"))
+        options = {"rate_limiter": RateLimiter(**UNTHROTTLED), "extract_processes": 0, **options}
+        return await crawl_documentation(start_url, str(tmp_path), "/docs/", **options)
+
+
+def test_base_url_is_canonicalized(tmp_path):
+    crawler = DocsCrawler("https://Docs.Example.com:443/docs/", str(tmp_path), "/docs/")
+
+    assert crawler.base_url == "https://docs.example.com/docs/"
+    links = LinkExtractor(crawler.base_url, "/docs/").extract(
+        "https://docs.example.com/docs/", ["a", "/docs/b", "https://docs.example.com/docs/c"]
+    )
+    assert links == [
+        "https://docs.example.com/docs/a", "https://docs.example.com/docs/b", "https://docs.example.com/docs/c",
+    ]
+
+
+def test_mixed_case_host_crawls_whole_site(tmp_path):
+    report = asyncio.run(crawl_site(tmp_path, "http://LocalHost:{port}/docs/"))
+
+    assert len(report["visited"]) == SITE_PAGES
+    assert all(url.startswith("http://localhost:") for url in report["visited"])
+
+
+def test_page_budget_is_a_hard_limit_with_concurrent_fetches(tmp_path):
+    report = asyncio.run(crawl_site(tmp_path, max_pages=10, max_concurrency=8, max_per_host=8))
+
+    assert 0 < len(report["visited"]) <= 10
+    assert report["budget_exhausted"] == "page budget of 10 pages reached"
+
+
+def test_reextract_writes_to_the_packed_store_of_a_packed_crawl(tmp_path):
+    report = asyncio.run(crawl_site(tmp_path, output_format="packed", archive_responses=True))
+    store_path = os.path.join(tmp_path, PACKED_STORE_NAME)
+    crawled = {page["url"]: page["fetched_at"] for page in iter_packed_pages(store_path)}
+
+    saved = reextract(os.path.join(tmp_path, ARCHIVE_DIR_NAME), str(tmp_path), processes=1)
+
+    assert saved == len(report["visited"]) == len(crawled)
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".md")]
+    reextracted = {page["url"]: page["fetched_at"] for page in iter_packed_pages(store_path)}
+    assert reextracted.keys() == crawled.keys()
+    assert all(reextracted[url] > crawled[url] for url in crawled)
+
+
+def near_duplicate_site(copies: int) -> web.Application:
+    """A start page linking to `copies` pages with the same content, e.g. per-version mirrors."""
+    text = " ".join(f"word{i}" for i in range(300))
+
+    async def start(request):
+        links = "".join(f'<a href="/docs/v{i}">v{i}</a>' for i in range(copies))
+        return web.Response(text=f"<html><body><main><h1>Start</h1>{links}</main></body></html>",
+                            content_type="text/html")
+
+    async def copy(request):
+        return web.Response(text=f"<html><body><main><h1>Guide</h1><p>{text}</p></main></body></html>",
+                            content_type="text/html")
+
+    async def robots(request):
+        return web.Response(text="User-agent: *\nAllow: /\n")
+
+    app = web.Application()
+    app.router.add_get("/robots.txt", robots)
+    app.router.add_get("/docs/", start)
+    app.router.add_get("/docs/{version}", copy)
+    return app
+
+
+def test_near_duplicates_extracted_together_are_aliased(tmp_path):
+    async def crawl():
+        async with TestServer(near_duplicate_site(copies=8)) as server:
+            return await crawl_documentation(
+                str(server.make_url("/docs/")), str(tmp_path), "/docs/",
+                rate_limiter=RateLimiter(**UNTHROTTLED), extract_processes=0, max_concurrency=8, max_per_host=8,
+            )
+
+    report = asyncio.run(crawl())
+
+    assert len(report["visited"]) == 9
+    assert len(report["aliased"]) == 7 # Only the first copy is saved
+
+
+async def stream_site(tmp_path, **options) -> list[dict]:
+    """Crawls the synthetic site into a page sink and returns the pages it received."""
+    pages = []
+    page_sink = asyncio.Queue()
+    await crawl_site(tmp_path, page_sink=page_sink, **options)
+    while not page_sink.empty():
+        pages.append(page_sink.get_nowait())
+    return pages
+
+
+def test_streamed_pages_are_identified_like_loaded_pages(tmp_path):
+    def identities(pages, output_dir):
+        """Maps each page's source_path below its output directory to its URL path (ports differ per run)."""
+        return {os.path.relpath(page["source_path"], output_dir): urlsplit(page["url"]).path for page in pages}
+
+    streamed = asyncio.run(stream_site(tmp_path / "files"))
+    streamed_only = asyncio.run(stream_site(tmp_path / "sink", save_markdown_files=False))
+    asyncio.run(crawl_site(tmp_path / "packed", output_format="packed"))
+
+    loaded = identities(iter_markdown_files(str(tmp_path / "files")), tmp_path / "files")
+    assert len(loaded) == SITE_PAGES
+    assert identities(streamed, tmp_path / "files") == loaded
+    assert identities(streamed_only, tmp_path / "sink") == loaded
+    assert identities(read_packed_markdown(str(tmp_path / "packed" / PACKED_STORE_NAME)), tmp_path / "packed") == loaded
+
+
+def test_sorted_loader_order_is_full_path_order(tmp_path):
+    for relpath in ("a/z.md", "a/b/c.md", "a.md", "a-b/d.md", "b/.hidden.md", ".cache/e.md", "a/notes.txt"):
+        path = tmp_path / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("# Page\n", encoding="utf-8")
+
+    loaded = [doc["source_path"] for doc in iter_markdown_files(str(tmp_path), read_ahead=1, order="sorted")]
+
+    expected = ["a-b/d.md", "a.md", "a/b/c.md", "a/z.md"]
+    assert loaded == [os.path.join(str(tmp_path), *relpath.split("/")) for relpath in expected]
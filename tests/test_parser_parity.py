@@ -0,0 +1,107 @@
+"""
+Checks that every installed parser backend produces the same Markdown and links
+as the reference html.parser backend, on the saved pages in benchmarks/pages/
+plus a generated API-reference page. Backends that are not installed are skipped.
+"""
+import os
+
+import pytest
+
+from benchmarks.fixtures import api_reference_page
+from core.scraper.conversion_cache import ConversionCache
+from core.scraper.extractor import extract_page
+from core.scraper.parsers import PARSER_BACKENDS, available_backends
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "pages")
+FIXTURE_BASE_URL = "https://docs.example.com/docs/"
+ALTERNATE_BACKENDS = [backend for backend in PARSER_BACKENDS if backend != "html.parser"]
+
+
+def load_fixtures() -> dict:
+    """Returns a mapping of fixture name to raw HTML bytes."""
+    fixtures = {}
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(PAGES_DIR, name), "rb") as f:
+                fixtures[name] = f.read()
+    fixtures["generated_api_reference"] = api_reference_page(num_nav_groups=10, num_sections=30).encode("utf-8")
+    return fixtures
+
+
+FIXTURES = load_fixtures()
+
+
+def extract(html: bytes, backend: str, **options):
+    """Runs the extraction pipeline with one backend."""
+    return extract_page(html, FIXTURE_BASE_URL + "page/", FIXTURE_BASE_URL, "/", parser_backend=backend, **options)
+
+
+def require_backend(backend: str):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed (see the 'fast-parsers' extra)")
+
+
+@pytest.mark.parametrize("backend", ALTERNATE_BACKENDS)
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_backend_matches_reference(name, backend):
+    require_backend(backend)
+    reference_markdown, reference_links = extract(FIXTURES[name], "html.parser")
+    markdown, links = extract(FIXTURES[name], backend)
+    assert reference_markdown
+    assert markdown == reference_markdown
+    assert links == reference_links
+
+
+# Content whose text bs4 stores in NavigableString subclasses, or that lexbor keeps outside the node tree.
+MARKUP_CASES = {
+    "ruby": "<main><p><ruby>漢<rt>kan</rt></ruby> x</p></main>",
+    "ruby_parentheses": "<main><p><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby> x</p></main>",
+    "template": "<main><p>a</p><template><p>tpl &amp; <b>b</b><br></p>"
+                "<template><i>nested</i></template></template><!-- note --></main>",
+    "raw_text": "<main><p>a &lt; b</p><style>p > a { color: red }</style><script>if (a < b) {}</script></main>",
+}
+
+
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+@pytest.mark.parametrize("name", sorted(FIXTURES) + sorted(MARKUP_CASES))
+def test_tree_conversion_matches_string_conversion(name, backend):
+    require_backend(backend)
+    html = FIXTURES.get(name) or MARKUP_CASES[name].encode("utf-8")
+    string_markdown, _ = extract(html, backend, convert_from_tree=False)
+    tree_markdown, _ = extract(html, backend, convert_from_tree=True)
+    assert string_markdown
+    assert tree_markdown == string_markdown
+
+
+@pytest.mark.parametrize("backend", ALTERNATE_BACKENDS)
+@pytest.mark.parametrize("name", sorted(MARKUP_CASES))
+def test_markup_case_matches_reference(name, backend):
+    require_backend(backend)
+    html = MARKUP_CASES[name].encode("utf-8")
+    assert extract(html, backend) == extract(html, "html.parser")
+
+
+def extract_cached(html: bytes, cache: ConversionCache, convert_from_tree: bool):
+    """Extracts with the conversion cache and records the outcome, as the crawler does."""
+    conversion = {}
+    markdown, _ = extract(html, "html.parser", convert_from_tree=convert_from_tree,
+                          conversion_cache_path=cache.db_path, conversion=conversion)
+    cache.record(conversion["key"], markdown, conversion["hit"])
+    cache.flush()
+    return markdown, conversion["hit"]
+
+
+@pytest.mark.parametrize("first_from_tree", [True, False])
+def test_cache_hits_match_across_conversion_modes(tmp_path, first_from_tree):
+    html = FIXTURES["generated_api_reference"]
+    cache = ConversionCache(str(tmp_path / "conversions.sqlite3"))
+    cache.open()
+    try:
+        converted, first_hit = extract_cached(html, cache, convert_from_tree=first_from_tree)
+        tree_markdown, tree_hit = extract_cached(html, cache, convert_from_tree=True)
+        string_markdown, string_hit = extract_cached(html, cache, convert_from_tree=False)
+    finally:
+        cache.close()
+    assert not first_hit
+    assert tree_hit and string_hit
+    assert tree_markdown == string_markdown == converted
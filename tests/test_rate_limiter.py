@@ -0,0 +1,158 @@
+"""
+Crawls a local aiohttp server that throttles like a busy documentation host
+(429/503 responses with Retry-After, a robots.txt Crawl-delay) and checks the
+spacing of the requests it receives from the crawler's adaptive per-host rate control.
+"""
+import time
+import asyncio
+from email.utils import formatdate
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.scraper.crawler import crawl_documentation
+from core.scraper.rate_limiter import RateLimiter
+
+# Localhost latency jitters; keep latency spikes from counting as back-off signals.
+STEADY = {"latency_factor": float("inf")}
+PARAGRAPH = "<p>This page documents one part of the API in enough words to be worth indexing.</p>"
+
+
+class ThrottlingSite:
+    """
+    Serves /docs/ linking to `pages` more pages. Page requests are answered from a
+    script of (status, headers) responses, then with 200s, and the site remembers
+    when each page request arrived.
+    """
+    def __init__(self, script=(), robots_txt: str = "User-agent: *\nAllow: /\n", pages: int = 0):
+        self.script = list(script)
+        self.robots_txt = robots_txt
+        self.pages = pages
+        self.arrivals = []
+
+    def gaps(self) -> list[float]:
+        """Seconds between consecutive page requests."""
+        return [later - earlier for earlier, later in zip(self.arrivals, self.arrivals[1:])]
+
+    def page_html(self, path: str) -> str:
+        links = "".join(f'<a href="/docs/page-{i}">Page {i}</a>' for i in range(1, self.pages + 1))
+        return (f"<html><body><main><h1>{path}</h1>{PARAGRAPH * 3}"
+                f"{links if path == '/docs/' else ''}</main></body></html>")
+
+    def app(self) -> web.Application:
+        async def robots(request):
+            return web.Response(text=self.robots_txt)
+
+        async def page(request):
+            self.arrivals.append(time.monotonic())
+            if self.script:
+                status, headers = self.script.pop(0)
+                headers = headers() if callable(headers) else headers
+                return web.Response(status=status, headers=headers, text="Slow down\n")
+            return web.Response(text=self.page_html(request.path), content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/robots.txt", robots)
+        app.router.add_get("/docs/{tail:.*}", page)
+        return app
+
+
+async def crawl(site: ThrottlingSite, tmp_path, rate_limiter: RateLimiter, **options) -> dict:
+    """
+    Crawls the site with one fetch worker, so consecutive page requests are spaced
+    by the host's rate alone.
+
+    Returns:
+        dict: The crawl report of `DocsCrawler.run`.
+    """
+    async with TestServer(site.app()) as server:
+        options = {"max_concurrency": 1, "discovery": "links", "extract_processes": 0, **options}
+        return await crawl_documentation(str(server.make_url("/docs/")), str(tmp_path), "/docs/",
+                                         rate_limiter=rate_limiter, **options)
+
+
+def host_controller(limiter: RateLimiter):
+    """Returns the controller of the only host the crawl talked to."""
+    (controller,) = limiter.hosts.values()
+    return controller
+
+
+@pytest.mark.parametrize("status, retry_after", [
+    (429, lambda: {"Retry-After": "1"}),
+    (503, lambda: {"Retry-After": formatdate(time.time() + 2, usegmt=True)}),
+])
+def test_throttled_response_halves_rate_and_honors_retry_after(tmp_path, status, retry_after):
+    site = ThrottlingSite([(status, retry_after)])
+    limiter = RateLimiter(initial_rate=10, max_rate=10, additive_increase=0.5, decrease_factor=0.5, **STEADY)
+
+    report = asyncio.run(crawl(site, tmp_path, limiter, respect_robots=False))
+
+    assert len(report["visited"]) == 1 and not report["failed"]
+    assert len(site.arrivals) == 2 # The throttled request was retried
+    assert site.gaps()[0] >= 0.9 # ...no earlier than Retry-After allowed
+    controller = host_controller(limiter)
+    assert controller.throttled_responses == 1
+    # Halved from 10, then one healthy response added 0.5 / 5.
+    assert controller.rate == pytest.approx(5.1)
+
+
+def test_retry_after_is_capped(tmp_path):
+    site = ThrottlingSite([(429, {"Retry-After": "3600"})])
+    limiter = RateLimiter(initial_rate=10, max_retry_after=0.5, **STEADY)
+
+    report = asyncio.run(crawl(site, tmp_path, limiter, respect_robots=False))
+
+    assert len(report["visited"]) == 1 and not report["failed"]
+    assert 0.4 <= site.gaps()[0] < 3
+
+
+def test_repeated_throttling_keeps_backing_off(tmp_path):
+    site = ThrottlingSite([(503, {})] * 3)
+    limiter = RateLimiter(initial_rate=8, min_rate=1, max_rate=8, decrease_factor=0.5, **STEADY)
+
+    report = asyncio.run(crawl(site, tmp_path, limiter, respect_robots=False, throttle_retries=3))
+
+    assert len(report["visited"]) == 1 and not report["failed"]
+    assert 1 <= host_controller(limiter).rate <= 4
+    gaps = site.gaps()
+    assert all(later >= earlier * 0.9 for earlier, later in zip(gaps, gaps[1:]))
+    assert gaps[-1] >= gaps[0] * 1.5 # Requests spread out as the rate fell
+
+
+def test_throttling_past_the_retry_budget_fails_the_fetch(tmp_path):
+    site = ThrottlingSite([(503, {})] * 3)
+    limiter = RateLimiter(initial_rate=50, **STEADY)
+
+    report = asyncio.run(crawl(site, tmp_path, limiter, respect_robots=False, throttle_retries=2, fetch_retries=0))
+
+    assert len(report["failed"]) == 1
+    assert len(site.arrivals) == 3
+
+
+def test_crawl_delay_spaces_requests(tmp_path):
+    site = ThrottlingSite(robots_txt="User-agent: *\nCrawl-delay: 0.3\nAllow: /\n", pages=3)
+    limiter = RateLimiter(initial_rate=50, max_rate=50, **STEADY)
+
+    report = asyncio.run(crawl(site, tmp_path, limiter, respect_robots=True))
+
+    assert len(report["visited"]) == 4 and not report["failed"]
+    assert host_controller(limiter).rate == pytest.approx(1 / 0.3)
+    assert min(site.gaps()) >= 0.27
+
+
+def test_rate_ramps_back_up_additively(tmp_path):
+    site = ThrottlingSite([(429, {})], pages=40)
+    limiter = RateLimiter(initial_rate=40, max_rate=40, additive_increase=20, decrease_factor=0.5, **STEADY)
+
+    report = asyncio.run(crawl(site, tmp_path, limiter, respect_robots=False))
+
+    assert len(report["visited"]) == 41 and not report["failed"]
+    controller = host_controller(limiter)
+    assert controller.throttled_responses == 1
+    assert controller.rate == 40 # Halved to 20, then every healthy response added 20 / rate
+    # Requests after the back-off came about 1/21 s apart, the last ones 1/40 s apart.
+    gaps = site.gaps()[2:] # The first gaps cover the retry and extracting /docs/
+    early, late = sum(gaps[:5]) / 5, sum(gaps[-5:]) / 5
+    assert early >= 1 / 22 * 0.9
+    assert late < early * 0.8
@@ -0,0 +1,44 @@
+"""Runs the multi-site scheduler against the synthetic fixture site."""
+import json
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from benchmarks.bench_crawl import UNTHROTTLED
+from benchmarks.fixture_server import SyntheticSite, build_app
+from core.scraper.rate_limiter import RateLimiter
+from core.scraper.scheduler import MultiSiteScheduler, load_manifest
+
+SITE_PAGES = 20
+
+
+def test_manifest_rejects_per_site_extract_processes(tmp_path):
+    manifest = tmp_path / "sites.json"
+    manifest.write_text(json.dumps([
+        {"base_url": "https://a.example.com/docs/", "output_dir": "a", "path_filter": "/docs/"},
+        {"base_url": "https://b.example.com/docs/", "output_dir": "b", "path_filter": "/docs/",
+         "extract_processes": 0},
+    ]))
+
+    with pytest.raises(ValueError, match="extract_processes"):
+        load_manifest(str(manifest))
+
+
+def test_sites_use_the_shared_extraction_pool(tmp_path):
+    async def crawl():
+        async with TestServer(build_app(SyntheticSite(SITE_PAGES))) as server:
+            base_url = str(server.make_url("/docs/"))
+            sites = [
+                {"name": name, "base_url": url, "output_dir": str(tmp_path / name), "path_filter": "/docs/",
+                 "extract_processes": 0} # Would leave no extraction workers if it overrode the shared pool
+                for name, url in (("loopback", base_url), ("localhost", base_url.replace("127.0.0.1", "localhost")))
+            ]
+            scheduler = MultiSiteScheduler(sites, extract_processes=1, rate_limiter=RateLimiter(**UNTHROTTLED))
+            return await asyncio.wait_for(scheduler.run(), timeout=60)
+
+    reports = asyncio.run(crawl())
+
+    for report in reports.values():
+        assert not isinstance(report, BaseException)
+        assert len(report["visited"]) == SITE_PAGES